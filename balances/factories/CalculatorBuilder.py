@@ -1,10 +1,11 @@
-from balances.services.calculator import Calculator
+from balances.services.calculator import CachedCalculator, Calculator
 from balances.strategies.query import (BetweenDateStrategy, CompleteFormatStrategy, DetailedAccountFormatStrategy,
                                        DetailedFormatStrategy, OnDateStrategy, PlainFormatStrategy, UntilDateStrategy,
                                        based)
 
 
 class CalculatorBuilder:
+    use_cache = False
 
     def consider(self, based):
         self.based = based
@@ -15,7 +16,7 @@ class CalculatorBuilder:
         return self
 
     def on_date(self, date):
-        self.date_strategy = OnDateStrategy(data, based=self.based)
+        self.date_strategy = OnDateStrategy(date, based=self.based)
         return self
 
     def between_dates(self, from_date, until_date):
@@ -35,12 +36,18 @@ class CalculatorBuilder:
         return self
 
     def as_complete(self):
-        self.format_strategy = CompleteFormatStrategy()
+        # Complete format depends on date strategy, so dates must be set before
+        self.format_strategy = CompleteFormatStrategy(self.date_strategy)
         return self
 
     def as_detailed_accounts(self):
         self.format_strategy = DetailedAccountFormatStrategy(self.user_id)
         return self
 
+    def cached(self):
+        self.use_cache = True
+        return self
+
     def build(self):
-        return Calculator(self.user_id, self.date_strategy, self.format_strategy)
+        calculator_class = CachedCalculator if self.use_cache else Calculator
+        return calculator_class(self.user_id, self.date_strategy, self.format_strategy)
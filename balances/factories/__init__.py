@@ -1,10 +1,7 @@
 from .CalculatorBuilder import CalculatorBuilder
 from .PeriodQueryBuilder import PeriodQueryBuilder
-from .periods import create_period_strategy, create_period_balance_for
 
 __all__ = [
     "CalculatorBuilder",
-    "PeriodQueryBuilder",
-    "create_period_balance_for",
-    "create_period_strategy"
-]
\ No newline at end of file
+    "PeriodQueryBuilder"
+]
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from balances.services import cache
+
+
+class Command(BaseCommand):
+    help = 'Shows hits and misses of balances cache'
+
+    def handle(self, *args, **options):
+        stats = cache.get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write('{hits} hits, {misses} misses'.format(**stats) + ' ({:.1%} hit ratio)'.format(ratio))
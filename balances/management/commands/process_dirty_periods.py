@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from balances.services import dirty_periods
+
+
+class Command(BaseCommand):
+    help = 'Applies period balances changes queued while BALANCES_ASYNC_PERIODS is set'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exits when there are no more queued changes')
+        parser.add_argument('--batch-size', type=int, default=dirty_periods.BATCH_SIZE,
+                            help='How many queued changes are applied in each transaction')
+        parser.add_argument('--sleep', type=float, default=5, help='Seconds to wait when there is nothing queued')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = dirty_periods.process(options['batch_size'])
+            if processed:
+                self.stdout.write('{} queued changes applied'.format(processed))
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['sleep'])
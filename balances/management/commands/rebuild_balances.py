@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from balances.services import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recreates monthly rollups, period balances and accounts current balances from transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, dest='user_id', help='Rebuilds only balances of this user id')
+
+    def handle(self, *args, **options):
+        created = rebuild.rebuild_balances(options['user_id'])
+        self.stdout.write('{} period balances created'.format(created))
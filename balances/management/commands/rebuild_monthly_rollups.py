@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from balances.services import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recreates monthly rollups from transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, dest='user_id', help='Rebuilds only rollups of this user id')
+
+    def handle(self, *args, **options):
+        created = rollups.rebuild(options['user_id'])
+        self.stdout.write('{} monthly rollups created'.format(created))
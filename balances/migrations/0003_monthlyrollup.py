@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.4 on 2026-10-18 13:07
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Case, DateField, Sum, When
+from django.db.models.functions import TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    MonthlyRollup = apps.get_model('balances', 'MonthlyRollup')
+
+    rows = Transaction.objects\
+        .annotate(
+            due_month=TruncMonth('due_date'),
+            payment_month=Case(When(payment_date__isnull=False, then=TruncMonth('payment_date')),
+                               output_field=DateField()))\
+        .values('account_id', 'due_month', 'payment_month', 'kind')\
+        .annotate(total=Sum('value'))\
+        .order_by()
+
+    rollups = {}
+    for row in rows:
+        effective = rollups.setdefault((row['account_id'], row['due_month'], row['kind']), [0, 0])
+        effective[0] += row['total']
+        if row['payment_month']:
+            real = rollups.setdefault((row['account_id'], row['payment_month'], row['kind']), [0, 0])
+            real[1] += row['total']
+
+    MonthlyRollup.objects.bulk_create([
+        MonthlyRollup(account_id=account_id, month=month, kind=kind, effective_value=effective, real_value=real)
+        for (account_id, month, kind), (effective, real) in rollups.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0027_recurrencerule'),
+        ('balances', '0002_auto_20180217_0515'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('kind', models.PositiveIntegerField(choices=[(0, 'Expense'), (1, 'Income')])),
+                ('effective_value', models.DecimalField(decimal_places=2, default=0, max_digits=19)),
+                ('real_value', models.DecimalField(decimal_places=2, default=0, max_digits=19)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='transactions.Account')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='monthlyrollup',
+            unique_together=set([('account', 'month', 'kind')]),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.4 on 2026-10-18 14:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0030_transaction_keyset_index'),
+        ('balances', '0003_monthlyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirtyPeriod',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('effective_value', models.DecimalField(decimal_places=2, default=0, max_digits=19)),
+                ('real_value', models.DecimalField(decimal_places=2, default=0, max_digits=19)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='transactions.Account')),
+            ],
+        ),
+    ]
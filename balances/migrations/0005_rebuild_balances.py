@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import calendar
+
+from django.db import migrations
+from django.db.models import Case, DateField, Sum, When
+from django.db.models.functions import TruncMonth
+
+
+def rebuild_balances(apps, schema_editor):
+    """
+    Periods and accounts current balances weren't kept by every transaction write before,
+    so those are recreated from transactions, along with rollups, as balances.services.rebuild does.
+    """
+    Account = apps.get_model('transactions', 'Account')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    MonthlyRollup = apps.get_model('balances', 'MonthlyRollup')
+    PeriodBalance = apps.get_model('balances', 'PeriodBalance')
+    DirtyPeriod = apps.get_model('balances', 'DirtyPeriod')
+
+    rows = Transaction.objects\
+        .annotate(
+            due_month=TruncMonth('due_date'),
+            payment_month=Case(When(payment_date__isnull=False, then=TruncMonth('payment_date')),
+                               output_field=DateField()))\
+        .values('account_id', 'due_month', 'payment_month', 'kind')\
+        .annotate(total=Sum('value'))\
+        .order_by()
+
+    rollups = {}
+    for row in rows:
+        effective = rollups.setdefault((row['account_id'], row['due_month'], row['kind']), [0, 0])
+        effective[0] += row['total']
+        if row['payment_month']:
+            real = rollups.setdefault((row['account_id'], row['payment_month'], row['kind']), [0, 0])
+            real[1] += row['total']
+
+    MonthlyRollup.objects.all().delete()
+    MonthlyRollup.objects.bulk_create([
+        MonthlyRollup(account_id=account_id, month=month, kind=kind, effective_value=effective, real_value=real)
+        for (account_id, month, kind), (effective, real) in rollups.items()
+    ], batch_size=500)
+
+    months = {}
+    for (account_id, month, kind), (effective, real) in rollups.items():
+        values = months.setdefault((account_id, month), [0, 0])
+        values[0] += effective
+        values[1] += real
+
+    periods, running = [], {}
+    for (account_id, month), (effective, real) in sorted(months.items()):
+        total = running.setdefault(account_id, [0, 0])
+        total[0] += effective
+        total[1] += real
+        end = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+        periods.append(PeriodBalance(account_id=account_id, start_date=month, end_date=end,
+                                     closed_effective_value=total[0], closed_real_value=total[1]))
+
+    DirtyPeriod.objects.all().delete()
+    PeriodBalance.objects.all().delete()
+    PeriodBalance.objects.bulk_create(periods, batch_size=500)
+
+    for account in Account.objects.all():
+        account.current_effective_balance, account.current_real_balance = running.get(account.id, (0, 0))
+        account.save(update_fields=['current_effective_balance', 'current_real_balance'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0031_transaction_bound_reason_index'),
+        ('balances', '0004_dirtyperiod'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_balances, migrations.RunPython.noop),
+    ]
@@ -14,3 +14,33 @@ class PeriodBalance(models.Model):
 
     def get_transactions(self):
         return Transaction.objects.in_date_range(self.start_date, self.end_date)
+
+
+class MonthlyRollup(models.Model):
+    """
+    Sum of account transactions of one kind in a month,
+    effective is based on due date and real on payment date.
+    """
+    class Meta:
+        unique_together = ('account', 'month', 'kind')
+
+    account = models.ForeignKey(Account)
+    month = models.DateField()
+    """First day of month"""
+    kind = models.PositiveIntegerField(choices=Transaction.TRANSACTION_KINDS)
+    effective_value = models.DecimalField(max_digits=19, decimal_places=2, default=0)
+    real_value = models.DecimalField(max_digits=19, decimal_places=2, default=0)
+
+
+class DirtyPeriod(models.Model):
+    """
+    Change of account periods and current balance not applied yet.
+    Those are queued on request path when BALANCES_ASYNC_PERIODS is set,
+    then process_dirty_periods command applies them coalesced by account.
+    """
+    account = models.ForeignKey(Account)
+    month = models.DateField()
+    """First day of the lowest affected month, every period ending on or after it is shifted"""
+    effective_value = models.DecimalField(max_digits=19, decimal_places=2, default=0)
+    real_value = models.DecimalField(max_digits=19, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
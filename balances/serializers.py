@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from balances.services import timeseries
+
 
 class PeriodSerializer(serializers.Serializer):
     period = serializers.SerializerMethodField()
@@ -13,3 +15,43 @@ class PeriodSerializer(serializers.Serializer):
 
     def get_period(self, obj):
         return '{}-{:02d}'.format(obj['date'].year, obj['date'].month)
+
+
+class BalanceQuerySerializer(serializers.Serializer):
+    """
+    One of balances batch queries, fields are the same query parameters balance endpoints take
+    """
+    format = serializers.ChoiceField(choices=['plain', 'detailed', 'complete', 'accounts'])
+    based = serializers.ChoiceField(choices=['effective', 'real', 'both'], default='effective')
+    date = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+    output = serializers.ChoiceField(choices=['total', 'expenses', 'incomes'], default='total')
+    pending = serializers.BooleanField(default=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # "from" is a reserved word, so it can't be declared as the others
+        fields['from'] = serializers.DateField(required=False)
+        return fields
+
+
+class TimeseriesQuerySerializer(serializers.Serializer):
+    until = serializers.DateField()
+    period = serializers.ChoiceField(choices=['day', 'week', 'month'], default='month')
+    based = serializers.ChoiceField(choices=['effective', 'real', 'both'], default='both')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['from'] = serializers.DateField()
+        return fields
+
+    def validate(self, data):
+        if data['from'] < timeseries.FIRST_DATE or data['until'] > timeseries.LAST_DATE:
+            raise serializers.ValidationError(
+                'Dates should be between {} and {}'.format(timeseries.FIRST_DATE, timeseries.LAST_DATE))
+        if data['from'] > data['until']:
+            raise serializers.ValidationError('"from" should not be after "until"')
+        if timeseries.count_points(data['from'], data['until'], data['period']) > timeseries.MAX_POINTS:
+            raise serializers.ValidationError(
+                'Too many points, at most {} can be asked for'.format(timeseries.MAX_POINTS))
+        return data
@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from itertools import chain
+
+from django.db.models import Case, Count, IntegerField, Q, Sum, When
+from django.db.models.functions import Coalesce
+
+from balances.models import MonthlyRollup
+from balances.services import cache
+from balances.services.calculator import CachedCalculator
+from balances.strategies.query import based
+from balances.strategies.query.dates import get_any_of
+from transactions import factories, query_operations
+from transactions.models import Transaction
+
+
+def calculate(user_id, queries):
+    """
+    Calculates several balances at once.
+    Queries sharing date window and filters are answered from a single query grouped by account and kind,
+    which carries effective and real values, so each format is taken from those rows without scanning again.
+    Results of cached calculators are read from and stored into balances cache.
+
+    :param user_id: Id that represents user, every calculator should be owned by them
+    :param queries: List of (calculator, filters) pairs
+    :return: List of results, in the same order of queries
+    """
+    results = [None] * len(queries)
+    groups = OrderedDict()
+    keys = {}
+
+    for index, (calculator, filters) in enumerate(queries):
+        if isinstance(calculator, CachedCalculator):
+            keys[index] = cache.get_key(calculator, filters)
+            results[index] = cache.get_result(keys[index])
+            if results[index] is not cache.MISSING:
+                continue
+
+        group = (_get_window(calculator.date_strategy), repr(sorted(filters.items())))
+        groups.setdefault(group, []).append(index)
+
+    for indexes in groups.values():
+        calculator, filters = queries[indexes[0]]
+        rows = get_rows(user_id, calculator.date_strategy, **filters)
+        occurrences = None
+
+        for index in indexes:
+            calculator, filters = queries[index]
+            result = calculator.format_stategy.apply_rows(rows, calculator.date_strategy.based)
+
+            window = calculator.date_strategy.get_virtual_window()
+            if window is not None:
+                # Strategies sharing dates only differ in whether occurrences count or not
+                if occurrences is None:
+                    occurrences = factories.get_virtual_occurrences(user_id, *window, **filters)
+                result = calculator.format_stategy.merge_virtual(result, occurrences)
+
+            if index in keys:
+                cache.set_result(keys[index], result)
+            results[index] = result
+
+    return results
+
+
+def get_rows(user_id, date_strategy, **filters):
+    """
+    Aggregates transactions considered by date strategy, whatever its based, by account and kind.
+    Without filters, months before the closed month of date strategy are read from monthly rollups,
+    so only transactions after it are aggregated.
+
+    :return: List of dicts with account_id, kind, effective_value, real_value, effective_count and real_count
+    """
+    based_filters = date_strategy.get_based_filters()
+    month = None if filters else date_strategy.get_closed_month()
+    if month is None:
+        return _get_transactions_rows(user_id, based_filters, **filters)
+
+    based_filters = {
+        based.EFFECTIVE: based_filters[based.EFFECTIVE] & Q(due_date__gte=month),
+        based.REAL: based_filters[based.REAL] & Q(payment_date__gte=month)
+    }
+    rows = OrderedDict()
+    for row in chain(_get_rollups_rows(user_id, month), _get_transactions_rows(user_id, based_filters)):
+        key = (row['account_id'], row['kind'])
+        if key not in rows:
+            rows[key] = row
+            continue
+
+        for field in ['effective_value', 'real_value', 'effective_count', 'real_count']:
+            rows[key][field] += row[field]
+
+    return list(rows.values())
+
+
+def _get_transactions_rows(user_id, based_filters, **filters):
+    return list(Transaction.objects
+                .owned_by(user_id)
+                .filter(get_any_of(based_filters), **filters)
+                .values('account_id', 'kind')
+                .annotate(
+                    effective_value=query_operations.sum_when(based_filters[based.EFFECTIVE]),
+                    real_value=query_operations.sum_when(based_filters[based.REAL]),
+                    effective_count=_count_when(based_filters[based.EFFECTIVE]),
+                    real_count=_count_when(based_filters[based.REAL]))
+                .order_by())
+
+
+def _get_rollups_rows(user_id, month):
+    # Rollups left with zero on a based don't count, the same as calculator does
+    rows = MonthlyRollup.objects\
+        .filter(account__user_id=user_id, month__lt=month)\
+        .values('account_id', 'kind')\
+        .annotate(
+            effective=Coalesce(Sum('effective_value'), 0),
+            real=Coalesce(Sum('real_value'), 0),
+            effective_count=_count_when(~Q(effective_value=0)),
+            real_count=_count_when(~Q(real_value=0)))\
+        .order_by()
+
+    return [{
+        'account_id': row['account_id'],
+        'kind': row['kind'],
+        'effective_value': row['effective'],
+        'real_value': row['real'],
+        'effective_count': row['effective_count'],
+        'real_count': row['real_count'],
+    } for row in rows]
+
+
+def _count_when(condition):
+    return Count(Case(When(condition, then=1), output_field=IntegerField()))
+
+
+def _get_window(date_strategy):
+    """Identifies date strategy dates, regardless of based"""
+    values = sorted((key, value) for key, value in vars(date_strategy).items() if key != 'based')
+    return type(date_strategy).__name__, repr(values)
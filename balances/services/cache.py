@@ -0,0 +1,95 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+
+CACHE_ALIAS = 'balances'
+HITS_KEY = 'balance:hits'
+MISSES_KEY = 'balance:misses'
+
+MISSING = object()
+"""Returned by get_result when there isn't a cached result, as None is a valid one"""
+
+
+def get_or_calculate(calculator, filters, calculate):
+    """
+    Gets calculator result from cache, calculating and storing it when missing.
+    Keys carry the user version, so any user write makes previous results unreachable.
+
+    :param calculator: Calculator whose user and strategies identify the result
+    :param filters: Filters result is calculated with
+    :param calculate: Callable receiving filters that does the real calculation
+    """
+    key = get_key(calculator, filters)
+    result = get_result(key)
+    if result is MISSING:
+        result = calculate(**filters)
+        set_result(key, result)
+
+    return result
+
+
+def get_result(key):
+    """Gets cached result of a key from get_key, counting hits and misses"""
+    result = caches[CACHE_ALIAS].get(key, MISSING)
+    _count(MISSES_KEY if result is MISSING else HITS_KEY)
+    return result
+
+
+def set_result(key, result):
+    caches[CACHE_ALIAS].set(key, result)
+
+
+def get_key(calculator, filters):
+    description = '|'.join([
+        calculator.date_strategy.get_cache_key(),
+        calculator.format_stategy.get_cache_key(),
+        repr(sorted(filters.items()))
+    ])
+    digest = hashlib.md5(description.encode('utf-8')).hexdigest()
+
+    return 'balance:{}:{}:{}'.format(calculator.user_id, get_version(calculator.user_id), digest)
+
+
+def get_version(user_id):
+    cache = caches[CACHE_ALIAS]
+    key = _get_version_key(user_id)
+
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def invalidate(user_ids):
+    """Bumps version of each user, called on every Transaction and Account write"""
+    cache = caches[CACHE_ALIAS]
+    for user_id in set(user_ids):
+        try:
+            cache.incr(_get_version_key(user_id))
+        except ValueError:
+            cache.set(_get_version_key(user_id), _new_version(), timeout=None)
+
+
+def get_stats():
+    cache = caches[CACHE_ALIAS]
+    return {'hits': cache.get(HITS_KEY, 0), 'misses': cache.get(MISSES_KEY, 0)}
+
+
+def _get_version_key(user_id):
+    return 'balance:version:{}'.format(user_id)
+
+
+def _new_version():
+    # Versions start from current time, so an evicted version never gets back to one used before
+    return int(time.time() * 1000000)
+
+
+def _count(key):
+    cache = caches[CACHE_ALIAS]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
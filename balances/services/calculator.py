@@ -1,9 +1,12 @@
-from django.db.models import Case, F, Q, Sum, When
-from django.db.models.functions import Coalesce
+from collections import defaultdict
+from itertools import chain
 
-from balances.models import PeriodBalance
-from balances.services import periods
-from transactions.models import Transaction
+from django.db.models import F, OuterRef, Q, Subquery
+
+from balances.models import MonthlyRollup, PeriodBalance
+from balances.services import cache, dirty_periods, periods
+from transactions import factories, query_operations
+from transactions.models import RecurrenceRule, Transaction
 
 
 class Calculator:
@@ -13,30 +16,94 @@ class Calculator:
         self.format_stategy = format_stategy
 
     def calculate(self, **filters):
-        query = Transaction.objects.owned_by(self.user_id).filter(**filters)
-        query = self.date_strategy.apply(query)
-        return self.format_stategy.apply(query)
+        split = self.date_strategy.split_closed() if self.format_stategy.use_rollups and not filters else None
+        if split is None:
+            query = Transaction.objects.owned_by(self.user_id).filter(**filters)
+            result = self.format_stategy.apply(self.date_strategy.apply(query))
+        else:
+            result = self._calculate_from_rollups(*split)
+
+        window = self.date_strategy.get_virtual_window()
+        if window is None:
+            return result
+
+        occurrences = factories.get_virtual_occurrences(self.user_id, *window, **filters)
+        return self.format_stategy.merge_virtual(result, occurrences)
+
+    def _calculate_from_rollups(self, month, tail_strategy):
+        """
+        Months before the given one are summed from monthly rollups, kept by every transaction write,
+        so only transactions of the last, partial month are aggregated.
+        """
+        rollups = MonthlyRollup.objects.filter(account__user_id=self.user_id, month__lt=month)
+        closed = self.format_stategy.apply_rollups(rollups, self.date_strategy.based)
+
+        query = tail_strategy.apply(Transaction.objects.owned_by(self.user_id))
+        return self.format_stategy.merge(closed, self.format_stategy.apply(query))
+
+
+class CachedCalculator(Calculator):
+    """
+    Calculator whose results are kept in balances cache until user writes anything
+    """
+    def calculate(self, **filters):
+        return cache.get_or_calculate(self, filters, super(CachedCalculator, self).calculate)
 
 #TODO: User / Account(s)
 def calculate_account_current_balance(account_id):
-    periods = PeriodBalance.objects.filter(account_id=account_id)
-    real = sum(x.closed_real_value for x in periods)
-    effective = sum(x.closed_effective_value for x in periods)
+    return calculate_accounts_current_balance([account_id])[account_id]
 
-    open_balance = _calculate_open_balance(account_id)    
 
-    return { 
-        'real': real + open_balance['real'], 
-        'effective': effective + open_balance['effective']
-    }
+def calculate_accounts_current_balance(account_ids):
+    """
+    Calculates current balance of several accounts at once,
+    with one query for the latest closed period of each account and another one over transactions after it.
+    Periods hold running balances, so only the latest one counts.
+    Periods of accounts with queued changes are outdated, so those are summed from transactions instead.
 
-def _calculate_open_balance(account_id):
+    :param account_ids: Ids of accounts, it may be a queryset of ids so it becomes a subquery
+    :return: Dict with real and effective balances keyed by account id
+    """
     start, end = periods.get_current_period()
+    dirty = dirty_periods.get_dirty_accounts(account_ids)
+    latest = (PeriodBalance.objects
+              .filter(account_id=OuterRef('account_id'), end_date__lt=start)
+              .exclude(account_id__in=dirty)
+              .order_by('-end_date'))
+
+    closed = (PeriodBalance.objects
+              .filter(account_id__in=account_ids, id=Subquery(latest.values('id')[:1]))
+              .values('account_id', effective=F('closed_effective_value'), real=F('closed_real_value')))
+    open_balances = _calculate_open_balances(account_ids, latest, end)
+
+    result = defaultdict(lambda: {'real': 0, 'effective': 0})
+    for balance in chain(closed, open_balances):
+        current = result[balance['account_id']]
+        current['real'] += balance['real']
+        current['effective'] += balance['effective']
+
+    return result
+
+
+def _calculate_open_balances(account_ids, latest, end):
+    """
+    Sums transactions after the latest closed period of each account, or every one without it, until end.
+    """
+    result = list(Transaction.objects
+                  .filter(account_id__in=account_ids)
+                  .annotate(closed_until=Subquery(latest.values('end_date')[:1]))
+                  .values('account_id', 'closed_until')
+                  .annotate(effective=_sum_after_closed('due_date', end), real=_sum_after_closed('payment_date', end))
+                  .order_by())
+
+    # Not materialized occurrences are out of period balances, so every one until now counts here
+    rules = RecurrenceRule.objects.filter(account_id__in=account_ids)
+    for occurrence in factories.get_virtual_occurrences_of(rules, None, end):
+        result.append({'account_id': occurrence.account_id, 'effective': occurrence.value, 'real': 0})
+
+    return result
+
 
-    return Transaction.objects.\
-        filter(account_id=account_id).\
-        in_date_range(start, end).\
-        aggregate(
-            effective=Coalesce(Sum('value'), 0), #TODO: quando cair num payment date não vai calcular um valor falso aqui? devo validar o due_date
-            real=Coalesce(Sum(Case(When(payment_date__isnull=False, then=F('value')), default=0)), 0)
-        )
+def _sum_after_closed(field, end):
+    after_closed = Q(closed_until__isnull=True) | Q(**{field + '__gt': F('closed_until')})
+    return query_operations.sum_when(after_closed, **{field + '__lte': end})
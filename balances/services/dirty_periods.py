@@ -0,0 +1,54 @@
+from django.db import transaction as db_transaction
+
+from balances.models import DirtyPeriod
+from balances.strategies.periods import BatchPeriodStrategy
+from transactions.models import Account
+
+BATCH_SIZE = 1000
+
+
+def enqueue(deltas):
+    """
+    Queues period changes, a single insert whatever the amount of accounts.
+
+    :param deltas: Dict of month deltas by account id, as given by BatchPeriodStrategy.get_deltas
+    """
+    DirtyPeriod.objects.bulk_create([
+        DirtyPeriod(account_id=account_id, month=month, effective_value=dif['effective'], real_value=dif['real'])
+        for account_id, account_deltas in deltas.items()
+        for month, dif in account_deltas.items()
+    ], batch_size=BATCH_SIZE)
+
+
+@db_transaction.atomic
+def process(batch_size=BATCH_SIZE):
+    """
+    Applies the oldest queued changes. Changes of each account are merged,
+    so its periods and current balance are updated once, however many changes it had.
+    Accounts are locked while updated, so several workers may run at once.
+
+    :return: Amount of queued changes applied
+    """
+    dirty = list(DirtyPeriod.objects.select_for_update(skip_locked=True).order_by('id')[:batch_size])
+    if not dirty:
+        return 0
+
+    account_ids = sorted(set(x.account_id for x in dirty))
+    list(Account.objects.select_for_update().filter(id__in=account_ids).order_by('id').values_list('id'))
+
+    strategy = BatchPeriodStrategy()
+    for change in dirty:
+        strategy.add_delta(change.account_id, change.month, change.effective_value, change.real_value)
+    strategy.run()
+
+    DirtyPeriod.objects.filter(id__in=[x.id for x in dirty]).delete()
+    return len(dirty)
+
+
+def get_dirty_accounts(account_ids):
+    """
+    Gets which accounts have queued changes, their periods shouldn't be trusted until processed.
+
+    :param account_ids: Ids of accounts, it may be a queryset of ids so it becomes a subquery
+    """
+    return set(DirtyPeriod.objects.filter(account_id__in=account_ids).values_list('account_id', flat=True))
@@ -0,0 +1,82 @@
+import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Sum
+
+from balances.models import MonthlyRollup
+from common import dates_utils
+from transactions import factories
+from transactions.models import HasKind
+
+KIND_KEYS = {
+    HasKind.EXPENSE_KIND: 'expenses',
+    HasKind.INCOME_KIND: 'incomes'
+}
+
+
+def sum_by_month(user_id, from_date, until_date):
+    """
+    Sums effective (by due date) and real (by payment date) values of user transactions month by month.
+    They are read from monthly rollups with a single range scan, at most one row per month and kind,
+    which are bucketed in a single pass. Months without transactions are filled with zeros.
+
+    :param from_date: Any date inside first month
+    :param until_date: Any date inside last month
+    :return: List of dicts ordered by date, the first day of month
+    """
+    months = get_months(from_date, until_date)
+    start, end = months[0], dates_utils.get_last_day_of(months[-1])
+    buckets = {month: create_empty_month(month) for month in months}
+
+    for row in _get_query(user_id, start, end):
+        bucket = buckets[row['month']]
+        _add(bucket, 'effective', row['kind'], row['effective'])
+        _add(bucket, 'real', row['kind'], row['real'])
+
+    report = [buckets[month] for month in months]
+    occurrences = factories.get_virtual_occurrences(user_id, start, end)
+    return factories.add_to_monthly_rows(report, occurrences)
+
+
+def get_months(from_date, until_date):
+    """
+    Gets first day of every month between both dates, both months included.
+    """
+    current = _to_date(from_date).replace(day=1)
+    last = _to_date(until_date).replace(day=1)
+
+    months = []
+    while current <= last:
+        months.append(current)
+        current += relativedelta(months=1)
+
+    return months
+
+
+def create_empty_month(month):
+    return {
+        'date': month,
+        'effective_expenses': 0,
+        'effective_incomes': 0,
+        'real_expenses': 0,
+        'real_incomes': 0,
+        'effective_total': 0,
+        'real_total': 0
+    }
+
+
+def _get_query(user_id, start, end):
+    return MonthlyRollup.objects\
+        .filter(account__user_id=user_id, month__range=[start, end])\
+        .values('month', 'kind')\
+        .annotate(effective=Sum('effective_value'), real=Sum('real_value'))\
+        .order_by()
+
+
+def _add(bucket, based, kind, value):
+    bucket['{}_{}'.format(based, KIND_KEYS[kind])] += value
+    bucket['{}_total'.format(based)] += value
+
+
+def _to_date(value):
+    return value.date() if isinstance(value, datetime.datetime) else value
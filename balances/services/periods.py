@@ -1,6 +1,8 @@
 import calendar
 import datetime
 
+from django.db.models import Case, DecimalField, F, Value, When
+
 
 def get_current_period():
     return get_period_from(datetime.date.today())
@@ -13,3 +15,52 @@ def get_period_from(date):
 
         return (start, end)
     return None
+
+def merge_deltas(deltas, by_month=False):
+    """
+    Merges (date, effective, real) tuples into a dict keyed by date (or month start),
+    dropping dates that don't change anything.
+    """
+    merged = {}
+    for date, effective, real in deltas:
+        if isinstance(date, datetime.datetime):
+            date = date.date()
+        if by_month:
+            date = date.replace(day=1)
+
+        cur = merged.setdefault(date, {'effective': 0, 'real': 0})
+        cur['effective'] += effective
+        cur['real'] += real
+
+    return {date: dif for date, dif in merged.items() if dif['effective'] or dif['real']}
+
+def cascade_deltas(periods, deltas):
+    """
+    Shifts every period that ends on or after each date by its deltas using a single UPDATE.
+
+    :param periods: PeriodBalance queryset, usually filtered by account
+    :param deltas: Dict as returned by merge_deltas
+    """
+    if not deltas:
+        return 0
+
+    return periods.filter(end_date__gte=min(deltas)).update(
+        closed_effective_value=F('closed_effective_value') + _shift(deltas, 'effective'),
+        closed_real_value=F('closed_real_value') + _shift(deltas, 'real')
+    )
+
+def _shift(deltas, key):
+    """
+    A period is shifted by the sum of every delta dated until its end,
+    so a single flat CASE picks the running sum of the latest date it covers.
+    """
+    output_field = DecimalField(max_digits=19, decimal_places=2)
+    running, whens = 0, []
+    for date, dif in sorted(deltas.items()):
+        if dif[key]:
+            running += dif[key]
+            whens.append(When(end_date__gte=date, then=Value(running)))
+
+    if not whens:
+        return Value(0, output_field=output_field)
+    return Case(*reversed(whens), default=Value(0), output_field=output_field)
@@ -0,0 +1,62 @@
+from django.db import transaction as db_transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from balances.models import DirtyPeriod, MonthlyRollup, PeriodBalance
+from balances.services import cache, rollups
+from balances.services.periods import get_period_from
+from transactions.models import Account
+
+
+@db_transaction.atomic
+def rebuild_balances(user_id=None):
+    """
+    Recreates monthly rollups, period balances and accounts current balances from transactions,
+    dropping queued period changes. Those may be stale when written before every transaction write kept them.
+
+    :param user_id: Rebuilds only that user balances when set
+    :return: Amount of period balances created
+    """
+    rollups.rebuild(user_id)
+
+    accounts = Account.objects.all()
+    if user_id is not None:
+        accounts = accounts.filter(user_id=user_id)
+
+    DirtyPeriod.objects.filter(account__in=accounts).delete()
+    PeriodBalance.objects.filter(account__in=accounts).delete()
+    created = PeriodBalance.objects.bulk_create(_get_periods(accounts), batch_size=rollups.BULK_CREATE_BATCH_SIZE)
+
+    totals = (MonthlyRollup.objects
+              .filter(account_id=OuterRef('id'))
+              .values('account_id')
+              .annotate(effective=Sum('effective_value'), real=Sum('real_value'))
+              .order_by())
+    output_field = DecimalField(max_digits=19, decimal_places=2)
+    accounts.update(
+        current_effective_balance=Coalesce(Subquery(totals.values('effective'), output_field=output_field), 0),
+        current_real_balance=Coalesce(Subquery(totals.values('real'), output_field=output_field), 0))
+
+    cache.invalidate(accounts.values_list('user_id', flat=True))
+    return len(created)
+
+
+def _get_periods(accounts):
+    """
+    Periods hold running balances, so each month with rollups gets the sum of every month until it.
+    """
+    months = (MonthlyRollup.objects
+              .filter(account__in=accounts)
+              .values('account_id', 'month')
+              .annotate(effective=Sum('effective_value'), real=Sum('real_value'))
+              .order_by('account_id', 'month'))
+
+    running = {}
+    for row in months:
+        effective, real = running.get(row['account_id'], (0, 0))
+        effective, real = effective + row['effective'], real + row['real']
+        running[row['account_id']] = effective, real
+
+        start, end = get_period_from(row['month'])
+        yield PeriodBalance(account_id=row['account_id'], start_date=start, end_date=end,
+                            closed_effective_value=effective, closed_real_value=real)
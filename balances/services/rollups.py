@@ -0,0 +1,163 @@
+import datetime
+from functools import reduce
+
+from django.db import transaction as db_transaction
+from django.db.models import Case, DateField, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+from balances.models import MonthlyRollup
+from balances.strategies.periods import CREATED, DELETED
+from transactions.models import Transaction
+
+BULK_CREATE_BATCH_SIZE = 500
+
+
+def get_deltas(action, transaction):
+    """
+    Gets how much a transaction change moves monthly rollups.
+    The values already applied are remembered in transaction itself,
+    so saving the same instance several times doesn't count its initial values twice.
+
+    :return: List of (account_id, month, kind, effective, real) tuples
+    """
+    deltas = []
+    if action != CREATED:
+        deltas += _get_deltas_of(*_get_applied_state(transaction), sign=-1)
+    if action != DELETED:
+        deltas += _get_deltas_of(*_get_state(transaction))
+
+    transaction._rollup_state = _get_state(transaction)
+    return deltas
+
+
+def get_changes_deltas(changes):
+    """
+    Same as get_deltas, for transactions changed without save.
+
+    :param changes: (before, after) states pairs, as sent by post_bulk_update, after is None when deleted
+    """
+    deltas = []
+    for before, after in changes:
+        deltas += _get_deltas_of(*before, sign=-1)
+        if after is not None:
+            deltas += _get_deltas_of(*after)
+    return deltas
+
+
+@db_transaction.atomic
+def apply_deltas(deltas):
+    """
+    Adds deltas to rollups, with constant amount of queries:
+    one to find existing rows, one bulk insert for missing rows and one UPDATE for the others.
+    """
+    merged = merge_deltas(deltas)
+    if not merged:
+        return
+
+    account_ids = {key[0] for key in merged}
+    months = {key[1] for key in merged}
+    existing = set(MonthlyRollup.objects
+                   .filter(account_id__in=account_ids, month__in=months)
+                   .values_list('account_id', 'month', 'kind'))
+
+    missing = [_create_rollup(key, values) for key, values in merged.items() if key not in existing]
+    MonthlyRollup.objects.bulk_create(missing, batch_size=BULK_CREATE_BATCH_SIZE)
+
+    to_update = {key: values for key, values in merged.items() if key in existing}
+    if to_update:
+        keys_filter = reduce(lambda acc, key: acc | _key_filter(key), to_update, Q())
+        MonthlyRollup.objects.filter(keys_filter).update(
+            effective_value=F('effective_value') + _case_of(to_update, 'effective'),
+            real_value=F('real_value') + _case_of(to_update, 'real'))
+
+
+def merge_deltas(deltas):
+    """
+    Merges deltas by (account_id, month, kind), dropping those that don't change anything.
+    """
+    merged = {}
+    for account_id, month, kind, effective, real in deltas:
+        values = merged.setdefault((account_id, month, kind), {'effective': 0, 'real': 0})
+        values['effective'] += effective
+        values['real'] += real
+
+    return {key: values for key, values in merged.items() if values['effective'] or values['real']}
+
+
+@db_transaction.atomic
+def rebuild(user_id=None):
+    """
+    Recreates rollups from scratch reading transactions once.
+
+    :param user_id: Rebuilds only that user rollups when set
+    """
+    rollups = MonthlyRollup.objects.all()
+    transactions = Transaction.objects.all()
+    if user_id is not None:
+        rollups = rollups.filter(account__user_id=user_id)
+        transactions = transactions.owned_by(user_id)
+
+    rows = transactions\
+        .annotate(
+            due_month=TruncMonth('due_date'),
+            # Truncating NULL fails on sqlite
+            payment_month=Case(When(payment_date__isnull=False, then=TruncMonth('payment_date')),
+                               output_field=DateField()))\
+        .values('account_id', 'due_month', 'payment_month', 'kind')\
+        .annotate(total=Sum('value'))\
+        .order_by()
+
+    deltas = []
+    for row in rows:
+        deltas.append((row['account_id'], row['due_month'], row['kind'], row['total'], 0))
+        if row['payment_month']:
+            deltas.append((row['account_id'], row['payment_month'], row['kind'], 0, row['total']))
+
+    rollups.delete()
+    created = [_create_rollup(key, values) for key, values in merge_deltas(deltas).items()]
+    MonthlyRollup.objects.bulk_create(created, batch_size=BULK_CREATE_BATCH_SIZE)
+
+    return len(created)
+
+
+def _get_state(transaction):
+    return (transaction.account_id, transaction.kind, transaction.value,
+            transaction.due_date, transaction.payment_date)
+
+
+def _get_applied_state(transaction):
+    if hasattr(transaction, '_rollup_state'):
+        return transaction._rollup_state
+
+    return (transaction.initial_account_id, transaction.initial_kind, transaction.initial_value,
+            transaction.initial_due_date, transaction.initial_payment_date)
+
+
+def _get_deltas_of(account_id, kind, value, due_date, payment_date, sign=1):
+    value = sign * value
+    deltas = [(account_id, _month_of(due_date), kind, value, 0)]
+    if payment_date:
+        deltas.append((account_id, _month_of(payment_date), kind, 0, value))
+    return deltas
+
+
+def _month_of(date):
+    if isinstance(date, datetime.datetime):
+        date = date.date()
+    return date.replace(day=1)
+
+
+def _key_filter(key):
+    account_id, month, kind = key
+    return Q(account_id=account_id, month=month, kind=kind)
+
+
+def _case_of(to_update, based):
+    whens = [When(_key_filter(key), then=Value(values[based])) for key, values in to_update.items()]
+    return Case(*whens, default=Value(0), output_field=DecimalField(max_digits=19, decimal_places=2))
+
+
+def _create_rollup(key, values):
+    account_id, month, kind = key
+    return MonthlyRollup(account_id=account_id, month=month, kind=kind,
+                         effective_value=values['effective'], real_value=values['real'])
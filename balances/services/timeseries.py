@@ -0,0 +1,155 @@
+import datetime
+from decimal import Decimal
+
+from dateutil.relativedelta import SU, relativedelta
+from django.db import connection
+from django.db.models import Sum
+from django.utils.dateparse import parse_date
+
+from balances.services import batch
+from balances.strategies.query import UntilDateStrategy, based
+from common import dates_utils
+from transactions import factories
+from transactions.models import Transaction
+
+DAY = 'day'
+WEEK = 'week'
+MONTH = 'month'
+PERIODS = [DAY, WEEK, MONTH]
+
+MAX_POINTS = 1000
+# Balances are seeded by the day before range, and weeks may end after it
+FIRST_DATE = datetime.date.min + relativedelta(days=1)
+LAST_DATE = datetime.date.max - relativedelta(weeks=1)
+
+RUNNING_SQL = '''
+    SELECT day,
+           SUM(SUM(effective_change)) OVER (ORDER BY day),
+           SUM(SUM(real_change)) OVER (ORDER BY day)
+    FROM (
+        SELECT effective_days.due_date AS day, effective_days.total AS effective_change, 0 AS real_change
+        FROM ({effective}) effective_days
+        UNION ALL
+        SELECT real_days.payment_date AS day, 0 AS effective_change, real_days.total AS real_change
+        FROM ({real}) real_days
+    ) changes
+    GROUP BY day
+    ORDER BY day
+'''
+
+
+def get_running_balances(user_id, from_date, until_date, period=MONTH):
+    """
+    Gets effective and real balances at the end of each day, week or month between both dates.
+    Balances are accumulated by a single window query over daily changes inside range,
+    seeded with balances before it, which are read from monthly rollups plus one partial month.
+    So cost depends on how many days have changes, not on the amount of points or history.
+
+    :param period: One of PERIODS, weeks end on sundays
+    :return: List of dicts with date, effective and real keys, the last point is always until_date
+    """
+    from_date = _to_date(from_date)
+    until_date = _to_date(until_date)
+
+    seed = _get_balances_before(user_id, from_date)
+    occurrences = sorted(factories.get_virtual_occurrences(user_id, None, until_date), key=lambda x: x.due_date)
+    running = _get_running_changes(user_id, from_date, until_date)
+
+    result = []
+    effective, real, cur_change, cur_occurrence = seed['effective'], seed['real'], 0, 0
+    changes = {'effective': 0, 'real': 0}
+    for point in get_points(from_date, until_date, period):
+        while cur_change < len(running) and running[cur_change][0] <= point:
+            changes['effective'], changes['real'] = running[cur_change][1:]
+            cur_change += 1
+        # Not materialized occurrences are never payed
+        while cur_occurrence < len(occurrences) and occurrences[cur_occurrence].due_date <= point:
+            effective += occurrences[cur_occurrence].value
+            cur_occurrence += 1
+
+        result.append({
+            'date': point,
+            'effective': effective + changes['effective'],
+            'real': real + changes['real']
+        })
+
+    return result
+
+
+def get_points(from_date, until_date, period):
+    """
+    Lists last day of each period between both dates, with until_date closing the last one
+    """
+    if period == DAY:
+        point, step = from_date, relativedelta(days=1)
+    elif period == WEEK:
+        point, step = from_date + relativedelta(weekday=SU), relativedelta(weeks=1)
+    else:
+        point, step = dates_utils.get_last_day_of(from_date), relativedelta(months=1, day=31)
+
+    points = []
+    while point < until_date:
+        points.append(point)
+        point += step
+
+    points.append(until_date)
+    return points
+
+
+def count_points(from_date, until_date, period):
+    """
+    Same as len(get_points(...)), without listing them
+    """
+    if period == DAY:
+        return (until_date - from_date).days + 1
+    if period == WEEK:
+        days = (until_date - (from_date + relativedelta(weekday=SU))).days
+        return max(-(-days // 7), 0) + 1
+    return (until_date.year - from_date.year) * 12 + until_date.month - from_date.month + 1
+
+
+def _get_balances_before(user_id, from_date):
+    date_strategy = UntilDateStrategy(from_date - relativedelta(days=1), based.BOTH)
+    rows = batch.get_rows(user_id, date_strategy)
+
+    return {
+        'effective': sum(row['effective_value'] for row in rows),
+        'real': sum(row['real_value'] for row in rows)
+    }
+
+
+def _get_running_changes(user_id, from_date, until_date):
+    """
+    Accumulates changes of every day inside range, days without changes are left out.
+
+    :return: List of (date, effective, real) tuples ordered by date
+    """
+    transactions = Transaction.objects.owned_by(user_id)
+    effective = transactions\
+        .filter(due_date__gte=from_date, due_date__lte=until_date)\
+        .values('due_date')\
+        .annotate(total=Sum('value'))\
+        .order_by()
+    real = transactions\
+        .filter(payment_date__gte=from_date, payment_date__lte=until_date)\
+        .values('payment_date')\
+        .annotate(total=Sum('value'))\
+        .order_by()
+
+    # Window functions aren't supported by this Django version, so grouped queries are wrapped by hand
+    effective_sql, effective_params = effective.query.sql_with_params()
+    real_sql, real_params = real.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(RUNNING_SQL.format(effective=effective_sql, real=real_sql), effective_params + real_params)
+        return [(_to_date(day), _to_decimal(effective), _to_decimal(real)) for day, effective, real in cursor]
+
+
+def _to_date(value):
+    if isinstance(value, str):
+        return parse_date(value)
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+
+def _to_decimal(value):
+    # Raw queries skip field converters, so sqlite gives back numbers as floats
+    return value if isinstance(value, Decimal) else Decimal(str(value)).quantize(Decimal('0.01'))
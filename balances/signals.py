@@ -1,56 +1,127 @@
-import datetime
+import threading
+from contextlib import contextmanager
 
+from django.conf import settings
 from django.db import transaction as db_transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
-from balances.factories import create_period_strategy
+from balances.services import cache, dirty_periods, rollups
+from balances.strategies.periods import CREATED, DELETED, UPDATED, BatchPeriodStrategy
+from transactions.models import Account, RecurrenceRule, Transaction
+from transactions.models import post_bulk_create, post_bulk_delete, post_bulk_update, post_import
 
+_deferred = threading.local()
+"""Deltas collected by deferred_updates of current thread"""
 
-# from django.db.models.signals import post_delete, post_save
-# from django.dispatch import receiver
-# from balances.strategies.periods import CREATED, DELETED, UPDATED
-# from transactions.models import Transaction
-# @receiver(post_save, sender=Transaction)
-# def created_or_updated_transaction_updates_balance(sender, instance=None, created=False, **kwargs):
-#     _strip_time_from_dates(instance)
-#     if not created:
-#         action = UPDATED
-#         if not requires_updates(instance):
-#             return
-#     else:
-#         action = CREATED
 
-#     trigger_updates(instance, action)
+@receiver(post_save, sender=Transaction)
+def created_or_updated_transaction_updates_balances(sender, instance=None, created=False, **kwargs):
+    _add_deltas(rollups.get_deltas(CREATED if created else UPDATED, instance))
 
 
-# @receiver(post_delete, sender=Transaction)
-# def deleted_transaction_updates_balance(sender, instance=None, **kwargs):
-#     trigger_updates(instance, DELETED)
+@receiver(post_delete, sender=Transaction)
+def deleted_transaction_updates_balances(sender, instance=None, **kwargs):
+    _add_deltas(rollups.get_deltas(DELETED, instance))
 
 
-@db_transaction.atomic
-def trigger_updates(instance, action):
-    strategy = create_period_strategy(action, instance)
-    strategy.run()
+@receiver(post_bulk_create, sender=Transaction)
+@receiver(post_import, sender=Transaction)
+def bulk_created_transactions_updates_balances(sender, instances=(), **kwargs):
+    """
+    Periodics and imports may touch years of history, so rollups, periods and current balances
+    of each account are updated once with the deltas of every created transaction.
+    """
+    _add_deltas([delta for instance in instances for delta in rollups.get_deltas(CREATED, instance)])
+
 
+@receiver(post_bulk_update, sender=Transaction)
+def bulk_updated_transactions_updates_balances(sender, changes=(), **kwargs):
+    _add_deltas(rollups.get_changes_deltas(changes))
 
-def requires_updates(transaction):
-    attrs = ['value', 'due_date', 'payment_date']
-    for attr in attrs:
-        if getattr(transaction, 'initial_' + attr) != getattr(transaction, attr):
-            return True
 
-    return False
+@receiver(post_bulk_delete, sender=Transaction)
+def bulk_deleted_transactions_updates_balances(sender, states=(), **kwargs):
+    _add_deltas(rollups.get_changes_deltas([(state, None) for state in states]))
 
 
-def _strip_time_from_dates(transaction):
+@contextmanager
+def deferred_updates():
     """
-    Strip time of transaction dates.
-    Sometimes because of tests some dates are in format "datetime" and others "date", which causes issues.
+    Collects deltas of every transaction written inside it, e.g. each one of a periodic series,
+    so rollups, periods and current balances are moved in a single pass on exit.
+    """
+    if getattr(_deferred, 'deltas', None) is not None:
+        yield
+        return
+
+    _deferred.deltas = []
+    try:
+        yield
+        deltas = _deferred.deltas
+    finally:
+        _deferred.deltas = None
+    _apply_deltas(deltas)
+
+
+def _add_deltas(deltas):
+    deferred = getattr(_deferred, 'deltas', None)
+    if deferred is None:
+        _apply_deltas(deltas)
+    else:
+        deferred.extend(deltas)
+
+
+@db_transaction.atomic
+def _apply_deltas(deltas):
+    """
+    Every write path ends here, so rollups, periods and current balances are moved by the same deltas.
+
+    :param deltas: (account_id, month, kind, effective, real) tuples, as given by rollups.get_deltas
     """
-    def strip(attr):
-        val = getattr(transaction, attr)
-        if isinstance(val, datetime.datetime):
-            setattr(transaction, attr, val.date())
+    rollups.apply_deltas(deltas)
 
-    for attr in ['due_date', 'payment_date', 'initial_due_date', 'initial_payment_date']:
-        strip(attr)
+    strategy = BatchPeriodStrategy()
+    for account_id, month, kind, effective, real in deltas:
+        strategy.add_delta(account_id, month, effective, real)
+    _run(strategy)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def written_instance_invalidates_cache(sender, instance=None, **kwargs):
+    cache.invalidate([instance.user_id])
+
+
+@receiver(post_save, sender=RecurrenceRule)
+@receiver(post_delete, sender=RecurrenceRule)
+def written_recurrence_invalidates_cache(sender, instance=None, **kwargs):
+    cache.invalidate(Account.objects.filter(id=instance.account_id).values_list('user_id', flat=True))
+
+
+@receiver(post_bulk_create, sender=Transaction)
+@receiver(post_import, sender=Transaction)
+def bulk_created_transactions_invalidates_cache(sender, instances=(), **kwargs):
+    cache.invalidate(x.user_id for x in instances)
+
+
+@receiver(post_bulk_update, sender=Transaction)
+@receiver(post_bulk_delete, sender=Transaction)
+def bulk_changed_transactions_invalidates_cache(sender, changes=None, states=None, **kwargs):
+    states = states if states is not None else [before for before, after in changes]
+    account_ids = set(account_id for account_id, kind, value, due_date, payment_date in states)
+    if account_ids:
+        cache.invalidate(Account.objects.filter(id__in=account_ids).values_list('user_id', flat=True))
+
+
+def _run(strategy):
+    """
+    Runs a BatchPeriodStrategy, unless BALANCES_ASYNC_PERIODS is set,
+    then its deltas are queued for process_dirty_periods command.
+    """
+    if settings.BALANCES_ASYNC_PERIODS:
+        dirty_periods.enqueue(strategy.get_deltas())
+    else:
+        strategy.run()
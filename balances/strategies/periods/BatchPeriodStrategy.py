@@ -0,0 +1,92 @@
+from collections import defaultdict
+
+from django.db.models import F
+
+from balances.models import PeriodBalance
+from balances.services import rollups
+from balances.services.periods import cascade_deltas, get_period_from, merge_deltas
+from transactions.models import Account
+
+
+class BatchPeriodStrategy:
+    """
+    Strategy to be triggered when several transactions are changed at once
+    (e.g. periodic transactions created, patched or deleted).
+    Changes are merged into deltas per account and month, so every account
+    gets its periods and current balance updated only once.
+    """
+
+    def __init__(self, changes=()):
+        """
+        Initializes strategy class
+
+        :param changes: List of (action, transaction) pairs
+        """
+        self.deltas = defaultdict(list)
+        for action, transaction in changes:
+            self.add(action, transaction)
+
+    def add(self, action, transaction):
+        for account_id, month, kind, effective, real in rollups.get_deltas(action, transaction):
+            self.add_delta(account_id, month, effective, real)
+
+    def add_delta(self, account_id, date, effective=0, real=0):
+        """Adds an already computed delta, e.g. aggregated straight from database"""
+        self.deltas[account_id].append((date, effective, real))
+
+    def get_deltas(self):
+        merged = {account_id: merge_deltas(deltas, by_month=True) for account_id, deltas in self.deltas.items()}
+        return {account_id: deltas for account_id, deltas in merged.items() if deltas}
+
+    def run(self):
+        deltas = self.get_deltas()
+        self.create_missing_periods(deltas)
+
+        for account_id, account_deltas in deltas.items():
+            cascade_deltas(PeriodBalance.objects.filter(account_id=account_id), account_deltas)
+            self.update_current_balance(account_id, account_deltas)
+
+    def create_missing_periods(self, deltas):
+        """
+        Creates periods deltas fall on that don't exist yet, open and future ones too.
+        Every delta is shifted to next periods and each month with changes has its period,
+        so a new period starts from the values of the latest period before it, not from zero.
+        """
+        expected = set(
+            (account_id, month)
+            for account_id, account_deltas in deltas.items()
+            for month in account_deltas
+        )
+        if not expected:
+            return []
+
+        existing = PeriodBalance.objects\
+            .filter(account_id__in=set(x[0] for x in expected), start_date__lte=max(x[1] for x in expected))\
+            .order_by('account_id', 'start_date')\
+            .values_list('account_id', 'start_date', 'closed_effective_value', 'closed_real_value')
+        periods = defaultdict(list)
+        for account_id, start_date, effective, real in existing:
+            periods[account_id].append((start_date, effective, real))
+
+        missing = sorted(expected - set((account_id, x[0]) for account_id, values in periods.items() for x in values))
+        return PeriodBalance.objects.bulk_create([
+            self._create_period(account_id, month, periods[account_id]) for account_id, month in missing
+        ])
+
+    @staticmethod
+    def _create_period(account_id, month, periods):
+        previous = [x for x in periods if x[0] < month]
+        start_date, effective, real = previous[-1] if previous else (None, 0, 0)
+        return PeriodBalance(
+            account_id=account_id,
+            start_date=month,
+            end_date=get_period_from(month)[1],
+            closed_effective_value=effective,
+            closed_real_value=real
+        )
+
+    def update_current_balance(self, account_id, deltas):
+        Account.objects.filter(id=account_id).update(
+            current_effective_balance=F('current_effective_balance') + sum(x['effective'] for x in deltas.values()),
+            current_real_balance=F('current_real_balance') + sum(x['real'] for x in deltas.values())
+        )
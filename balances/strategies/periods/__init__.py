@@ -1,17 +1,7 @@
 from .actions import CREATED, DELETED, UPDATED
-from .BaseStrategy import BaseStrategy
-from .CascadeStrategy import CascadeStrategy
-from .CreateStrategy import CreateStrategy
-from .ChangedAccountStrategy import ChangedAccountStrategy
-from .UpdateStrategy import UpdateStrategy
-from .DeleteStrategy import DeleteStrategy
+from .BatchPeriodStrategy import BatchPeriodStrategy
 
 __all__ = [
-    "CREATED", "DELETED", "UPDATED", 
-    "BaseStrategy", 
-    "CascadeStrategy", 
-    "CreateStrategy", 
-    "ChangedAccountStrategy", 
-    "UpdateStrategy", 
-    "DeleteStrategy"
-]
\ No newline at end of file
+    "CREATED", "DELETED", "UPDATED",
+    "BatchPeriodStrategy"
+]
@@ -1,3 +1,4 @@
+import datetime
 from abc import ABC, abstractmethod
 
 
@@ -7,6 +8,74 @@ class BaseStrategy(ABC):
     handles specific queries about balance
     """
 
+    use_rollups = False
+    """Whether format strategy can also be applied over monthly rollups, see apply_rollups"""
+
     @abstractmethod
     def apply(self, query):
         pass
+
+    def get_cache_key(self):
+        """
+        Describes what strategy computes, so equal strategies share cached results.
+        Datetimes count only by date, as every date field filtered is a DateField.
+        """
+        def describe(value):
+            if isinstance(value, BaseStrategy):
+                return value.get_cache_key()
+            return value.date() if isinstance(value, datetime.datetime) else value
+
+        values = ','.join('{}={!r}'.format(key, describe(value)) for key, value in sorted(vars(self).items()))
+        return '{}({})'.format(type(self).__name__, values)
+
+    def get_virtual_window(self):
+        """
+        Gets (from, until) dates where not materialized recurrence occurrences count,
+        None when they shouldn't be considered at all.
+        """
+        return None
+
+    def get_based_filters(self):
+        """
+        Gets what each based (effective and real) considers, as a dict of Q objects keyed by based
+        """
+        raise NotImplementedError()
+
+    def get_closed_month(self):
+        """
+        Gets first day of the month before which everything considered can be read from monthly rollups,
+        None when there's no such month
+        """
+        return None
+
+    def split_closed(self):
+        """
+        Gets (month, tail strategy) when everything before month can be read from monthly rollups,
+        so only tail strategy is applied over transactions. None when query can't be split.
+        """
+        return None
+
+    def apply_rollups(self, rollups, based):
+        """
+        Aggregates monthly rollups into the same format apply gives, only used when use_rollups is set
+        """
+        raise NotImplementedError()
+
+    def apply_rows(self, rows, based):
+        """
+        Gets the same format apply gives from transactions already aggregated by account and kind,
+        see balances.services.batch
+        """
+        raise NotImplementedError()
+
+    def merge(self, result, other):
+        """
+        Adds two applied results together
+        """
+        raise NotImplementedError()
+
+    def merge_virtual(self, result, occurrences):
+        """
+        Adds not materialized recurrence occurrences to an applied result
+        """
+        return result
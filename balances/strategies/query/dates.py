@@ -1,3 +1,7 @@
+import datetime
+
+from django.db.models import Q
+
 from .based import BOTH, EFFECTIVE, REAL
 from .BaseStrategy import BaseStrategy
 
@@ -17,9 +21,22 @@ class OnDateStrategy(BaseStrategy):
         self.based = based
 
     def apply(self, query):
+        if self.based == BOTH:
+            return query.filter(get_any_of(self.get_based_filters()))
+
         kwargs = { self.based: self.date }
         return query.filter(**kwargs)
 
+    def get_based_filters(self):
+        return {
+            EFFECTIVE: Q(due_date=self.date),
+            REAL: Q(payment_date=self.date)
+        }
+
+    def get_virtual_window(self):
+        if self.based != REAL:
+            return self.date, self.date
+
 class BetweenDateStrategy(BaseStrategy):
     """
     Filters query to care about a date range
@@ -47,6 +64,16 @@ class BetweenDateStrategy(BaseStrategy):
         #Used only for complete format balance
         return query.in_date_range(self.from_date, self.until_date)
 
+    def get_based_filters(self):
+        return {
+            EFFECTIVE: Q(due_date__gte=self.from_date, due_date__lte=self.until_date),
+            REAL: Q(payment_date__gte=self.from_date, payment_date__lte=self.until_date)
+        }
+
+    def get_virtual_window(self):
+        if self.based != REAL:
+            return self.from_date, self.until_date
+
 class UntilDateStrategy(BaseStrategy):
     """
     Filters query to a limit date only
@@ -62,6 +89,35 @@ class UntilDateStrategy(BaseStrategy):
         self.based = based
 
     def apply(self, query):
+        if self.based == BOTH:
+            return query.filter(get_any_of(self.get_based_filters()))
+
         key = "{}__lte".format(self.based)
         kwargs = { key: self.until_date }
         return query.filter(**kwargs)
+
+    def get_based_filters(self):
+        return {
+            EFFECTIVE: Q(due_date__lte=self.until_date),
+            REAL: Q(payment_date__lte=self.until_date)
+        }
+
+    def get_virtual_window(self):
+        if self.based != REAL:
+            return None, self.until_date
+
+    def get_closed_month(self):
+        month = self.until_date.replace(day=1)
+        return month.date() if isinstance(month, datetime.datetime) else month
+
+    def split_closed(self):
+        if self.based != BOTH:
+            month = self.get_closed_month()
+            return month, BetweenDateStrategy(month, self.until_date, self.based)
+
+
+def get_any_of(based_filters):
+    """
+    Joins filters of every based, so a single query gets what both effective and real balances need
+    """
+    return based_filters[EFFECTIVE] | based_filters[REAL]
@@ -4,14 +4,33 @@ from django.db.models.functions import TruncMonth
 from transactions import query_operations
 from transactions.models import Account, HasKind
 
+from .based import EFFECTIVE, REAL
 from .BaseStrategy import BaseStrategy
 from .outputs import EXPENSES, INCOMES, TOTAL
 
+VALUE_FIELDS = {
+    EFFECTIVE: 'effective_value',
+    REAL: 'real_value'
+}
+"""Fields with the value of each based, both in monthly rollups and in grouped rows"""
+
+COUNT_FIELDS = {
+    EFFECTIVE: 'effective_count',
+    REAL: 'real_count'
+}
+"""Fields of grouped rows with how many transactions each based considers"""
+
+OUTPUT_KINDS = {
+    EXPENSES: HasKind.EXPENSE_KIND,
+    INCOMES: HasKind.INCOME_KIND
+}
+
 
 class PlainFormatStrategy(BaseStrategy):
     """
     Aggregates balance to generate a plain value
     """
+    use_rollups = True
 
     def __init__(self, output=TOTAL):
         """
@@ -29,10 +48,38 @@ class PlainFormatStrategy(BaseStrategy):
             
         return query.aggregate(Sum('value'))['value__sum']
 
+    def apply_rollups(self, rollups, based):
+        rollups, field = filter_rollups(rollups, based)
+        if self.output == EXPENSES:
+            rollups = rollups.filter(kind=HasKind.EXPENSE_KIND)
+        elif self.output == INCOMES:
+            rollups = rollups.filter(kind=HasKind.INCOME_KIND)
+
+        return rollups.aggregate(value=Sum(field))['value']
+
+    def apply_rows(self, rows, based):
+        rows = filter_rows(rows, based, OUTPUT_KINDS.get(self.output))
+        return sum_rows(rows, based) if rows else None
+
+    def merge(self, result, other):
+        return sum_values(result, other)
+
+    def merge_virtual(self, result, occurrences):
+        if self.output == EXPENSES:
+            occurrences = [x for x in occurrences if x.kind == HasKind.EXPENSE_KIND]
+        elif self.output == INCOMES:
+            occurrences = [x for x in occurrences if x.kind == HasKind.INCOME_KIND]
+
+        if not occurrences:
+            return result
+
+        return (result or 0) + sum(x.value for x in occurrences)
+
 class DetailedFormatStrategy(BaseStrategy):
     """
     Annotates balance split in expenses, incomes and total values
     """
+    use_rollups = True
 
     def apply(self, query):
         return query.aggregate(
@@ -41,22 +88,67 @@ class DetailedFormatStrategy(BaseStrategy):
             total=Sum('value')
         )
 
+    def apply_rollups(self, rollups, based):
+        rollups, field = filter_rollups(rollups, based)
+        return rollups.aggregate(
+            incomes=query_operations.sum_when(field=field, kind=HasKind.INCOME_KIND),
+            expenses=query_operations.sum_when(field=field, kind=HasKind.EXPENSE_KIND),
+            total=Sum(field)
+        )
+
+    def apply_rows(self, rows, based):
+        rows = filter_rows(rows, based)
+        return {
+            'incomes': sum_rows(rows, based, HasKind.INCOME_KIND),
+            'expenses': sum_rows(rows, based, HasKind.EXPENSE_KIND),
+            'total': sum_rows(rows, based) if rows else None
+        }
+
+    def merge(self, result, other):
+        return {key: sum_values(value, other[key]) for key, value in result.items()}
+
+    def merge_virtual(self, result, occurrences):
+        return sum_by_kind(result, occurrences)
+
 class CompleteFormatStrategy(BaseStrategy):
     """
     Annotates balance split in expenses, incomes and total values AND effective/real.
-    Based doesn't matter here.
+    Based doesn't matter here, both are aggregated in a single query.
     """
 
+    def __init__(self, date_strategy):
+        """
+        Initializes strategy class
+
+        :param date_strategy: Strategy that filters query, it tells what each based considers
+        """
+        self.date_strategy = date_strategy
+
     def apply(self, query):
-        raise Exception("NOT FINISHED YET")
-        return query.aggregate(
-                effective_expenses=query_operations.sum_effective_kind(HasKind.EXPENSE_KIND),
-                effective_incomes=query_operations.sum_effective_kind(HasKind.INCOME_KIND),
-                real_expenses=query_operations.sum_real_kind(HasKind.EXPENSE_KIND),
-                real_incomes=query_operations.sum_real_kind(HasKind.INCOME_KIND),
-                effective_total=query_operations.sum_effective(),
-                real_total=query_operations.sum_real()
-            )
+        filters = self.date_strategy.get_based_filters()
+        result = query.aggregate(
+            effective_expenses=query_operations.sum_when(filters[EFFECTIVE], kind=HasKind.EXPENSE_KIND),
+            effective_incomes=query_operations.sum_when(filters[EFFECTIVE], kind=HasKind.INCOME_KIND),
+            real_expenses=query_operations.sum_when(filters[REAL], kind=HasKind.EXPENSE_KIND),
+            real_incomes=query_operations.sum_when(filters[REAL], kind=HasKind.INCOME_KIND)
+        )
+        return add_totals(result)
+
+    def apply_rows(self, rows, based):
+        result = {}
+        for prefix, row_based in [('effective_', EFFECTIVE), ('real_', REAL)]:
+            result[prefix + 'expenses'] = sum_rows(rows, row_based, HasKind.EXPENSE_KIND)
+            result[prefix + 'incomes'] = sum_rows(rows, row_based, HasKind.INCOME_KIND)
+
+        return add_totals(result)
+
+    def merge_virtual(self, result, occurrences):
+        # Not materialized occurrences are never payed
+        for occurrence in occurrences:
+            key = 'effective_incomes' if occurrence.kind == HasKind.INCOME_KIND else 'effective_expenses'
+            result[key] += occurrence.value
+
+        return add_totals(result)
 
 class DetailedAccountFormatStrategy(BaseStrategy):
     """
@@ -79,13 +171,28 @@ class DetailedAccountFormatStrategy(BaseStrategy):
         )\
         .order_by('account')
 
+        return self.add_missing_accounts(list(accounts))
+
+    def apply_rows(self, rows, based):
+        rows = filter_rows(rows, based)
+        result = []
+        for account in sorted(set(row['account_id'] for row in rows)):
+            account_rows = [row for row in rows if row['account_id'] == account]
+            result.append({
+                'account': account,
+                'incomes': sum_rows(account_rows, based, HasKind.INCOME_KIND),
+                'expenses': sum_rows(account_rows, based, HasKind.EXPENSE_KIND),
+                'total': sum_rows(account_rows, based)
+            })
+
+        return self.add_missing_accounts(result)
+
+    def add_missing_accounts(self, result):
         missing_accounts = Account.objects\
             .filter(user_id=self.user_id)\
-            .exclude(id__in=accounts.values_list('account_id', flat=True))\
+            .exclude(id__in=[x['account'] for x in result])\
             .values_list('id', flat=True)
 
-        result = list(accounts)
-
         for missing in missing_accounts:
             result.append({
                 'account': missing,
@@ -95,3 +202,60 @@ class DetailedAccountFormatStrategy(BaseStrategy):
             })
 
         return result
+
+    def merge_virtual(self, result, occurrences):
+        by_account = {x['account']: x for x in result}
+        for occurrence in occurrences:
+            sum_by_kind(by_account[occurrence.account_id], [occurrence])
+
+        return result
+
+
+def sum_by_kind(result, occurrences):
+    """
+    Adds occurrences values into a dict with incomes, expenses and total keys
+    """
+    for occurrence in occurrences:
+        key = 'incomes' if occurrence.kind == HasKind.INCOME_KIND else 'expenses'
+        result[key] = (result[key] or 0) + occurrence.value
+        result['total'] = (result['total'] or 0) + occurrence.value
+
+    return result
+
+
+def add_totals(result):
+    for based in ['effective', 'real']:
+        result[based + '_total'] = result[based + '_incomes'] + result[based + '_expenses']
+
+    return result
+
+
+def filter_rollups(rollups, based):
+    """
+    Gets rollups that count for based and the field to be summed.
+    Rollups of the other date are left with zero, those are dropped so nothing aggregated is still None.
+    """
+    field = VALUE_FIELDS[based]
+    return rollups.exclude(**{field: 0}), field
+
+
+def filter_rows(rows, based, kind=None):
+    """
+    Gets grouped rows with transactions considered by based, of the given kind only when set.
+    Grouped rows are dicts with account_id, kind, value fields and count fields of each based.
+    """
+    return [row for row in rows if row[COUNT_FIELDS[based]] and (kind is None or row['kind'] == kind)]
+
+
+def sum_rows(rows, based, kind=None):
+    return sum(row[VALUE_FIELDS[based]] for row in rows if kind is None or row['kind'] == kind)
+
+
+def sum_values(value, other):
+    """
+    Adds aggregated values, which are None when nothing was aggregated
+    """
+    if value is None or other is None:
+        return other if value is None else value
+
+    return value + other
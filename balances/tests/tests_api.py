@@ -93,6 +93,24 @@ class BalanceApiIntegrationTestCase(UserDataTestSetupMixin, APITestCase, BaseTes
         response = self.client.get(reverse('detailed-balance') + "?from=2017-1-1&until=2017-12-31")
         self.assert_detailed_response(response, 1900, -1200, 700)
 
+    def test_get_effective_and_real_balances_at_once(self):
+        self.create_transaction(-100, due_date=datetime(2017, 1, 1), payment_date=datetime(2018, 1, 1))
+        self.create_transaction(-300, due_date=datetime(2017, 3, 1), payment_date=datetime(2017, 3, 1))
+        self.create_transaction(1000, due_date=datetime(2016, 12, 1), payment_date=datetime(2017, 2, 1))
+        self.create_transaction(900, due_date=datetime(2017, 7, 1))
+        self.create_transaction(-50, due_date=datetime(2018, 1, 1))
+        expected = {
+            'effective_incomes': 900, 'effective_expenses': -400, 'effective_total': 500,
+            'real_incomes': 1000, 'real_expenses': -300, 'real_total': 700
+        }
+
+        urls = [reverse('complete-balance') + '?from=2017-1-1&until=2017-12-31',
+                reverse('detailed-balance') + '?based=both&from=2017-1-1&until=2017-12-31']
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data, expected)
+
     def assert_detailed_response(self, response, incomes, expenses, total):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['expenses'], expenses)
@@ -0,0 +1,174 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from balances.services import cache
+from common.tests_helpers import BenchmarkTestHelper, benchmark
+from transactions.models import Transaction, post_bulk_create
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class BatchBalanceApiTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, APITestCase, BaseTestHelperFactory):
+    ENDPOINTS = {
+        'plain': 'plain-balance',
+        'detailed': 'detailed-balance',
+        'complete': 'complete-balance',
+        'accounts': 'detailed-balance-by-account',
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        savings = cls.create_account(name='savings')
+        cls.create_account(name='empty')
+        cls.create_transaction(-10, due_date=date(2016, 12, 5), payment_date=date(2017, 2, 10))
+        cls.create_transaction(-20, due_date=date(2017, 1, 15), payment_date=date(2017, 1, 16))
+        cls.create_transaction(50, due_date=date(2017, 2, 10), payment_date=date(2017, 2, 20),
+                               category=cls.income_category)
+        cls.create_transaction(-5, due_date=date(2017, 2, 21))
+        cls.create_transaction(100, account=savings, due_date=date(2017, 1, 1), category=cls.income_category)
+
+        other_user, _ = cls.create_user('other', email='other@test.com', password='pass')
+        cls.create_transaction(1000, account=cls.create_account(user=other_user), due_date=date(2017, 1, 1))
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def test_same_results_as_each_endpoint(self):
+        for dates in [{'until': '2017-02-20'}, {'from': '2017-01-01', 'until': '2017-02-15'}, {'date': '2017-01-16'}]:
+            queries = [
+                dict(format='plain', **dates),
+                dict(format='plain', based='real', **dates),
+                dict(format='plain', pending=True, **dates),
+                dict(format='detailed', based='real', **dates),
+                dict(format='detailed', pending=True, **dates),
+                dict(format='complete', **dates),
+                dict(format='accounts', **dates),
+            ]
+
+            response = self.client.post(reverse('batch-balance'), queries, format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+            self.assertEqual(len(response.data['results']), len(queries))
+            for query, result in zip(queries, response.data['results']):
+                self.assertEqual(result, self.get_from_endpoint(query), query)
+
+    def test_aggregates_queries_sharing_dates_together(self):
+        queries = [
+            {'format': 'plain', 'from': '2017-01-01', 'until': '2017-01-31'},
+            {'format': 'detailed', 'based': 'real', 'from': '2017-01-01', 'until': '2017-01-31'},
+            {'format': 'complete', 'from': '2017-01-01', 'until': '2017-01-31'},
+        ]
+
+        # Authentication, aggregate and recurrences
+        with self.assertNumQueries(4):
+            self.client.post(reverse('batch-balance'), queries, format='json')
+        # Only authentication once cached
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('batch-balance'), queries, format='json')
+
+        self.assertEqual(response.data['results'][0], 80)
+        self.assertEqual(cache.get_stats(), {'hits': 3, 'misses': 3})
+
+    def test_reads_closed_months_from_rollups(self):
+        queries = [{'format': 'plain', 'until': '2017-02-20'}, {'format': 'accounts', 'until': '2017-02-20'}]
+
+        # Authentication, rollups, partial month, recurrences and accounts
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse('batch-balance'), queries, format='json')
+
+        self.assertEqual(response.data['results'][0], 120)
+
+    def test_plain_outputs(self):
+        queries = [{'format': 'plain', 'based': 'real', 'until': '2017-02-20', 'output': output}
+                   for output in ['total', 'expenses', 'incomes']]
+
+        response = self.client.post(reverse('batch-balance'), queries, format='json')
+
+        self.assertEqual(response.data['results'], [20, -30, 50])
+
+    def test_validates_queries(self):
+        invalid = [
+            [{'format': 'unknown'}],
+            [{'format': 'plain', 'based': 'unknown'}],
+            [{'format': 'plain', 'until': 'today'}],
+            [{'format': 'plain'}] * 21,
+        ]
+        for queries in invalid:
+            response = self.client.post(reverse('batch-balance'), queries, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, queries)
+
+    def get_from_endpoint(self, query):
+        params = {key: value for key, value in query.items() if key != 'format'}
+        if params.pop('pending', False):
+            params['pending'] = 1
+
+        response = self.client.get(reverse(self.ENDPOINTS[query['format']]), params)
+        return response.data['balance'] if query['format'] == 'plain' else response.data
+
+
+@benchmark
+class BatchBalanceBenchmarkTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase,
+                                    BenchmarkTestHelper):
+    SIZES = [10000, 100000]
+    MONTHS = 120
+    BATCH_SIZE = 5000
+    QUERIES = [
+        {'format': 'plain', 'from': '2017-01-01', 'until': '2017-12-31'},
+        {'format': 'detailed', 'from': '2017-01-01', 'until': '2017-12-31'},
+        {'format': 'detailed', 'based': 'real', 'from': '2017-01-01', 'until': '2017-12-31'},
+        {'format': 'accounts', 'from': '2017-01-01', 'until': '2017-12-31'},
+    ]
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def test_benchmark_batch(self):
+        rows = []
+        created = 0
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+
+            cache.invalidate([self.user.id])
+            _, elapsed, queries = self.measure(
+                self.client.post, reverse('batch-balance'), self.QUERIES, format='json')
+            cache.invalidate([self.user.id])
+            _, separated_elapsed, separated_queries = self.measure(self.request_separately)
+
+            rows.append((size, queries, '{:.1f}'.format(elapsed * 1000),
+                         separated_queries, '{:.1f}'.format(separated_elapsed * 1000)))
+
+        self.report('balances batch vs separated requests ({} queries over a year)'.format(len(self.QUERIES)),
+                    ['transactions', 'queries', 'ms', 'separated queries', 'separated ms'], rows)
+
+    def request_separately(self):
+        names = {'plain': 'plain-balance', 'detailed': 'detailed-balance', 'accounts': 'detailed-balance-by-account'}
+        for query in self.QUERIES:
+            params = {key: value for key, value in query.items() if key != 'format'}
+            self.client.get(reverse(names[query['format']]), params)
+
+    def create_transactions(self, start, end):
+        for batch_start in range(start, end, self.BATCH_SIZE):
+            batch = [self.create_unsaved(i) for i in range(batch_start, min(batch_start + self.BATCH_SIZE, end))]
+            Transaction.objects.bulk_create(batch, batch_size=500)
+            post_bulk_create.send(sender=Transaction, instances=batch)
+
+    def create_unsaved(self, i):
+        due_date = date(2015, 1, 1) + relativedelta(months=i % self.MONTHS, days=i % 28)
+        is_income = i % 4 == 0
+
+        return Transaction(
+            account=self.account,
+            user=self.user,
+            category=self.income_category if is_income else self.expense_category,
+            kind=Transaction.INCOME_KIND if is_income else Transaction.EXPENSE_KIND,
+            value=10 if is_income else -10,
+            description='benchmark',
+            due_date=due_date,
+            payment_date=due_date + relativedelta(days=i % 45) if i % 3 else None
+        )
@@ -0,0 +1,166 @@
+import time
+from datetime import date, datetime
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from balances.services import cache
+from common.cache import LRULocMemCache
+from transactions.factories import create_recurrence, update_transactions
+from transactions.models import Category, Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class BalanceCacheApiTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase):
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+        self.transaction = self.create_transaction(-10, due_date=date(2017, 1, 10))
+
+    def test_repeated_request_is_served_from_cache(self):
+        self.get_balance()
+
+        with self.assertNumQueries(2):  # Authentication only
+            response = self.get_balance()
+
+        self.assertEqual(response.data['balance'], -10)
+        self.assertEqual(cache.get_stats(), {'hits': 1, 'misses': 1})
+
+    def test_transaction_write_invalidates(self):
+        self.get_balance()
+
+        self.transaction.value = -30
+        self.transaction.save()
+
+        self.assertEqual(self.get_balance().data['balance'], -30)
+
+    def test_account_write_invalidates(self):
+        version = cache.get_version(self.user.id)
+
+        self.account.name = 'renamed'
+        self.account.save()
+
+        self.assertGreater(cache.get_version(self.user.id), version)
+
+    def test_bulk_update_invalidates(self):
+        self.get_balance('?based=real')
+
+        update_transactions(Transaction.objects.filter(id=self.transaction.id), payment_date=date(2017, 1, 10))
+
+        self.assertEqual(self.get_balance('?based=real').data['balance'], -10)
+
+    def test_recurrence_write_invalidates(self):
+        self.get_balance()
+
+        self.create_recurrence()
+
+        self.assertEqual(self.get_balance().data['balance'], -110)
+
+    def test_recurrence_delete_invalidates(self):
+        rule = self.create_recurrence()[0].recurrence
+        self.get_balance()
+
+        self.client.delete(reverse('recurrence', kwargs={'pk': rule.id}))
+
+        self.assertEqual(self.get_balance().data['balance'], -10)
+
+    def test_category_kind_change_invalidates(self):
+        self.get_balance()
+
+        url = reverse('category', kwargs={'pk': self.expense_category.id})
+        self.client.put(url, {'name': self.expense_category.name, 'kind': Category.INCOME_KIND}, format='json')
+
+        self.assertEqual(self.get_balance().data['balance'], 10)
+
+    def test_other_users_are_kept(self):
+        other_user, _ = self.create_user('other', email='other@test.com', password='pass')
+        version = cache.get_version(other_user.id)
+
+        self.create_transaction(-5, due_date=date(2017, 1, 10))
+
+        self.assertEqual(cache.get_version(other_user.id), version)
+
+    def test_params_get_their_own_entries(self):
+        self.create_transaction(20, due_date=date(2017, 1, 20), category=self.income_category)
+
+        self.assertEqual(self.get_balance().data['balance'], 10)
+        self.assertEqual(self.get_balance('&pending=1').data['balance'], 10)
+        self.assertEqual(self.get_balance('&based=real').data['balance'], None)
+        self.assertEqual(cache.get_stats(), {'hits': 0, 'misses': 3})
+
+    def test_command_shows_stats(self):
+        self.get_balance()
+        self.get_balance()
+        out = StringIO()
+
+        call_command('balance_cache_stats', stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), '1 hits, 1 misses (50.0% hit ratio)')
+
+    def test_api_shows_stats_to_staff(self):
+        self.get_balance()
+        self.get_balance()
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+
+        response = self.client.get(reverse('balance-cache-stats'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'hits': 1, 'misses': 1})
+
+    def test_api_hides_stats_from_users(self):
+        response = self.client.get(reverse('balance-cache-stats'))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def create_recurrence(self):
+        return create_recurrence(account=self.account, category=self.expense_category, due_date=date(2017, 1, 20),
+                                 description='rent', value=-100, kind=Transaction.EXPENSE_KIND,
+                                 periodic={'frequency': 'monthly', 'interval': 1, 'how_many': 3})
+
+    def get_balance(self, params=''):
+        url = reverse('plain-balance') + '?until=2017-01-31'
+        return self.client.get(url + params.replace('?', '&'))
+
+
+class BalanceCacheVersionTestCase(TestCase):
+
+    def test_evicted_version_is_not_reused(self):
+        version = cache.get_version(1)
+        cache.invalidate([1])
+        caches[cache.CACHE_ALIAS].delete('balance:version:1')
+        time.sleep(0.001)
+
+        self.assertGreater(cache.get_version(1), version + 1)
+
+    def test_strategies_key_ignores_time_of_datetimes(self):
+        from balances.strategies.query import UntilDateStrategy, based
+        morning = UntilDateStrategy(datetime(2017, 1, 1, 8), based=based.EFFECTIVE)
+        night = UntilDateStrategy(datetime(2017, 1, 1, 23), based=based.EFFECTIVE)
+
+        self.assertEqual(morning.get_cache_key(), night.get_cache_key())
+
+
+class LRULocMemCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.cache = LRULocMemCache('lru-test', {'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 3}})
+        self.cache.clear()
+
+    def test_culls_least_recently_used(self):
+        for key in ['a', 'b', 'c']:
+            self.cache.set(key, key)
+        self.cache.get('a')
+
+        self.cache.set('d', 'd')
+
+        self.assertEqual([self.cache.get(x) for x in 'abcd'], ['a', None, 'c', 'd'])
+
+    def test_expires_by_timeout(self):
+        self.cache.set('a', 'a', timeout=-1)
+
+        self.assertIsNone(self.cache.get('a'))
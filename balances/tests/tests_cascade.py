@@ -0,0 +1,227 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from balances.models import PeriodBalance
+from balances.services.periods import get_period_from
+from balances.strategies.periods import CREATED, DELETED, UPDATED, BatchPeriodStrategy
+from transactions.factories import create_periodic_transactions
+from transactions.models import Account, Transaction
+from transactions.tests.base_test import (BaseTestHelperFactory, UserDataTestSetupMixin, WithoutBalancesSignalsMixin,
+                                          WithoutSignalsMixin)
+
+
+class PeriodsTestMixin(WithoutBalancesSignalsMixin, WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory):
+    START_DATE = date(2017, 1, 1)
+    PERIOD_BALANCES = [50, 500, 5000, 50000]
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = cls.income_category
+        cls.other_account = cls.create_account(name='other')
+        cls.create_periods(cls.account, cls.PERIOD_BALANCES)
+        cls.create_periods(cls.other_account, cls.PERIOD_BALANCES)
+
+    @classmethod
+    def create_periods(cls, account, values):
+        for i, value in enumerate(values):
+            start, end = get_period_from(cls.START_DATE + relativedelta(months=i))
+            PeriodBalance.objects.create(account=account, start_date=start, end_date=end,
+                                         closed_effective_value=value, closed_real_value=value)
+
+    def create_and_reload(self, value, due_date, payment_date=None, **kwargs):
+        transaction = self.create_transaction(value, due_date=due_date, payment_date=payment_date, **kwargs)
+        return Transaction.objects.get(pk=transaction.id)
+
+    def run_strategy(self, action, transaction):
+        if action == DELETED:
+            transaction.delete()
+        else:
+            transaction.save()
+        BatchPeriodStrategy([(action, transaction)]).run()
+
+    def assert_balances(self, effective_values, real_values, account=None, start=None):
+        balances = PeriodBalance.objects\
+            .filter(account=account or self.account, start_date__gte=start or self.START_DATE)\
+            .order_by('start_date')
+
+        self.assertEqual([x.closed_effective_value for x in balances], effective_values)
+        self.assertEqual([x.closed_real_value for x in balances], real_values)
+
+
+class CascadeDeltasTestCase(PeriodsTestMixin, TestCase):
+    '''
+    Asserts that changes to transactions from past periods are shifted
+    to that period and all the next ones.
+    '''
+
+    def test_created_cascades_to_next_periods(self):
+        transaction = self.create_transaction(100, due_date=date(2017, 2, 10), payment_date=date(2017, 3, 5))
+        self.run_strategy(CREATED, transaction)
+
+        self.assert_balances([50, 600, 5100, 50100], [50, 500, 5100, 50100])
+
+    def test_increased_value_cascades_to_next_periods(self):
+        transaction = self.create_and_reload(10, date(2017, 2, 10), date(2017, 2, 10))
+        transaction.value = 1000
+        self.run_strategy(UPDATED, transaction)
+
+        expected = [50, 1490, 5990, 50990]
+        self.assert_balances(expected, expected)
+
+    def test_moved_due_date_to_past_shifts_periods_between(self):
+        transaction = self.create_and_reload(100, date(2017, 3, 10))
+        transaction.due_date = date(2017, 1, 10)
+        self.run_strategy(UPDATED, transaction)
+
+        self.assert_balances([150, 600, 5000, 50000], self.PERIOD_BALANCES)
+
+    def test_removed_payment_cascades_only_real_values(self):
+        transaction = self.create_and_reload(100, date(2017, 2, 10), date(2017, 2, 10))
+        transaction.payment_date = None
+        self.run_strategy(UPDATED, transaction)
+
+        self.assert_balances(self.PERIOD_BALANCES, [50, 400, 4900, 49900])
+
+    def test_deleted_cascades_to_next_periods(self):
+        transaction = self.create_and_reload(10, date(2017, 2, 10), date(2017, 2, 10))
+        self.run_strategy(DELETED, transaction)
+
+        expected = [50, 490, 4990, 49990]
+        self.assert_balances(expected, expected)
+
+    def test_changed_account_cascades_both_accounts(self):
+        transaction = self.create_and_reload(10, date(2017, 2, 10), date(2017, 2, 10))
+        transaction.account = self.other_account
+        self.run_strategy(UPDATED, transaction)
+
+        expected = [50, 490, 4990, 49990]
+        self.assert_balances(expected, expected)
+        expected = [50, 510, 5010, 50010]
+        self.assert_balances(expected, expected, self.other_account)
+
+    def test_creates_empty_missing_period_before_cascading(self):
+        transaction = self.create_transaction(100, due_date=date(2016, 12, 10), payment_date=date(2016, 12, 20))
+        self.run_strategy(CREATED, transaction)
+
+        missing = PeriodBalance.objects.get(account=self.account, start_date=date(2016, 12, 1))
+        self.assertEqual(missing.closed_effective_value, 100)
+        self.assertEqual(missing.closed_real_value, 100)
+        expected = [150, 600, 5100, 50100]
+        self.assert_balances(expected, expected)
+
+    def test_query_count_does_not_depend_on_periods_amount(self):
+        few = self.count_update_queries(3)
+        PeriodBalance.objects.all().delete()
+        many = self.count_update_queries(60)
+
+        self.assertEqual(few, many)
+
+    def count_update_queries(self, periods_amount):
+        account = self.create_account(name='bench{}'.format(periods_amount))
+        self.create_periods(account, [0] * periods_amount)
+        transaction = self.create_and_reload(10, self.START_DATE, self.START_DATE, account=account)
+        transaction.value = 20
+
+        with CaptureQueriesContext(connection) as context:
+            self.run_strategy(UPDATED, transaction)
+
+        last = PeriodBalance.objects.filter(account=account).order_by('end_date').last()
+        self.assertEqual(last.closed_effective_value, 10)
+        return len(context.captured_queries)
+
+
+class BatchPeriodStrategyTestCase(PeriodsTestMixin, TestCase):
+
+    def test_periodics_create_missing_periods_and_cascade(self):
+        periodics = self.create_periodic(date(2016, 11, 10), 6)
+        BatchPeriodStrategy((CREATED, x) for x in periodics).run()
+
+        self.assertEqual(PeriodBalance.objects.filter(account=self.account).count(), 6)
+        self.assert_balances([10, 20, 80, 540, 5050, 50060], [10, 10, 60, 510, 5010, 50010], start=date(2016, 11, 1))
+        self.assert_account_balance(self.account, 60, 10)
+
+    def test_new_periods_start_from_previous_one(self):
+        strategy = BatchPeriodStrategy()
+        strategy.add_delta(self.account.id, date(2017, 6, 1), 10, 0)
+        strategy.run()
+
+        self.assert_balances([50, 500, 5000, 50000, 50010], [50, 500, 5000, 50000, 50000])
+
+    def test_open_and_future_periods_are_kept_for_next_ones(self):
+        month = date.today().replace(day=1)
+        strategy = BatchPeriodStrategy()
+        strategy.add_delta(self.account.id, month, 10, 0)
+        strategy.run()
+
+        strategy = BatchPeriodStrategy()
+        strategy.add_delta(self.account.id, month + relativedelta(months=2), 5, 5)
+        strategy.run()
+
+        self.assert_balances([50010, 50015], [50000, 50005], start=month)
+
+    def test_matches_running_one_batch_per_transaction(self):
+        single = self.create_mixed_changes(self.account)
+        for change in single:
+            BatchPeriodStrategy([change]).run()
+
+        batch = self.create_mixed_changes(self.other_account)
+        BatchPeriodStrategy(batch).run()
+
+        single_periods = PeriodBalance.objects.filter(account=self.account).order_by('start_date')
+        batch_periods = PeriodBalance.objects.filter(account=self.other_account).order_by('start_date')
+        self.assertEqual(
+            [(x.start_date, x.closed_effective_value, x.closed_real_value) for x in single_periods],
+            [(x.start_date, x.closed_effective_value, x.closed_real_value) for x in batch_periods]
+        )
+        self.assert_account_balance(self.other_account, 65, 30)
+
+    def test_query_count_does_not_depend_on_transactions_amount(self):
+        few = self.count_batch_queries(date(2012, 1, 10), 6)
+        many = self.count_batch_queries(date(2010, 1, 10), 60)
+
+        self.assertEqual(few, many)
+
+    def count_batch_queries(self, start, how_many):
+        periodics = self.create_periodic(start, how_many)
+
+        with CaptureQueriesContext(connection) as context:
+            BatchPeriodStrategy((CREATED, x) for x in periodics).run()
+
+        return len(context.captured_queries)
+
+    def create_mixed_changes(self, account):
+        changes = [(CREATED, x) for x in self.create_periodic(date(2016, 12, 5), 3, account=account)]
+
+        updated = self.create_and_reload(20, date(2017, 2, 1), date(2017, 2, 1), account=account)
+        updated.value = 40
+        updated.payment_date = date(2017, 3, 1)
+        updated.save()
+        changes.append((UPDATED, updated))
+
+        deleted = self.create_and_reload(-15, date(2017, 1, 20), account=account, category=self.expense_category)
+        deleted.delete()
+        changes.append((DELETED, deleted))
+
+        return changes
+
+    def create_periodic(self, due_date, how_many, account=None):
+        return create_periodic_transactions(
+            account=account or self.account,
+            category=self.category,
+            due_date=due_date,
+            payment_date=due_date,
+            description='periodic',
+            value=10,
+            kind=Transaction.INCOME_KIND,
+            periodic={'frequency': 'monthly', 'interval': 1, 'how_many': how_many}
+        )
+
+    def assert_account_balance(self, account, effective, real):
+        account = Account.objects.get(pk=account.id)
+        self.assertEqual(account.current_effective_balance, effective)
+        self.assertEqual(account.current_real_balance, real)
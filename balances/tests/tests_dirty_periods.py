@@ -0,0 +1,113 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from balances.models import DirtyPeriod, PeriodBalance
+from balances.services import calculator, dirty_periods
+from transactions.factories import import_transactions, update_transactions
+from transactions.models import Account, Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+@override_settings(BALANCES_ASYNC_PERIODS=True)
+class DirtyPeriodsTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase):
+
+    def setUp(self):
+        self.other_account = self.create_account(name='other')
+
+    def test_queues_changes_instead_of_updating_periods(self):
+        self.import_rows()
+
+        self.assertFalse(PeriodBalance.objects.exists())
+        self.assertEqual(Account.objects.get(pk=self.account.pk).current_effective_balance, 0)
+        self.assertEqual(
+            sorted(DirtyPeriod.objects.values_list('account_id', 'month', 'effective_value', 'real_value')), [
+                (self.account.id, date(2017, 1, 1), -10, 0),
+                (self.account.id, date(2017, 2, 1), -20, -10),
+                (self.other_account.id, date(2017, 1, 1), -5, 0),
+            ])
+
+    def test_processing_applies_same_changes_as_synchronous_mode(self):
+        with override_settings(BALANCES_ASYNC_PERIODS=False):
+            self.import_and_pay()
+            expected = self.get_balances()
+            Transaction.objects.all().delete()
+            self.reset_balances()
+        self.import_and_pay()
+
+        self.assertEqual(dirty_periods.process(), 4)
+
+        self.assertEqual(self.get_balances(), expected)
+        self.assertFalse(DirtyPeriod.objects.exists())
+
+    def test_coalesces_changes_of_each_account(self):
+        self.import_rows()
+        dirty_periods.process()
+        self.import_rows()
+        with CaptureQueriesContext(connection) as context:
+            dirty_periods.process()
+        for _ in range(10):
+            self.import_rows()
+
+        with self.assertNumQueries(len(context.captured_queries)):
+            dirty_periods.process()
+
+        self.assertEqual(PeriodBalance.objects.get(account=self.other_account).closed_effective_value, -60)
+
+    def test_processes_in_batches(self):
+        self.import_rows()
+
+        self.assertEqual(dirty_periods.process(batch_size=2), 2)
+        self.assertEqual(DirtyPeriod.objects.count(), 1)
+
+    def test_current_balance_is_exact_while_dirty(self):
+        self.import_rows()
+
+        result = calculator.calculate_accounts_current_balance([self.account.id, self.other_account.id])
+
+        self.assertEqual(result[self.account.id], {'effective': -30, 'real': -10})
+        self.assertEqual(result[self.other_account.id], {'effective': -5, 'real': 0})
+
+    def test_command_processes_until_empty(self):
+        self.import_rows()
+        out = StringIO()
+
+        call_command('process_dirty_periods', '--once', '--batch-size', '2', stdout=out)
+
+        self.assertEqual(out.getvalue().splitlines(), ['2 queued changes applied', '1 queued changes applied'])
+        self.assertFalse(DirtyPeriod.objects.exists())
+
+    def import_rows(self):
+        rows = [
+            (-10, date(2017, 1, 10), date(2017, 2, 1), self.account),
+            (-20, date(2017, 2, 10), None, self.account),
+            (-5, date(2017, 1, 5), None, self.other_account),
+        ]
+        import_transactions(self.user.id, [{
+            'account': account.id,
+            'category': self.expense_category.id,
+            'kind': Transaction.EXPENSE_KIND,
+            'value': value,
+            'description': 'imported',
+            'due_date': due_date,
+            'payment_date': payment_date,
+        } for value, due_date, payment_date, account in rows])
+
+    def import_and_pay(self):
+        self.import_rows()
+        update_transactions(Transaction.objects.filter(value=-20), payment_date=date(2017, 2, 15))
+
+    def get_balances(self):
+        periods = PeriodBalance.objects.order_by('account_id', 'start_date')\
+            .values_list('account_id', 'start_date', 'closed_effective_value', 'closed_real_value')
+        accounts = Account.objects.order_by('id')\
+            .values_list('id', 'current_effective_balance', 'current_real_balance')
+        return list(periods), list(accounts)
+
+    def reset_balances(self):
+        PeriodBalance.objects.all().delete()
+        Account.objects.update(current_effective_balance=0, current_real_balance=0)
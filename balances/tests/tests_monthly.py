@@ -0,0 +1,109 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from balances.services import monthly, rollups
+from common.tests_helpers import BenchmarkTestHelper, benchmark
+from transactions.models import Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class MonthlyTestMixin(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory):
+
+    @classmethod
+    def create_expense(cls, value, due_date, payment_date=None):
+        return cls.create_transaction(value, due_date=due_date, payment_date=payment_date,
+                                      category=cls.expense_category)
+
+    @classmethod
+    def create_income(cls, value, due_date, payment_date=None):
+        return cls.create_transaction(value, due_date=due_date, payment_date=payment_date,
+                                      category=cls.income_category)
+
+
+class SumByMonthTestCase(MonthlyTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_income(50, date(2017, 1, 5), date(2017, 2, 5))
+        cls.create_income(20, date(2017, 1, 10), date(2017, 1, 8))
+        cls.create_income(30, date(2017, 2, 15), date(2017, 2, 15))
+        cls.create_expense(-10, date(2017, 1, 6), date(2017, 2, 6))
+        cls.create_expense(-30, date(2017, 2, 15), date(2017, 2, 20))
+        cls.create_expense(-99, date(2016, 12, 31), date(2017, 3, 1))
+
+        other_user, other_token = cls.create_user('other', email='other@test.com', password='pass')
+        other_account = cls.create_account(user=other_user)
+        cls.create_transaction(1000, account=other_account, due_date=date(2017, 1, 1))
+
+    def test_sums_effective_and_real_by_month(self):
+        report = monthly.sum_by_month(self.user.id, date(2017, 1, 1), date(2017, 3, 31))
+
+        self.assertEqual(report, [
+            {'date': date(2017, 1, 1), 'effective_expenses': -10, 'effective_incomes': 70, 'real_expenses': 0,
+             'real_incomes': 20, 'effective_total': 60, 'real_total': 20},
+            {'date': date(2017, 2, 1), 'effective_expenses': -30, 'effective_incomes': 30, 'real_expenses': -40,
+             'real_incomes': 80, 'effective_total': 0, 'real_total': 40},
+            {'date': date(2017, 3, 1), 'effective_expenses': 0, 'effective_incomes': 0, 'real_expenses': -99,
+             'real_incomes': 0, 'effective_total': 0, 'real_total': -99},
+        ])
+
+    def test_fills_empty_months(self):
+        report = monthly.sum_by_month(self.user.id, date(2016, 10, 20), date(2016, 12, 1))
+
+        self.assertEqual([x['date'] for x in report], [date(2016, 10, 1), date(2016, 11, 1), date(2016, 12, 1)])
+        self.assertEqual([x['effective_total'] for x in report], [0, 0, -99])
+
+    def test_reads_rollups_once(self):
+        with CaptureQueriesContext(connection) as context:
+            monthly.sum_by_month(self.user.id, date(2010, 1, 1), date(2020, 12, 31))
+
+        # One for rollups, another one for recurrences
+        self.assertEqual(len(context.captured_queries), 2)
+
+
+@benchmark
+class SumByMonthBenchmarkTestCase(MonthlyTestMixin, TestCase, BenchmarkTestHelper):
+    SIZES = [10000, 100000, 1000000]
+    MONTHS = 36
+    BATCH_SIZE = 5000
+
+    def test_benchmark_sum_by_month(self):
+        rows = []
+        created = 0
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+            _, rebuild_elapsed, _ = self.measure(rollups.rebuild, self.user.id)
+
+            report, elapsed, queries = self.measure(
+                monthly.sum_by_month, self.user.id, date(2016, 1, 1), date(2016, 12, 31))
+            self.assertEqual(len(report), 12)
+            rows.append((size, queries, '{:.1f}'.format(elapsed * 1000), '{:.1f}'.format(rebuild_elapsed * 1000)))
+
+        self.report('sum_by_month (12 months)', ['transactions', 'queries', 'ms', 'rebuild ms'], rows)
+
+    def create_transactions(self, start, end):
+        for batch_start in range(start, end, self.BATCH_SIZE):
+            batch = [self.create_unsaved(i) for i in range(batch_start, min(batch_start + self.BATCH_SIZE, end))]
+            Transaction.objects.bulk_create(batch, batch_size=500)
+
+    def create_unsaved(self, i):
+        due_date = date(2015, 1, 1) + relativedelta(months=i % self.MONTHS, days=i % 28)
+        payment_date = due_date + relativedelta(days=i % 45) if i % 3 else None
+        is_income = i % 4 == 0
+
+        return Transaction(
+            account=self.account,
+            user=self.user,
+            category=self.income_category if is_income else self.expense_category,
+            kind=Transaction.INCOME_KIND if is_income else Transaction.EXPENSE_KIND,
+            value=10 if is_income else -10,
+            description='benchmark',
+            due_date=due_date,
+            payment_date=payment_date
+        )
@@ -0,0 +1,168 @@
+from datetime import date
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+
+from balances.models import DirtyPeriod, MonthlyRollup, PeriodBalance
+from balances.services import rollups
+from transactions.factories import create_periodic_transactions
+from transactions.models import Account, Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class MonthlyRollupTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase):
+
+    def test_created(self):
+        self.create_transaction(-10, due_date=date(2018, 1, 10), payment_date=date(2018, 2, 1))
+
+        self.assert_rollups({
+            (date(2018, 1, 1), Transaction.EXPENSE_KIND): (-10, 0),
+            (date(2018, 2, 1), Transaction.EXPENSE_KIND): (0, -10),
+        })
+
+    def test_updated(self):
+        transaction = self.create_transaction(-10, due_date=date(2018, 1, 10), payment_date=date(2018, 2, 1))
+        self.create_transaction(-5, due_date=date(2018, 3, 10))
+
+        transaction.due_date = date(2018, 3, 1)
+        transaction.payment_date = None
+        transaction.value = -20
+        transaction.save()
+
+        self.assert_rollups({
+            (date(2018, 1, 1), Transaction.EXPENSE_KIND): (0, 0),
+            (date(2018, 2, 1), Transaction.EXPENSE_KIND): (0, 0),
+            (date(2018, 3, 1), Transaction.EXPENSE_KIND): (-25, 0),
+        })
+
+    def test_saved_twice(self):
+        transaction = self.create_transaction(-10, due_date=date(2018, 1, 10))
+
+        transaction.value = -20
+        transaction.save()
+        transaction.value = -30
+        transaction.save()
+
+        self.assert_rollups({(date(2018, 1, 1), Transaction.EXPENSE_KIND): (-30, 0)})
+
+    def test_changed_account_and_kind(self):
+        other_account = self.create_account(name='other')
+        transaction = self.create_transaction(-10, due_date=date(2018, 1, 10))
+
+        transaction = Transaction.objects.get(pk=transaction.pk)
+        transaction.account = other_account
+        transaction.kind = Transaction.INCOME_KIND
+        transaction.category = self.income_category
+        transaction.value = 10
+        transaction.save()
+
+        self.assert_rollups({(date(2018, 1, 1), Transaction.EXPENSE_KIND): (0, 0)})
+        self.assert_rollups({(date(2018, 1, 1), Transaction.INCOME_KIND): (10, 0)}, other_account)
+
+    def test_deleted(self):
+        transaction = self.create_transaction(-10, due_date=date(2018, 1, 10), payment_date=date(2018, 1, 10))
+        self.create_transaction(-5, due_date=date(2018, 1, 10))
+
+        Transaction.objects.get(pk=transaction.pk).delete()
+
+        self.assert_rollups({(date(2018, 1, 1), Transaction.EXPENSE_KIND): (-5, 0)})
+
+    def test_bulk_created_periodics(self):
+        create_periodic_transactions(
+            account=self.account,
+            category=self.expense_category,
+            due_date=date(2018, 1, 31),
+            payment_date=date(2018, 1, 31),
+            description='periodic',
+            value=-10,
+            kind=Transaction.EXPENSE_KIND,
+            periodic={'frequency': 'monthly', 'interval': 1, 'how_many': 3}
+        )
+
+        self.assert_rollups({
+            (date(2018, 1, 1), Transaction.EXPENSE_KIND): (-10, -10),
+            (date(2018, 2, 1), Transaction.EXPENSE_KIND): (-10, 0),
+            (date(2018, 3, 1), Transaction.EXPENSE_KIND): (-10, 0),
+        })
+
+    def test_rebuild_command_recovers_missed_changes(self):
+        self.create_transaction(-10, due_date=date(2018, 1, 10), payment_date=date(2018, 2, 1))
+        self.create_transaction(30, due_date=date(2018, 2, 10), category=self.income_category)
+        Transaction.objects.filter(value=30).update(value=40)  # Rollups miss changes not using save
+        expected = {
+            (date(2018, 1, 1), Transaction.EXPENSE_KIND): (-10, 0),
+            (date(2018, 2, 1), Transaction.EXPENSE_KIND): (0, -10),
+            (date(2018, 2, 1), Transaction.INCOME_KIND): (40, 0),
+        }
+
+        out = StringIO()
+        call_command('rebuild_monthly_rollups', user=self.user.id, stdout=out)
+
+        self.assertIn('3 monthly rollups created', out.getvalue())
+        self.assert_rollups(expected)
+
+    def test_applies_deltas_with_constant_queries(self):
+        deltas = [(self.account.id, date(2018, month, 1), Transaction.EXPENSE_KIND, -1, 0) for month in range(1, 13)]
+
+        with self.assertNumQueries(4):  # Savepoint, select, insert and release
+            rollups.apply_deltas(deltas)
+        with self.assertNumQueries(4):  # Savepoint, select, update and release
+            rollups.apply_deltas(deltas)
+
+        self.assertEqual(MonthlyRollup.objects.filter(effective_value=-2).count(), 12)
+
+    def assert_rollups(self, expected, account=None):
+        found = {
+            (x.month, x.kind): (x.effective_value, x.real_value)
+            for x in MonthlyRollup.objects.filter(account=account or self.account)
+        }
+        for key, values in expected.items():
+            self.assertEqual(found.get(key, (0, 0)), values, key)
+
+
+class RebuildBalancesTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase):
+
+    def setUp(self):
+        self.create_transaction(-10, due_date=date(2017, 11, 10), payment_date=date(2018, 1, 5))
+        self.create_transaction(50, due_date=date(2018, 1, 20), payment_date=date(2018, 1, 20),
+                                category=self.income_category)
+        self.create_transaction(-5, due_date=date(2018, 3, 1))
+        self.other_account = self.create_account(name='other')
+        self.create_transaction(-7, due_date=date(2017, 12, 1), payment_date=date(2017, 12, 1),
+                                account=self.other_account)
+        self.expected = self.get_balances()
+
+        PeriodBalance.objects.all().delete()
+        MonthlyRollup.objects.filter(account=self.account).delete()
+        Account.objects.update(current_effective_balance=0, current_real_balance=0)
+        DirtyPeriod.objects.create(account=self.account, month=date(2018, 1, 1), effective_value=100)
+
+    def test_command_rebuilds_periods_rollups_and_current_balances(self):
+        out = StringIO()
+
+        call_command('rebuild_balances', user=self.user.id, stdout=out)
+
+        self.assertIn('4 period balances created', out.getvalue())
+        self.assertEqual(self.get_balances(), self.expected)
+        self.assertFalse(DirtyPeriod.objects.exists())
+
+    def test_migration_rebuilds_as_command(self):
+        migration = import_module('balances.migrations.0005_rebuild_balances')
+
+        migration.rebuild_balances(apps, None)
+
+        self.assertEqual(self.get_balances(), self.expected)
+
+    def get_balances(self):
+        periods = PeriodBalance.objects.order_by('account_id', 'start_date')
+        accounts = Account.objects.order_by('id')
+        return {
+            'periods': [(x.account_id, x.start_date, x.end_date, x.closed_effective_value, x.closed_real_value)
+                        for x in periods],
+            'rollups': sorted(MonthlyRollup.objects.values_list('account_id', 'month', 'kind', 'effective_value',
+                                                                'real_value')),
+            'accounts': [(x.id, x.current_effective_balance, x.current_real_balance) for x in accounts],
+        }
@@ -1,11 +1,16 @@
-from datetime import date
+from datetime import date, datetime
 
+from dateutil.relativedelta import relativedelta
 from django.test import TestCase
 
-
+from balances.factories import CalculatorBuilder
 from balances.models import PeriodBalance
 from balances.services import calculator
-from transactions.tests.base_test import BaseTestHelper
+from balances.strategies.query import based, outputs
+from common.tests_helpers import BenchmarkTestHelper, benchmark
+from transactions.models import Transaction, post_bulk_create
+from transactions.tests.base_test import (BaseTestHelper, BaseTestHelperFactory, UserDataTestSetupMixin,
+                                          WithoutSignalsMixin)
 
 
 class CalculatorTestCase(TestCase, BaseTestHelper):
@@ -18,7 +23,7 @@ class CalculatorTestCase(TestCase, BaseTestHelper):
 
     def test_calculates_account_current_balance(self):
         self.create_period_balance(date(2017, 12, 1), date(2017, 12, 31), 100, 70)
-        self.create_period_balance(date(2018, 1, 1), date(2018, 1, 31), 50, 70)
+        self.create_period_balance(date(2018, 1, 1), date(2018, 1, 31), 150, 140)
 
         result = calculator.calculate_account_current_balance(self.account.id)
 
@@ -27,7 +32,7 @@ class CalculatorTestCase(TestCase, BaseTestHelper):
 
     def test_calculates_account_current_balance_regarding_current_period(self):
         self.create_period_balance(date(2017, 12, 1), date(2017, 12, 31), 100, 70)
-        self.create_period_balance(date(2018, 1, 1), date(2018, 1, 31), 50, 70)
+        self.create_period_balance(date(2018, 1, 1), date(2018, 1, 31), 150, 140)
         self.create_transaction(300, due_date=date.today(), payment_date=date.today())
 
         result = calculator.calculate_account_current_balance(self.account.id)
@@ -35,11 +40,198 @@ class CalculatorTestCase(TestCase, BaseTestHelper):
         self.assertEqual(result['effective'], 450)
         self.assertEqual(result['real'], 440)
 
-    def create_period_balance(self, start, end, effective, real):
+    def test_calculates_several_accounts_current_balance(self):
+        other_account = self.create_account(self.user, name='other')
+        empty_account = self.create_account(self.user, name='empty')
+        self.create_period_balance(date(2017, 12, 1), date(2017, 12, 31), 100, 70)
+        self.create_period_balance(date(2017, 12, 1), date(2017, 12, 31), 20, 10, account=other_account)
+        self.create_transaction(300, due_date=date.today(), payment_date=date.today())
+        self.create_transaction(5, due_date=date.today(), account=other_account)
+
+        result = calculator.calculate_accounts_current_balance([self.account.id, other_account.id, empty_account.id])
+
+        self.assertEqual(result[self.account.id], {'effective': 400, 'real': 370})
+        self.assertEqual(result[other_account.id], {'effective': 25, 'real': 10})
+        self.assertEqual(result[empty_account.id], {'effective': 0, 'real': 0})
+        for account in [self.account, other_account, empty_account]:
+            self.assertEqual(result[account.id], calculator.calculate_account_current_balance(account.id))
+
+    def test_calculates_current_balance_of_history_written_through_signals(self):
+        month = date.today().replace(day=1)
+        for months in [4, 3, 1]:
+            due_date = month - relativedelta(months=months)
+            self.create_transaction(100, due_date=due_date, payment_date=due_date + relativedelta(months=1))
+        self.create_transaction(100, due_date=month, payment_date=month)
+        self.create_transaction(100, due_date=month + relativedelta(months=1))
+
+        result = calculator.calculate_account_current_balance(self.account.id)
+
+        self.assertEqual(result, {'effective': 400, 'real': 400})
+
+    def create_period_balance(self, start, end, effective, real, account=None):
         PeriodBalance.objects.create(
-            account=self.account,
+            account=account or self.account,
             start_date=start,
             end_date=end,
             closed_effective_value=effective,
             closed_real_value=real
         )
+
+
+class UntilDateCalculatorTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_transaction(-10, due_date=date(2016, 12, 5), payment_date=date(2017, 2, 10))
+        cls.create_transaction(-20, due_date=date(2017, 1, 15), payment_date=date(2017, 1, 16))
+        cls.create_transaction(50, due_date=date(2017, 2, 10), payment_date=date(2017, 2, 20),
+                               category=cls.income_category)
+        cls.create_transaction(-5, due_date=date(2017, 2, 21))
+
+        other_user, _ = cls.create_user('other', email='other@test.com', password='pass')
+        cls.create_transaction(1000, account=cls.create_account(user=other_user), due_date=date(2017, 1, 1))
+
+    def test_sums_closed_months_and_partial_month(self):
+        cases = [
+            (based.EFFECTIVE, outputs.TOTAL, 20), (based.EFFECTIVE, outputs.EXPENSES, -30),
+            (based.EFFECTIVE, outputs.INCOMES, 50), (based.REAL, outputs.TOTAL, 20),
+            (based.REAL, outputs.EXPENSES, -30), (based.REAL, outputs.INCOMES, 50),
+        ]
+        for consider, output, expected in cases:
+            builder = self.create_builder(consider, date(2017, 2, 20)).as_plain(output=output)
+            self.assertEqual(builder.build().calculate(), expected, (consider, output))
+
+    def test_detailed(self):
+        result = self.create_builder(based.REAL, date(2017, 2, 15)).as_detailed().build().calculate()
+
+        self.assertEqual(result, {'incomes': 0, 'expenses': -30, 'total': -30})
+
+    def test_same_as_scanning_whole_history(self):
+        for day in [date(2016, 12, 31), date(2017, 1, 1), date(2017, 2, 9), datetime(2017, 2, 20, 12)]:
+            for consider in [based.EFFECTIVE, based.REAL]:
+                builder = self.create_builder(consider, day).as_detailed()
+                scanned = builder.build().calculate(value__isnull=False)  # Filters skip rollups
+                self.assertEqual(builder.build().calculate(), scanned, (day, consider))
+
+    def test_nothing_aggregated_is_none(self):
+        calculator = self.create_builder(based.REAL, date(2017, 1, 10)).as_plain().build()
+        self.assertIsNone(calculator.calculate())
+
+    def test_reads_rollups_and_partial_month_only(self):
+        calculator = self.create_builder(based.REAL, date(2017, 2, 20)).as_plain().build()
+
+        with self.assertNumQueries(2):
+            calculator.calculate()
+
+    def create_builder(self, consider, until):
+        return CalculatorBuilder().owned_by(self.user.id).consider(consider).until(until)
+
+
+class CompleteCalculatorTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_transaction(-10, due_date=date(2016, 12, 5), payment_date=date(2017, 1, 10))
+        cls.create_transaction(-20, due_date=date(2017, 1, 15), payment_date=date(2017, 1, 16))
+        cls.create_transaction(50, due_date=date(2017, 1, 10), payment_date=date(2017, 2, 20),
+                               category=cls.income_category)
+        cls.create_transaction(-5, due_date=date(2017, 2, 21))
+
+    def test_same_as_effective_and_real_detailed(self):
+        dates = [
+            lambda builder: builder.until(date(2017, 1, 31)),
+            lambda builder: builder.between_dates(date(2017, 1, 1), date(2017, 2, 28)),
+            lambda builder: builder.on_date(date(2017, 1, 10)),
+        ]
+        for set_date in dates:
+            complete = set_date(self.create_builder(based.BOTH)).as_complete().build().calculate()
+            for consider, prefix in [(based.EFFECTIVE, 'effective_'), (based.REAL, 'real_')]:
+                detailed = set_date(self.create_builder(consider)).as_detailed().build().calculate()
+                for key in ['incomes', 'expenses', 'total']:
+                    self.assertEqual(complete[prefix + key], detailed[key] or 0, (complete, detailed))
+
+    def test_aggregates_in_a_single_query(self):
+        calculator = self.create_builder(based.BOTH).until(date(2017, 1, 31)).as_complete().build()
+
+        with self.assertNumQueries(2):  # Aggregate and recurrences
+            calculator.calculate()
+
+    def create_builder(self, consider):
+        return CalculatorBuilder().owned_by(self.user.id).consider(consider)
+
+
+@benchmark
+class CalculatorBenchmarkTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase,
+                                  BenchmarkTestHelper):
+    SIZES = [10000, 100000]
+    MONTHS = 120
+    BATCH_SIZE = 5000
+
+    def test_benchmark_until_date(self):
+        rows = []
+        created = 0
+        until = date(2015, 1, 1) + relativedelta(months=self.MONTHS - 1, days=14)
+        builder = CalculatorBuilder().owned_by(self.user.id).consider(based.EFFECTIVE).until(until).as_plain()
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+
+            scanned, scan_elapsed, _ = self.measure(builder.build().calculate, value__isnull=False)
+            result, elapsed, queries = self.measure(builder.build().calculate)
+            self.assertEqual(result, scanned)
+            rows.append((size, queries, '{:.1f}'.format(elapsed * 1000), '{:.1f}'.format(scan_elapsed * 1000)))
+
+        self.report('balance until date ({} months)'.format(self.MONTHS),
+                    ['transactions', 'queries', 'rollups ms', 'full scan ms'], rows)
+
+    def test_benchmark_complete(self):
+        windows = [
+            ('a year', lambda builder: builder.between_dates(date(2017, 1, 1), date(2017, 12, 31))),
+            ('until', lambda builder: builder.until(date(2024, 12, 31))),
+        ]
+        rows = []
+        created = 0
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+
+            for name, set_date in windows:
+                _, detailed_elapsed, detailed_queries = self.measure(self.calculate_detailed_twice, set_date)
+                calculator = set_date(self.create_builder(based.BOTH)).as_complete().build()
+                _, elapsed, queries = self.measure(calculator.calculate)
+                rows.append((size, name, queries, '{:.1f}'.format(elapsed * 1000),
+                             detailed_queries, '{:.1f}'.format(detailed_elapsed * 1000)))
+
+        self.report('complete balance vs effective and real detailed ones',
+                    ['transactions', 'window', 'queries', 'ms', 'detailed queries', 'detailed ms'], rows)
+
+    def calculate_detailed_twice(self, set_date):
+        # Filtering skips rollups, so both calls scan transactions as complete does
+        return [set_date(self.create_builder(consider)).as_detailed().build().calculate(value__isnull=False)
+                for consider in [based.EFFECTIVE, based.REAL]]
+
+    def create_builder(self, consider):
+        return CalculatorBuilder().owned_by(self.user.id).consider(consider)
+
+    def create_transactions(self, start, end):
+        for batch_start in range(start, end, self.BATCH_SIZE):
+            batch = [self.create_unsaved(i) for i in range(batch_start, min(batch_start + self.BATCH_SIZE, end))]
+            Transaction.objects.bulk_create(batch, batch_size=500)
+            post_bulk_create.send(sender=Transaction, instances=batch)
+
+    def create_unsaved(self, i):
+        due_date = date(2015, 1, 1) + relativedelta(months=i % self.MONTHS, days=i % 28)
+        is_income = i % 4 == 0
+
+        return Transaction(
+            account=self.account,
+            user=self.user,
+            category=self.income_category if is_income else self.expense_category,
+            kind=Transaction.INCOME_KIND if is_income else Transaction.EXPENSE_KIND,
+            value=10 if is_income else -10,
+            description='benchmark',
+            due_date=due_date,
+            payment_date=due_date + relativedelta(days=i % 45) if i % 3 else None
+        )
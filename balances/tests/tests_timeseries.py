@@ -0,0 +1,175 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from balances.factories import CalculatorBuilder
+from balances.services import timeseries
+from balances.strategies.query import based
+from common.tests_helpers import BenchmarkTestHelper, benchmark
+from transactions.factories import create_recurrence
+from transactions.models import Transaction, post_bulk_create
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class TimeseriesTestMixin(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_transaction(-10, due_date=date(2016, 12, 5), payment_date=date(2017, 2, 10))
+        cls.create_transaction(-20, due_date=date(2017, 1, 15), payment_date=date(2017, 1, 16))
+        cls.create_transaction(50, due_date=date(2017, 2, 10), payment_date=date(2017, 2, 20),
+                               category=cls.income_category)
+        cls.create_transaction(-5, due_date=date(2017, 2, 21))
+        cls.create_transaction(-7, due_date=date(2017, 4, 2), payment_date=date(2017, 1, 30))
+
+        other_user, _ = cls.create_user('other', email='other@test.com', password='pass')
+        cls.create_transaction(1000, account=cls.create_account(user=other_user), due_date=date(2017, 1, 1))
+
+
+class RunningBalancesTestCase(TimeseriesTestMixin, TestCase):
+
+    def test_same_as_balance_until_each_point(self):
+        create_recurrence(
+            account=self.account, category=self.expense_category, due_date=date(2017, 1, 20), payment_date=None,
+            description='rent', value=-100, kind=Transaction.EXPENSE_KIND,
+            periodic={'frequency': 'monthly', 'interval': 1, 'how_many': 3}
+        )
+
+        for period in timeseries.PERIODS:
+            points = timeseries.get_running_balances(self.user.id, date(2017, 1, 10), date(2017, 4, 5), period)
+            for point in points:
+                self.assertEqual(point['effective'], self.calculate(based.EFFECTIVE, point['date']), point)
+                self.assertEqual(point['real'], self.calculate(based.REAL, point['date']), point)
+
+    def test_points_close_each_period(self):
+        def get_dates(period):
+            points = timeseries.get_running_balances(self.user.id, date(2017, 1, 30), date(2017, 3, 15), period)
+            return [x['date'] for x in points]
+
+        self.assertEqual(len(get_dates(timeseries.DAY)), 45)
+        self.assertEqual(get_dates(timeseries.WEEK), [
+            date(2017, 2, 5), date(2017, 2, 12), date(2017, 2, 19), date(2017, 2, 26), date(2017, 3, 5),
+            date(2017, 3, 12), date(2017, 3, 15)
+        ])
+        self.assertEqual(get_dates(timeseries.MONTH), [date(2017, 1, 31), date(2017, 2, 28), date(2017, 3, 15)])
+
+    def test_counts_points_without_listing_them(self):
+        ranges = [(date(2017, 1, 30), date(2017, 3, 15)), (date(2017, 1, 1), date(2017, 1, 1)),
+                  (date(2017, 1, 2), date(2017, 1, 8)), (date(2016, 12, 31), date(2018, 2, 1))]
+        for from_date, until_date in ranges:
+            for period in timeseries.PERIODS:
+                expected = len(timeseries.get_points(from_date, until_date, period))
+                self.assertEqual(timeseries.count_points(from_date, until_date, period), expected,
+                                 (from_date, until_date, period))
+
+    def test_queries_dont_depend_on_points(self):
+        # Rollups, partial month, recurrences and running balances
+        for period in timeseries.PERIODS:
+            with self.assertNumQueries(4):
+                timeseries.get_running_balances(self.user.id, date(2016, 1, 1), date(2017, 12, 31), period)
+
+    def calculate(self, consider, until):
+        calculator = CalculatorBuilder().owned_by(self.user.id).consider(consider).until(until).as_plain().build()
+        return calculator.calculate() or 0
+
+
+class TimeseriesApiTestCase(TimeseriesTestMixin, APITestCase):
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def test_gets_running_balances(self):
+        response = self.client.get(reverse('balance-timeseries'), {'from': '2017-01-01', 'until': '2017-02-28'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [
+            {'date': date(2017, 1, 31), 'effective': -30, 'real': -27},
+            {'date': date(2017, 2, 28), 'effective': 15, 'real': 13},
+        ])
+
+    def test_gets_only_based_balance(self):
+        params = {'from': '2017-01-01', 'until': '2017-01-31', 'period': 'week', 'based': 'real'}
+
+        response = self.client.get(reverse('balance-timeseries'), params)
+
+        self.assertEqual(response.data[-1], {'date': date(2017, 1, 31), 'real': -27})
+
+    def test_validates_params(self):
+        invalid = [
+            {'until': '2017-01-31'},
+            {'from': '2017-02-01', 'until': '2017-01-31'},
+            {'from': '2017-01-01', 'until': '2017-01-31', 'period': 'year'},
+            {'from': '0001-01-01', 'until': '0001-01-31'},
+            {'from': '9999-12-01', 'until': '9999-12-31', 'period': 'week'},
+            {'from': '2000-01-01', 'until': '2017-01-31', 'period': 'day'},
+        ]
+        for params in invalid:
+            response = self.client.get(reverse('balance-timeseries'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_accepts_max_points(self):
+        until = date(2017, 1, 1) + relativedelta(days=timeseries.MAX_POINTS - 1)
+        params = {'from': '2017-01-01', 'until': until.isoformat(), 'period': 'day'}
+
+        response = self.client.get(reverse('balance-timeseries'), params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), timeseries.MAX_POINTS)
+
+
+@benchmark
+class RunningBalancesBenchmarkTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase,
+                                       BenchmarkTestHelper):
+    SIZES = [10000, 100000]
+    MONTHS = 120
+    BATCH_SIZE = 5000
+
+    def test_benchmark_running_balances(self):
+        rows = []
+        created = 0
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+
+            for period in timeseries.PERIODS:
+                points, elapsed, queries = self.measure(
+                    timeseries.get_running_balances, self.user.id, date(2017, 1, 1), date(2018, 12, 31), period)
+                rows.append((size, period, len(points), queries, '{:.1f}'.format(elapsed * 1000)))
+
+            _, elapsed, queries = self.measure(self.calculate_each_month)
+            rows.append((size, 'plain calls', 24, queries, '{:.1f}'.format(elapsed * 1000)))
+
+        self.report('running balances of two years', ['transactions', 'period', 'points', 'queries', 'ms'], rows)
+
+    def calculate_each_month(self):
+        for month in range(24):
+            until = date(2017, 1, 31) + relativedelta(months=month)
+            for consider in [based.EFFECTIVE, based.REAL]:
+                CalculatorBuilder().owned_by(self.user.id).consider(consider).until(until).as_plain().build()\
+                    .calculate()
+
+    def create_transactions(self, start, end):
+        for batch_start in range(start, end, self.BATCH_SIZE):
+            batch = [self.create_unsaved(i) for i in range(batch_start, min(batch_start + self.BATCH_SIZE, end))]
+            Transaction.objects.bulk_create(batch, batch_size=500)
+            post_bulk_create.send(sender=Transaction, instances=batch)
+
+    def create_unsaved(self, i):
+        due_date = date(2015, 1, 1) + relativedelta(months=i % self.MONTHS, days=i % 28)
+        is_income = i % 4 == 0
+
+        return Transaction(
+            account=self.account,
+            user=self.user,
+            category=self.income_category if is_income else self.expense_category,
+            kind=Transaction.INCOME_KIND if is_income else Transaction.EXPENSE_KIND,
+            value=10 if is_income else -10,
+            description='benchmark',
+            due_date=due_date,
+            payment_date=due_date + relativedelta(days=i % 45) if i % 3 else None
+        )
@@ -1,5 +1,3 @@
-from unittest import skip
-
 from django.test import TestCase
 
 from balances import views
@@ -14,15 +12,23 @@ class BalancesUrlsTestCase(TestCase, UrlsTestHelper):
     def test_resolves_detailed_balance(self):
         resolver = self.resolve_by_name('detailed-balance')
         self.assertEqual(resolver.func.cls, views.DetailedBalanceAPIView)
-    
-    @skip('not done')
+
     def test_resolves_complete_balance(self):
-        pass
+        resolver = self.resolve_by_name('complete-balance')
+        self.assertEqual(resolver.func.cls, views.CompleteBalanceAPIView)
+
+    def test_resolves_batch_balance(self):
+        resolver = self.resolve_by_name('batch-balance')
+        self.assertEqual(resolver.func.cls, views.BatchBalanceAPIView)
 
     def test_resolves_incomes_and_expenses_of_categories(self):
         resolver = self.resolve_by_name('detailed-balance-by-account')
         self.assertEqual(resolver.func.cls, views.DetailedAccountsBalanceAPIView)
 
+    def test_resolves_balance_timeseries(self):
+        resolver = self.resolve_by_name('balance-timeseries')
+        self.assertEqual(resolver.func, views.get_timeseries)
+
     def test_resolves_balance_periods(self):
         resolver = self.resolve_by_name('balance-periods')
         self.assertEqual(resolver.func, views.get_periods)
@@ -5,7 +5,11 @@ from balances import views
 urlpatterns = [
     url(r'^plain/$', views.PlainBalanceAPIView.as_view(), name="plain-balance"),
     url(r'^detailed/$', views.DetailedBalanceAPIView.as_view(), name="detailed-balance"),
+    url(r'^complete/$', views.CompleteBalanceAPIView.as_view(), name="complete-balance"),
+    url(r'^batch/$', views.BatchBalanceAPIView.as_view(), name="batch-balance"),
+    url(r'^timeseries/$', views.get_timeseries, name="balance-timeseries"),
     url(r'^periods/$', views.get_periods, name="balance-periods"),
+    url(r'^cache/stats/$', views.get_cache_stats, name="balance-cache-stats"),
     # accounts
     url(r'^accounts/detailed/$', views.DetailedAccountsBalanceAPIView.as_view(), name="detailed-balance-by-account"),
 ]
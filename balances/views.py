@@ -1,11 +1,14 @@
 from datetime import datetime
 
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from balances.factories import CalculatorBuilder, PeriodQueryBuilder
-from balances.serializers import PeriodSerializer
+from balances.serializers import BalanceQuerySerializer, PeriodSerializer, TimeseriesQuerySerializer
+from balances.services import batch, cache, timeseries
 from balances.strategies.query import based, outputs
 from common import dates_utils
 
@@ -15,27 +18,35 @@ consider_mapping = {
     'both': based.BOTH
 }
 
+outputs_mapping = {
+    'total': outputs.TOTAL,
+    'expenses': outputs.EXPENSES,
+    'incomes': outputs.INCOMES
+}
+
 
 class BaseBalanceAPIView(APIView):
 
     def get(self, request, format='json'):
         filters = self.create_filters()
-        consider = consider_mapping.get(request.query_params.get('based', 'effective'))
-
-        builder = self.create_builder(consider)
+        builder = self.create_builder(self.get_consider())
 
         calculator = self.create_calculator(builder)
         result = calculator.calculate(**filters)
 
         return self.create_response(result)
 
+    def get_consider(self):
+        return consider_mapping.get(self.request.query_params.get('based', 'effective'))
+
     def create_response(self, result):
         return Response(result)
 
     def create_builder(self, consider):
         builder = CalculatorBuilder()\
             .owned_by(self.request.user.id)\
-            .consider(consider)
+            .consider(consider)\
+            .cached()
 
         return self.apply_date(builder)
 
@@ -53,18 +64,23 @@ class BaseBalanceAPIView(APIView):
         start = query_params.get('from', False)
         end = query_params.get('until', False)
 
-        if specific_date:
-            return builder.on_date(dates_utils.from_str(specific_date))
+        def parse(value):
+            return dates_utils.from_str(value) if value else None
 
-        if start and end:
-            start = dates_utils.from_str(start)
-            end = dates_utils.from_str(end)
-            return builder.between_dates(start, end)
+        return apply_dates(builder, parse(specific_date), parse(start), parse(end))
 
-        if end:
-            return builder.until(dates_utils.from_str(end))
 
-        return builder.until(datetime.today())
+def apply_dates(builder, specific_date=None, start=None, end=None):
+    if specific_date:
+        return builder.on_date(specific_date)
+
+    if start and end:
+        return builder.between_dates(start, end)
+
+    if end:
+        return builder.until(end)
+
+    return builder.until(datetime.today())
 
 
 class PlainBalanceAPIView(BaseBalanceAPIView):
@@ -78,14 +94,60 @@ class PlainBalanceAPIView(BaseBalanceAPIView):
 
 class DetailedBalanceAPIView(BaseBalanceAPIView):
     def create_calculator(self, builder):
+        if builder.based == based.BOTH:
+            return builder.as_complete().build()
+
         return builder.as_detailed().build()
 
 
+class CompleteBalanceAPIView(BaseBalanceAPIView):
+    def get_consider(self):
+        return based.BOTH
+
+    def create_calculator(self, builder):
+        return builder.as_complete().build()
+
+
 class DetailedAccountsBalanceAPIView(BaseBalanceAPIView):
     def create_calculator(self, builder):
         return builder.as_detailed_accounts().build()
 
 
+class BatchBalanceAPIView(APIView):
+    """
+    Calculates several balances in one request, each query accepts the same parameters
+    of its format endpoint. Queries sharing dates are aggregated together.
+    """
+    max_queries = 20
+
+    formats = {
+        'plain': lambda builder, query: builder.as_plain(output=outputs_mapping[query['output']]),
+        'detailed': lambda builder, query: builder.as_detailed(),
+        'complete': lambda builder, query: builder.as_complete(),
+        'accounts': lambda builder, query: builder.as_detailed_accounts(),
+    }
+
+    def post(self, request, format='json'):
+        serializer = BalanceQuerySerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        if len(serializer.validated_data) > self.max_queries:
+            raise ValidationError('At most {} queries are allowed'.format(self.max_queries))
+
+        queries = [self.create_query(query) for query in serializer.validated_data]
+        return Response({'results': batch.calculate(request.user.id, queries)})
+
+    def create_query(self, query):
+        consider = based.BOTH if query['format'] == 'complete' else consider_mapping[query['based']]
+        builder = CalculatorBuilder()\
+            .owned_by(self.request.user.id)\
+            .consider(consider)\
+            .cached()
+        builder = apply_dates(builder, query.get('date'), query.get('from'), query.get('until'))
+
+        filters = {'payment_date__isnull': True} if query['pending'] else {}
+        return self.formats[query['format']](builder, query).build(), filters
+
+
 @api_view()
 def get_periods(request):
     cur_date = datetime.today()
@@ -100,3 +162,25 @@ def get_periods(request):
     query = factory.build()
     serialized = PeriodSerializer(query, many=True).data
     return Response(serialized)
+
+
+@api_view()
+def get_timeseries(request):
+    serializer = TimeseriesQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    query = serializer.validated_data
+
+    points = timeseries.get_running_balances(request.user.id, query['from'], query['until'], query['period'])
+
+    consider = consider_mapping[query['based']]
+    if consider != based.BOTH:
+        key = 'real' if consider == based.REAL else 'effective'
+        points = [{'date': point['date'], key: point[key]} for point in points]
+
+    return Response(points)
+
+
+@api_view()
+@permission_classes((IsAdminUser,))
+def get_cache_stats(request):
+    return Response(cache.get_stats())
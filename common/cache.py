@@ -0,0 +1,37 @@
+from collections import OrderedDict
+from itertools import islice
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache, _caches, dummy
+
+
+class LRULocMemCache(LocMemCache):
+    """
+    Local memory cache that culls least recently used entries when MAX_ENTRIES is reached,
+    instead of every CULL_FREQUENCY-th entry in insertion order.
+    """
+
+    def __init__(self, name, params):
+        _caches.setdefault(name, OrderedDict())
+        super(LRULocMemCache, self).__init__(name, params)
+
+    def get(self, key, default=None, version=None, acquire_lock=True):
+        value = super(LRULocMemCache, self).get(key, default, version, acquire_lock)
+
+        key = self.make_key(key, version=version)
+        with (self._lock.writer() if acquire_lock else dummy()):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+
+        return value
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        super(LRULocMemCache, self)._set(key, value, timeout)
+        self._cache.move_to_end(key)
+
+    def _cull(self):
+        if self._cull_frequency == 0:
+            return self.clear()
+
+        for key in list(islice(self._cache, max(len(self._cache) // self._cull_frequency, 1))):
+            self._delete(key)
@@ -0,0 +1,107 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime
+from heapq import merge
+from itertools import islice
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in forward pagination by "?page_size=" or "?cursor=", ordered by (date_field, id).
+    Pages are read by seeking after last seen row, so its cost doesn't grow with how deep the page is,
+    and rows inserted before the cursor never shift later pages.
+
+    Unsaved instances can be merged into pages too, they go after saved rows of the same date
+    ordered by unsaved_id_field, as they have no id.
+    """
+    date_field = 'due_date'
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 100
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+    unsaved_id_field = None
+
+    SAVED, UNSAVED = 0, 1
+
+    def paginate_queryset(self, queryset, request, view=None, unsaved=()):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.after = self.decode_cursor(params.get(self.cursor_query_param))
+
+        queryset = queryset.order_by(self.date_field, 'id')
+        unsaved = sorted(unsaved, key=self.get_position)
+        if self.after is not None:
+            queryset = self.seek(queryset, *self.after)
+            unsaved = [x for x in unsaved if self.get_position(x) > self.after]
+
+        rows = list(queryset[:self.page_size + 1])
+        rows = list(islice(merge(rows, unsaved, key=self.get_position), self.page_size + 1))
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        self.until = self.get_position(self.page[-1]) if self.has_next else None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.until))
+
+    def get_position(self, instance):
+        if instance.pk is None:
+            return getattr(instance, self.date_field), self.UNSAVED, getattr(instance, self.unsaved_id_field)
+        return getattr(instance, self.date_field), self.SAVED, instance.pk
+
+    def seek(self, queryset, date_value, rank, pk):
+        if rank == self.UNSAVED:
+            return queryset.filter(**{self.date_field + '__gt': date_value})
+
+        # Redundant >= lets the planner start an index range scan at cursor date
+        after = Q(**{self.date_field + '__gt': date_value}) | Q(**{self.date_field: date_value, 'id__gt': pk})
+        return queryset.filter(after, **{self.date_field + '__gte': date_value})
+
+    def encode_cursor(self, position):
+        date_value, rank, pk = position
+        raw = '{}|{}|{}'.format(date_value.isoformat(), rank, pk)
+        return urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, encoded):
+        if encoded is None:
+            return None
+
+        try:
+            date_value, rank, pk = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            position = datetime.strptime(date_value, '%Y-%m-%d').date(), int(rank), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if position[1] not in (self.SAVED, self.UNSAVED):
+            raise NotFound(self.invalid_cursor_message)
+        return position
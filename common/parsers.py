@@ -0,0 +1,24 @@
+import codecs
+import csv
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CsvParser(BaseParser):
+    """
+    Parses CSV with a header line into a list of dicts.
+    Empty cells are left out, so they fall back to defaults just like missing JSON keys.
+    """
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            reader = csv.DictReader(codecs.getreader(encoding)(stream))
+            return [{key: value for key, value in row.items() if value != ''} for row in reader]
+        except (csv.Error, ValueError) as exc:
+            raise ParseError('CSV parse error - %s' % exc)
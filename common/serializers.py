@@ -1,3 +1,9 @@
+from collections import OrderedDict
+from datetime import date
+from operator import attrgetter
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
 
 
@@ -31,3 +37,61 @@ class SerializerMayReturnListMixin:
             return [super(SerializerMayReturnListMixin, self).to_representation(x) for x in value]
 
         return super(SerializerMayReturnListMixin, self).to_representation(value)
+
+
+class ValuesRowSerializer:
+    """
+    Read only fast path of a ModelSerializer for list endpoints.
+    Rows are read by values_list (or attributes of unsaved instances) and each value is converted
+    by a table compiled once from serializer fields, so nor model instances nor fields are walked per row.
+    Output is the same serializer_class(many=True).data would be.
+    """
+    serializer_class = None
+    identity_fields = (serializers.IntegerField, serializers.CharField, serializers.ChoiceField,
+                       serializers.PrimaryKeyRelatedField)
+    """Fields whose representation of a database value is the value itself"""
+
+    _compiled = None
+
+    @classmethod
+    def compile(cls):
+        if cls.__dict__.get('_compiled') is None:
+            meta = cls.serializer_class.Meta.model._meta
+            fields = [(name, field) for name, field in cls.serializer_class().fields.items() if not field.write_only]
+            cls._compiled = (
+                tuple(name for name, field in fields),
+                tuple(meta.get_field(field.source).attname for name, field in fields),
+                tuple(cls.get_converter(field) for name, field in fields)
+            )
+        return cls._compiled
+
+    @classmethod
+    def get_converter(cls, field):
+        """Gets a function representing a not null value, or None when value is represented as is"""
+        if isinstance(field, serializers.DecimalField) and field.decimal_places is not None \
+                and getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING) and not field.localize:
+            return '{{:.{}f}}'.format(field.decimal_places).format
+        if isinstance(field, serializers.DateField) and \
+                str(getattr(field, 'format', api_settings.DATE_FORMAT)).lower() == ISO_8601:
+            return date.isoformat
+        if isinstance(field, cls.identity_fields):
+            return None
+        return field.to_representation
+
+    def to_representation(self, rows):
+        names, attnames, converters = self.compile()
+        pairs = tuple(zip(names, converters))
+        return [
+            OrderedDict((name, value if converter is None or value is None else converter(value))
+                        for (name, converter), value in zip(pairs, row))
+            for row in rows
+        ]
+
+    def serialize_queryset(self, queryset):
+        names, attnames, converters = self.compile()
+        return self.to_representation(queryset.values_list(*attnames))
+
+    def serialize_instances(self, instances):
+        names, attnames, converters = self.compile()
+        getter = attrgetter(*attnames)
+        return self.to_representation(getter(x) for x in instances)
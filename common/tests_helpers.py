@@ -1,3 +1,11 @@
+import os
+import time
+from unittest import TextTestResult, skipUnless
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
 from django.urls import resolve, reverse
 
 
@@ -33,3 +41,40 @@ class SerializerTestHelper:
         context = self.serializer_context
         context.update(kwargs)
         return context
+
+
+def benchmark(test_item):
+    """Marks heavy benchmarks, which only run when BENCHMARK environment variable is set"""
+    return skipUnless(os.environ.get('BENCHMARK'), 'set BENCHMARK=1 to run benchmarks')(test_item)
+
+
+class BenchmarkTestHelper:
+    def measure(self, func, *args, **kwargs):
+        """Runs func and returns its result, elapsed seconds and amount of queries"""
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+
+        return result, elapsed, len(context.captured_queries)
+
+    def report(self, title, header, rows):
+        print('\n' + title)
+        lines = [header] + [[str(x) for x in row] for row in rows]
+        widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+        for line in lines:
+            print('  ' + '  '.join(cell.rjust(width) for cell, width in zip(line, widths)))
+
+
+class CacheClearingTextTestResult(TextTestResult):
+    def startTest(self, test):
+        for cache in caches.all():
+            cache.clear()
+        super(CacheClearingTextTestResult, self).startTest(test)
+
+
+class CacheClearingTestRunner(DiscoverRunner):
+    """Runs every test with empty caches, as cache isn't rolled back with database"""
+
+    def get_resultclass(self):
+        return super(CacheClearingTestRunner, self).get_resultclass() or CacheClearingTextTestResult
@@ -1,10 +1,13 @@
+from rest_framework import status
 from rest_framework.response import Response
 
 
 class PatchModelListMixin:
     """
     Patch a list of instances passed by "?ids=1,2,3" on query params.
+    When only bulk_update_fields are patched, payload is validated once and written with a single UPDATE.
     """
+    bulk_update_fields = ()
 
     def partial_update_list(self, request, *args, **kwargs):
         param_ids = self.request.query_params.get('ids', False)
@@ -12,7 +15,10 @@ class PatchModelListMixin:
             ids = param_ids.split(',')
             queryset = self.get_queryset().filter(id__in=ids)
             filtered = self.filter_queryset(queryset)
-            to_return = self.perform_partial_update_list(request.data, filtered)
+            if request.data and set(request.data) <= set(self.bulk_update_fields):
+                to_return = self.perform_bulk_partial_update(request.data, filtered)
+            else:
+                to_return = self.perform_partial_update_list(request.data, filtered)
 
             return Response(to_return)
 
@@ -28,3 +34,16 @@ class PatchModelListMixin:
             to_return.append(serializer.data)
 
         return to_return
+
+    def perform_bulk_partial_update(self, data, queryset):
+        serializer = self.get_serializer(data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+
+        ids = list(queryset.values_list('id', flat=True))
+        self.perform_bulk_update(queryset.model.objects.filter(id__in=ids), serializer.validated_data)
+
+        updated = queryset.model.objects.filter(id__in=ids).order_by('id')
+        return self.get_serializer(updated, many=True).data
+
+    def perform_bulk_update(self, queryset, validated_data):
+        queryset.update(**validated_data)
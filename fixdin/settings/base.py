@@ -64,6 +64,28 @@ REST_FRAMEWORK = {
 
 EXPIRING_TOKEN_LIFESPAN = datetime.timedelta(days=90)
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Balance results, invalidated by a per user version bumped on every write
+    'balances': {
+        'BACKEND': 'common.cache.LRULocMemCache',
+        'LOCATION': 'balances',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 10,
+        }
+    }
+}
+
+# Tests share cache between them while database changes are rolled back, so caches are cleared before each one
+TEST_RUNNER = 'common.tests_helpers.CacheClearingTestRunner'
+
+# Queues period balances changes to be applied by process_dirty_periods command instead of on request
+BALANCES_ASYNC_PERIODS = False
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -3,7 +3,8 @@ import os
 
 import dj_database_url
 
-from fixdin.settings.base import *
+from fixdin.settings.base import *  # noqa: F401,F403
+from fixdin.settings.base import CACHES, DATABASES
 
 SECRET_KEY = os.environ['SECRET_KEY']
 DEBUG = False
@@ -13,6 +14,14 @@ DATABASES['default'] = dj_database_url.config()
 
 AWS_STORAGE_BUCKET_NAME = os.environ['AWS_STORAGE_BUCKET_NAME']
 
+# Shares balances cache between workers, server should evict with maxmemory-policy allkeys-lru
+if 'REDIS_URL' in os.environ:
+    CACHES['balances'] = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+        'TIMEOUT': 60 * 60,
+    }
+
 # Allow all host headers
 ALLOWED_HOSTS = ['*']
 
@@ -139,7 +139,7 @@ class CPFL_SyncService(SyncService):
 
     def _should_create_transaction(self, conta):
         tag = self._generate_ref_tag(conta)
-        if Transaction.objects.filter(account__user=self.user, generic_tag=tag).exists():
+        if Transaction.objects.filter(user=self.user, generic_tag=tag).exists():
             return False
         return True
 
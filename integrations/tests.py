@@ -166,11 +166,11 @@ class CPFL_SyncServiceTestCase(TestCase):
 
         with patch('transactions.models.Transaction.objects.filter', side_effect=filter_side_effect) as mock:
             self.assertFalse(self.cpfl_sync_service._should_create_transaction(CONTAS_RECUPERADAS_MOCK[0]))
-            mock.assert_called_once_with(account__user=self.user_mock, generic_tag='1')
+            mock.assert_called_once_with(user=self.user_mock, generic_tag='1')
 
             self.assertTrue(self.cpfl_sync_service._should_create_transaction(CONTAS_RECUPERADAS_MOCK[1]))
             self.assertEqual(mock.call_count, 2)
-            mock.assert_called_with(account__user=self.user_mock, generic_tag='2')
+            mock.assert_called_with(user=self.user_mock, generic_tag='2')
 
     @patch('transactions.models.Account.objects.filter')
     @patch('transactions.models.Category.objects.filter')
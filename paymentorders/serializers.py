@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+from transactions.serializers import TransactionRowSerializer
+
+
+class PaymentPlanMonthSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    payed = serializers.DecimalField(max_digits=20, decimal_places=2)
+    balance = serializers.DecimalField(max_digits=20, decimal_places=2)
+
+
+class PaymentPlanSerializer(serializers.Serializer):
+    chosen = serializers.SerializerMethodField()
+    months = PaymentPlanMonthSerializer(many=True)
+
+    def get_chosen(self, obj):
+        return TransactionRowSerializer().serialize_instances(obj['chosen'])
@@ -1,11 +1,15 @@
+import heapq
+from collections import defaultdict
 from datetime import date
+from decimal import ROUND_CEILING, Decimal
 from itertools import groupby
+from operator import attrgetter
 
 from dateutil.relativedelta import relativedelta
 from django.db.models.functions import TruncMonth
 
 from common import dates_utils
-from transactions.models import HasKind, Transaction
+from transactions.models import Account, HasKind, Transaction
 
 
 class NextExpensesService:
@@ -26,27 +30,26 @@ class NextExpensesService:
                 kind=HasKind.EXPENSE_KIND
             ).annotate(
                 date=TruncMonth('due_date')
-            ).order_by('description')
+            ).order_by('description', 'account_id', 'due_date', 'id')
 
     def _group_queryset_over_dates(self, queryset):
-        groupped = []
+        """
+        Single pass over transactions sorted by the grouping key,
+        each one appended to the month bucket of its group.
+        """
+        keys = [x.strftime('%Y-%m-%d') for x in self.get_dates()]
         result = []
-        dates = self._get_dates()
-        data = list(queryset)
 
-        for key, group in groupby(data, lambda x: x.description + str(x.account_id)):
-            groupped.append(list(group))
-
-        for group in groupped:
-            group_date = {}
-            for cur_date in dates:
-                group_date[cur_date.strftime('%Y-%m-%d')
-                           ] = [transaction for transaction in group if transaction.date == cur_date]
-            result.append(group_date)
+        for key, group in groupby(queryset, attrgetter('description', 'account_id')):
+            buckets = {month: [] for month in keys}
+            for transaction in group:
+                buckets[transaction.due_date.strftime('%Y-%m-01')].append(transaction)
+            result.append(buckets)
 
         return result
 
-    def _get_dates(self):
+    def get_dates(self):
+        """Lists first day of each month inside window"""
         cur_date = self.from_date
         result = []
 
@@ -55,3 +58,128 @@ class NextExpensesService:
             cur_date += relativedelta(months=1)
 
         return result
+
+
+class PaymentPlanService:
+    """
+    Plans which pending expenses of NextExpensesService window can be payed
+    with current real balance of their accounts, month by month.
+    """
+
+    def __init__(self, user_id, from_date, until_date):
+        self.user_id = user_id
+        self.expenses_service = NextExpensesService(user_id, from_date, until_date)
+
+    def generate_plan(self):
+        """
+        :return: Dict with chosen expenses and, for each month, what is payed
+            and balance projected after paying it, summed over every account
+        """
+        months = self.expenses_service.get_dates()
+        indexes = {x.strftime('%Y-%m-%d'): i for i, x in enumerate(months)}
+        pending = defaultdict(lambda: [[] for _ in months])
+        for group in self.expenses_service.generate_data():
+            for key, transactions in group.items():
+                i = indexes[key]
+                for transaction in transactions:
+                    if transaction.payment_date is None:
+                        pending[transaction.account_id][i].append(transaction)
+
+        chosen = []
+        payed = [Decimal(0)] * len(months)
+        balances = [Decimal(0)] * len(months)
+        accounts = Account.objects.filter(user_id=self.user_id).order_by('id').values_list('id', 'current_real_balance')
+        for account_id, cash in accounts:
+            account_chosen, account_balances = plan_payments(pending.get(account_id, [[]] * len(months)), cash)
+            for i, (month_chosen, balance) in enumerate(zip(account_chosen, account_balances)):
+                chosen.extend(month_chosen)
+                payed[i] -= sum(x.value for x in month_chosen)
+                balances[i] += balance
+
+        return {
+            'chosen': chosen,
+            'months': [{'date': month, 'payed': payed[i], 'balance': balances[i]} for i, month in enumerate(months)]
+        }
+
+
+KNAPSACK_ITEMS = 100
+"""Most ranked candidates knapsack chooses from, when the next ranked expense doesn't fit"""
+
+KNAPSACK_CAPACITY = 200
+"""Units cash is split into by knapsack, costs are rounded up to those so cash is never exceeded"""
+
+
+def get_rank(transaction):
+    """Higher priorities go first, then smaller deadlines and sooner due dates"""
+    return (-transaction.priority, transaction.deadline, transaction.due_date, transaction.id or 0)
+
+
+def plan_payments(months, cash):
+    """
+    Chooses expenses of a single account month by month.
+    Candidates are kept on a priority queue by rank, ones not payed are still candidates on next months.
+    Expenses are payed in rank order while the next one fits on cash left,
+    then a knapsack picks the best set of remaining candidates for what's left.
+
+    :param months: List of pending expenses due on each month
+    :param cash: Real balance available before first month
+    :return: Tuple of expenses chosen on each month and balance left after each month
+    """
+    candidates = []
+    chosen, balances = [], []
+    for transactions in months:
+        for transaction in transactions:
+            heapq.heappush(candidates, (get_rank(transaction), id(transaction), transaction))
+
+        month_chosen = []
+        while candidates and -candidates[0][2].value <= cash:
+            transaction = heapq.heappop(candidates)[2]
+            cash += transaction.value
+            month_chosen.append(transaction)
+
+        if candidates and cash > 0:
+            best = heapq.nsmallest(KNAPSACK_ITEMS, candidates)
+            picked = set(id(x) for x in choose_by_knapsack([x[2] for x in best], cash))
+            if picked:
+                month_chosen.extend(x[2] for x in best if id(x[2]) in picked)
+                cash += sum(x[2].value for x in best if id(x[2]) in picked)
+                candidates = [x for x in candidates if id(x[2]) not in picked]
+                heapq.heapify(candidates)
+
+        chosen.append(month_chosen)
+        balances.append(cash)
+
+    return chosen, balances
+
+
+def choose_by_knapsack(expenses, cash):
+    """
+    0/1 knapsack over cash split in at most KNAPSACK_CAPACITY units.
+    It maximizes priority of chosen expenses first and then how much is payed.
+
+    :param expenses: Candidates, none of them may be chosen
+    :param cash: Positive amount available
+    :return: Chosen expenses
+    """
+    unit = max(cash / KNAPSACK_CAPACITY, Decimal('0.01'))
+    capacity = int(cash / unit)
+    costs = [int((-x.value / unit).to_integral_value(rounding=ROUND_CEILING)) for x in expenses]
+    weights = [(x.priority + 1) * (capacity + 1) + cost for x, cost in zip(expenses, costs)]
+
+    best = [0] * (capacity + 1)
+    taken = []
+    for cost, weight in zip(costs, weights):
+        row = [False] * (capacity + 1)
+        for room in range(capacity, cost - 1, -1):
+            if best[room - cost] + weight > best[room]:
+                best[room] = best[room - cost] + weight
+                row[room] = True
+        taken.append(row)
+
+    result = []
+    room = capacity
+    for i in reversed(range(len(expenses))):
+        if taken[i][room]:
+            result.append(expenses[i])
+            room -= costs[i]
+    return result[::-1]
@@ -1,14 +1,20 @@
+import time
 from datetime import date
+from decimal import Decimal
 from unittest import skip
 from unittest.mock import MagicMock, patch
 
+from dateutil.relativedelta import relativedelta
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
-from common.tests_helpers import UrlsTestHelper
-from paymentorders.services import NextExpensesService
-from paymentorders.views import PaymentOrderAPIView
+from common.tests_helpers import BenchmarkTestHelper, UrlsTestHelper, benchmark
+from paymentorders.services import NextExpensesService, PaymentPlanService, plan_payments
+from paymentorders.views import PaymentOrderAPIView, PaymentPlanAPIView
+from transactions.models import Transaction
 from transactions.tests.base_test import BaseTestHelperFactory, WithoutSignalsMixin
 
 
@@ -17,6 +23,10 @@ class PaymentOrderUrlTestCase(TestCase, UrlsTestHelper):
         resolver = self.resolve_by_name('payment-orders')
         self.assertEqual(resolver.func.cls, PaymentOrderAPIView)
 
+    def test_resolves_plan_url(self):
+        resolver = self.resolve_by_name('payment-plan')
+        self.assertEqual(resolver.func.cls, PaymentPlanAPIView)
+
 
 class PaymentOrderApiTestCase(TestCase, BaseTestHelperFactory):
 
@@ -116,7 +126,7 @@ class NextExpensesServiceTestCase(WithoutSignalsMixin, TestCase, BaseTestHelperF
 
     def test_service_gets_correctly_dates(self):
         service = NextExpensesService(self.user.id, date(2018, 1, 30), date(2018, 4, 1))
-        self.assertEqual(service._get_dates(), [
+        self.assertEqual(service.get_dates(), [
             date(2018, 1, 1),
             date(2018, 2, 1),
             date(2018, 3, 1),
@@ -171,3 +181,235 @@ class NextExpensesServiceTestCase(WithoutSignalsMixin, TestCase, BaseTestHelperF
         self.assertEqual(data[0]['2018-02-01'], [])
         self.assertEqual(data[0]['2018-03-01'], [])
         self.assertEqual(data[0]['2018-04-01'], [hat2])
+
+
+class NextExpensesGroupingTestCase(WithoutSignalsMixin, TestCase, BaseTestHelperFactory):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user, token = cls.create_user(email='testuser@test.com', password='testing')
+        cls.category = cls.create_category('category')
+        cls.income_category = cls.create_category('income', kind=Transaction.INCOME_KIND)
+        cls.account = cls.create_account()
+        cls.other_account = cls.create_account(name='other')
+
+    def test_groups_same_description_by_account(self):
+        rent1 = self.create_transaction(-100, 'rent', due_date=date(2018, 1, 5))
+        other_rent1 = self.create_transaction(-50, 'rent', due_date=date(2018, 1, 5), account=self.other_account)
+        rent2 = self.create_transaction(-100, 'rent', due_date=date(2018, 2, 5))
+        other_rent2 = self.create_transaction(-50, 'rent', due_date=date(2018, 2, 5), account=self.other_account)
+
+        data = NextExpensesService(self.user.id, date(2018, 1, 1), date(2018, 2, 1)).generate_data()
+
+        self.assertEqual(data, [
+            {'2018-01-01': [rent1], '2018-02-01': [rent2]},
+            {'2018-01-01': [other_rent1], '2018-02-01': [other_rent2]},
+        ])
+
+    def test_fills_every_month_of_window_with_one_query(self):
+        hat = self.create_transaction(-100, 'hat', due_date=date(2019, 6, 30))
+
+        with self.assertNumQueries(1):
+            data = NextExpensesService(self.user.id, date(2018, 1, 15), date(2027, 12, 1)).generate_data()
+
+        self.assertEqual(len(data), 1)
+        self.assertEqual(len(data[0]), 120)
+        self.assertEqual(data[0]['2019-06-01'], [hat])
+        self.assertEqual(sum(len(x) for x in data[0].values()), 1)
+
+
+@benchmark
+class NextExpensesBenchmarkTestCase(WithoutSignalsMixin, TestCase, BaseTestHelperFactory, BenchmarkTestHelper):
+    SIZES = [10000, 100000]
+    MONTHS = 120
+    DESCRIPTIONS = 500
+    BATCH_SIZE = 5000
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user, token = cls.create_user(email='testuser@test.com', password='testing')
+        cls.category = cls.create_category('category')
+        cls.account = cls.create_account()
+
+    def test_benchmark_generate_data(self):
+        rows = []
+        created = 0
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+
+            service = NextExpensesService(self.user.id, date(2018, 1, 1), date(2027, 12, 1))
+            data, elapsed, queries = self.measure(service.generate_data)
+            self.assertEqual(len(data), self.DESCRIPTIONS)
+            rows.append((size, self.MONTHS, queries, '{:.1f}'.format(elapsed * 1000)))
+
+        self.report('payment orders (10 years)', ['transactions', 'months', 'queries', 'ms'], rows)
+
+    def create_transactions(self, start, end):
+        for batch_start in range(start, end, self.BATCH_SIZE):
+            batch = [self.create_unsaved(i) for i in range(batch_start, min(batch_start + self.BATCH_SIZE, end))]
+            Transaction.objects.bulk_create(batch, batch_size=500)
+
+    def create_unsaved(self, i):
+        return Transaction(
+            account=self.account,
+            user=self.user,
+            category=self.category,
+            kind=Transaction.EXPENSE_KIND,
+            value=-10,
+            description='expense {}'.format(i % self.DESCRIPTIONS),
+            due_date=date(2018, 1, 1) + relativedelta(months=i % self.MONTHS, days=i % 28)
+        )
+
+
+class PlanPaymentsTestCase(TestCase):
+
+    def test_pays_by_priority_then_deadline(self):
+        low = self.expense(-50, priority=1)
+        high = self.expense(-50, priority=5)
+        urgent = self.expense(-50, priority=3, deadline=1)
+        late = self.expense(-50, priority=3, deadline=9)
+
+        chosen, balances = plan_payments([[low, late, urgent, high]], Decimal(150))
+
+        self.assertEqual(chosen, [[high, urgent, late]])
+        self.assertEqual(balances, [0])
+
+    def test_fills_left_cash_with_best_set_when_next_doesnt_fit(self):
+        too_big = self.expense(-120, priority=3)
+        first = self.expense(-60, priority=2)
+        second = self.expense(-50, priority=2)
+        small = self.expense(-40, priority=1)
+
+        chosen, balances = plan_payments([[too_big, first, second, small]], Decimal(100))
+
+        self.assertEqual(chosen, [[first, small]])
+        self.assertEqual(balances, [0])
+
+    def test_keeps_not_payed_as_candidates_of_next_months(self):
+        big = self.expense(-80, priority=2)
+        urgent = self.expense(-30, priority=5)
+        cheap = self.expense(-10, priority=1)
+
+        chosen, balances = plan_payments([[big], [urgent, cheap], []], Decimal('50.50'))
+
+        self.assertEqual(chosen, [[], [urgent, cheap], []])
+        self.assertEqual(balances, [Decimal('50.50'), Decimal('10.50'), Decimal('10.50')])
+
+    def test_pays_nothing_without_cash(self):
+        chosen, balances = plan_payments([[self.expense(-10)]], Decimal(-5))
+
+        self.assertEqual(chosen, [[]])
+        self.assertEqual(balances, [-5])
+
+    def expense(self, value, priority=1, deadline=0, due_date=date(2018, 1, 10)):
+        return Transaction(value=Decimal(value), priority=priority, deadline=deadline, due_date=due_date,
+                           kind=Transaction.EXPENSE_KIND)
+
+
+class PaymentPlanApiTestCase(WithoutSignalsMixin, TestCase, BaseTestHelperFactory):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user, cls.token = cls.create_user(email='testuser@test.com', password='testing')
+        cls.category = cls.create_category('category')
+        cls.income_category = cls.create_category('income', kind=Transaction.INCOME_KIND)
+        cls.account = cls.create_account()
+        cls.other_account = cls.create_account(name='other')
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+        self.today = date.today()
+        self.month = self.today.replace(day=1)
+        self.next_month = self.month + relativedelta(months=1)
+
+    def test_plans_each_account_with_its_balance(self):
+        self.create_transaction(600, 'salary', category=self.income_category, due_date=self.today,
+                                payment_date=self.today)
+        self.create_transaction(-500, 'payed', due_date=self.today, payment_date=self.today)
+        self.create_transaction(30, 'gift', category=self.income_category, due_date=self.today,
+                                payment_date=self.today, account=self.other_account)
+        rent = self.create_transaction(-70, 'rent', due_date=self.month, priority=5)
+        self.create_transaction(-50, 'hat', due_date=self.month + relativedelta(days=10), priority=1)
+        gym = self.create_transaction(-30, 'gym', due_date=self.next_month, account=self.other_account)
+
+        response = self.get_plan()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([x['id'] for x in response.data['chosen']], [rent.id, gym.id])
+        self.assertEqual(response.data['months'], [
+            {'date': str(self.month), 'payed': '70.00', 'balance': '60.00'},
+            {'date': str(self.next_month), 'payed': '30.00', 'balance': '30.00'},
+        ])
+
+    def test_plans_with_balance_of_transactions_written_through_api(self):
+        for value, due_date, payment_date in [(1000, self.today, self.today), (-300, self.month, None),
+                                              (-900, self.next_month, None)]:
+            category, kind = (self.income_category, Transaction.INCOME_KIND) if value > 0 else \
+                (self.category, Transaction.EXPENSE_KIND)
+            response = self.client.post(reverse('transactions'), {
+                'account': self.account.id, 'category': category.id, 'description': 'api', 'kind': kind, 'value': value,
+                'due_date': due_date, 'payment_date': payment_date, 'priority': 1, 'deadline': 0,
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.get_plan()
+
+        self.assertEqual([x['value'] for x in response.data['chosen']], ['-300.00'])
+        self.assertEqual([x['balance'] for x in response.data['months']], ['700.00', '700.00'])
+
+    def test_plans_with_balance_of_history_over_several_months(self):
+        for months in [3, 2, 1]:
+            due_date = self.month - relativedelta(months=months)
+            self.create_transaction(100, 'salary', category=self.income_category, due_date=due_date,
+                                    payment_date=due_date)
+        rent = self.create_transaction(-250, 'rent', due_date=self.month, priority=5)
+        self.create_transaction(-100, 'hat', due_date=self.next_month)
+
+        response = self.get_plan()
+
+        self.assertEqual([x['id'] for x in response.data['chosen']], [rent.id])
+        self.assertEqual([x['balance'] for x in response.data['months']], ['50.00', '50.00'])
+
+    def test_reads_expenses_accounts_and_balances_once(self):
+        self.create_transaction(-70, 'rent', due_date=date(2018, 1, 5))
+        self.create_account(name='third')
+        service = PaymentPlanService(self.user.id, date(2018, 1, 1), date(2018, 12, 1))
+
+        with CaptureQueriesContext(connection) as context:
+            service.generate_plan()
+        self.create_account(name='fourth')
+
+        with self.assertNumQueries(len(context.captured_queries)):
+            service.generate_plan()
+
+    def get_plan(self):
+        return self.client.get(reverse('payment-plan'), {'from': str(self.month), 'until': str(self.next_month)})
+
+
+@benchmark
+class PlanPaymentsBenchmarkTestCase(TestCase, BenchmarkTestHelper):
+    SIZES = [1000, 5000, 20000]
+    MONTHS = 12
+
+    def test_benchmark_plan_payments(self):
+        rows = []
+        for size in self.SIZES:
+            months = [[] for _ in range(self.MONTHS)]
+            for i in range(size):
+                months[i % self.MONTHS].append(Transaction(
+                    value=-Decimal(10 + i % 97), priority=i % 6, deadline=i % 30,
+                    due_date=date(2018, 1 + i % self.MONTHS, 1 + i % 28), kind=Transaction.EXPENSE_KIND))
+            cash = Decimal(size * 20)
+
+            start = time.perf_counter()
+            chosen, balances = plan_payments(months, cash)
+            elapsed = time.perf_counter() - start
+
+            self.assertGreaterEqual(balances[-1], 0)
+            rows.append((size, sum(len(x) for x in chosen), '{:.1f}'.format(elapsed * 1000)))
+
+        self.report('payment plan (12 months)', ['pending expenses', 'chosen', 'ms'], rows)
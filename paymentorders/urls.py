@@ -4,4 +4,5 @@ from paymentorders import views
 
 urlpatterns = [
     url(r'^$', views.PaymentOrderAPIView.as_view(), name="payment-orders"),
+    url(r'^plan/$', views.PaymentPlanAPIView.as_view(), name="payment-plan"),
 ]
@@ -5,8 +5,9 @@ from dateutil.relativedelta import relativedelta
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from paymentorders.services import NextExpensesService
-from transactions.serializers import TransactionSerializer
+from paymentorders.serializers import PaymentPlanSerializer
+from paymentorders.services import NextExpensesService, PaymentPlanService
+from transactions.serializers import TransactionRowSerializer
 
 
 class PaymentOrderAPIView(APIView):
@@ -24,9 +25,10 @@ class PaymentOrderAPIView(APIView):
         return self._serialize_data(raw)
 
     def _serialize_data(self, data):
+        serializer = TransactionRowSerializer()
         for group in data:
             for date_group in group:
-                group[date_group] = [TransactionSerializer(x).data for x in group[date_group]]
+                group[date_group] = serializer.serialize_instances(group[date_group])
 
         return data
 
@@ -39,3 +41,14 @@ class PaymentOrderAPIView(APIView):
         if 'until' in self.request.query_params:
             return parser.parse(self.request.query_params['until']).date()
         return date.today() + relativedelta(months=1)
+
+
+class PaymentPlanAPIView(PaymentOrderAPIView):
+    """
+    Plans which pending expenses of payment orders window to pay with accounts real balance,
+    ranked by priority and deadline, and projects balance left on each month.
+    """
+
+    def get(self, request, format='json'):
+        service = PaymentPlanService(request.user.id, self._get_from_date(), self._get_until_date())
+        return Response(PaymentPlanSerializer(service.generate_plan()).data)
@@ -0,0 +1,140 @@
+import calendar
+from datetime import date, timedelta
+from itertools import accumulate, groupby
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Sum
+
+from balances.models import MonthlyRollup
+from transactions import factories
+from transactions.models import BoundReasons, Transaction
+
+SERIES_HISTORY_YEARS = 2
+"""Periodic occurrences older than this aren't read, series without newer ones are over"""
+
+
+class ForecastReportFactory:
+    '''
+    Projects effective and real balances at the end of each month, from current month on.
+    Monthly rollups of past and known future transactions, recurrence occurrences and periodic series
+    extended past their last occurrence are added to month buckets, everything before current month to the first one.
+    Pending transactions and occurrences are expected to be payed on due date, or on current month when overdue.
+    It costs the same few grouped queries however many months are projected.
+    '''
+
+    def __init__(self, user_id, months, today=None):
+        self.user_id = user_id
+        self.months = months
+        today = today or date.today()
+        self.start = today.replace(day=1)
+        self.end = self.get_month(months - 1) + relativedelta(months=1, days=-1)
+
+    def generate_report(self):
+        effective = [0] * self.months
+        real = [0] * self.months
+
+        for row in self._get_rollups():
+            i = self.get_index(row['month'])
+            effective[i] += row['effective']
+            real[i] += row['real']
+
+        for row in self._get_pending():
+            real[self.get_index(row['due_date'])] += row['total']
+
+        for value, due_date in self._get_projected_occurrences():
+            i = self.get_index(due_date)
+            effective[i] += value
+            real[i] += value
+
+        return [
+            {'date': self.get_month(i), 'effective': effective_balance, 'real': real_balance}
+            for i, (effective_balance, real_balance) in enumerate(zip(accumulate(effective), accumulate(real)))
+        ]
+
+    def get_month(self, index):
+        return self.start + relativedelta(months=index)
+
+    def get_index(self, value):
+        """Bucket of the month value is in, every month before current one goes to current one"""
+        return max((value.year - self.start.year) * 12 + value.month - self.start.month, 0)
+
+    def _get_rollups(self):
+        return MonthlyRollup.objects\
+            .filter(account__user_id=self.user_id, month__lte=self.end)\
+            .values('month')\
+            .annotate(effective=Sum('effective_value'), real=Sum('real_value'))\
+            .order_by()
+
+    def _get_pending(self):
+        """Grouped by plain due date, which is cheaper than truncating every row to its month"""
+        return Transaction.objects\
+            .filter(user_id=self.user_id, payment_date__isnull=True, due_date__lte=self.end)\
+            .values('due_date')\
+            .annotate(total=Sum('value'))\
+            .order_by()
+
+    def _get_projected_occurrences(self):
+        for occurrence in factories.get_virtual_occurrences(self.user_id, until_date=self.end):
+            yield occurrence.value, occurrence.due_date
+
+        for occurrences in self._get_periodic_series():
+            due_dates = extend_series([due_date for due_date, value in occurrences], self.end)
+            if due_dates and due_dates[0] >= self.start:  # Otherwise series was over before current month
+                value = occurrences[-1][1]
+                for due_date in due_dates:
+                    yield value, due_date
+
+    def _get_periodic_series(self):
+        rows = Transaction.objects\
+            .filter(user_id=self.user_id, bound_reason=BoundReasons.PERIODIC_TRANSACTION,
+                    due_date__gte=self.start - relativedelta(years=SERIES_HISTORY_YEARS))\
+            .order_by('bound_transaction_id', 'due_date')\
+            .values_list('bound_transaction_id', 'due_date', 'value')
+
+        for key, group in groupby(rows, lambda x: x[0]):
+            yield [(due_date, value) for bound_transaction_id, due_date, value in group]
+
+
+def extend_series(dates, until):
+    """
+    Continues dates of a periodic series after its last one, until given date.
+    Periodics are generated by a fixed amount of months (clamped to the last day of short months) or days,
+    so that step is inferred back from them. Nothing is extended if no step explains every date.
+
+    :param dates: Sorted due dates of series occurrences
+    :param until: Last date to extend series to
+    """
+    if len(dates) < 2:
+        return []
+
+    months = [_month_number(b) - _month_number(a) for a, b in zip(dates, dates[1:])]
+    day = max(x.day for x in dates)
+    if months[0] > 0 and len(set(months)) == 1 and all(x.day == _clamp_day(x.year, x.month, day) for x in dates):
+        result = []
+        number = _month_number(dates[-1]) + months[0]
+        while True:
+            year, month = divmod(number, 12)
+            cur = date(year, month + 1, _clamp_day(year, month + 1, day))
+            if cur > until:
+                return result
+            result.append(cur)
+            number += months[0]
+
+    days = set((b - a).days for a, b in zip(dates, dates[1:]))
+    if len(days) == 1 and days != {0}:
+        step = timedelta(days=days.pop())
+        result, cur = [], dates[-1] + step
+        while cur <= until:
+            result.append(cur)
+            cur += step
+        return result
+
+    return []
+
+
+def _month_number(value):
+    return value.year * 12 + value.month - 1
+
+
+def _clamp_day(year, month, day):
+    return min(day, calendar.monthrange(year, month)[1])
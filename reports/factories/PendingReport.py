@@ -1,5 +1,6 @@
 from datetime import datetime
 
+from transactions import factories
 from transactions.models import Transaction
 
 
@@ -9,8 +10,9 @@ class PendingReportFactory:
         self.user_id = user_id
 
     def generate_report(self):
-        data = self._get_query()
-        report = self.aggregate_by_due_date(list(data))
+        data = list(self._get_query()) + self._get_virtual_occurrences()
+        data.sort(key=lambda x: (-x.priority, x.due_date, x.deadline))
+        report = self.aggregate_by_due_date(data)
 
         return report
 
@@ -21,6 +23,12 @@ class PendingReportFactory:
             .filter(**filters)\
             .order_by('-priority', 'due_date', 'deadline')
 
+    def _get_virtual_occurrences(self):
+        filters = self._get_filters()
+        filters.pop('user_id')
+
+        return factories.get_virtual_occurrences(self.user_id, **filters)
+
     def aggregate_by_due_date(self, data):
         today = datetime.today().date()
 
@@ -36,7 +44,7 @@ class PendingExpensesReportFactory(PendingReportFactory):
         return {
             "payment_date__isnull": True,
             "kind": Transaction.EXPENSE_KIND,
-            "account__user_id": self.user_id
+            "user_id": self.user_id
         }
 
 class PendingIncomesReportFactory(PendingReportFactory):
@@ -45,5 +53,5 @@ class PendingIncomesReportFactory(PendingReportFactory):
         return {
             "payment_date__isnull": True,
             "kind": Transaction.INCOME_KIND,
-            "account__user_id": self.user_id
+            "user_id": self.user_id
         }
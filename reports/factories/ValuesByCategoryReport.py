@@ -5,6 +5,7 @@ from dateutil.relativedelta import relativedelta
 from django.db.models import Sum
 from django.db.models.functions import TruncMonth
 
+from transactions import factories
 from transactions.models import Transaction
 
 
@@ -18,11 +19,19 @@ class ValuesByCategoryReportFactory:
         self.filters = filters
 
     def generate_report(self):
-        data = self._get_query()
+        data = self._merge_virtual(self._get_query())
         report = self._ignore_signals(data)        
         
         return report
 
+    def _merge_virtual(self, query):
+        by_category = {x['category_id']: x for x in query}
+        for occurrence in factories.get_virtual_occurrences(self.user_id, kind=self.filters['kind']):
+            row = by_category.setdefault(occurrence.category_id, {'category_id': occurrence.category_id, 'total': 0})
+            row['total'] += occurrence.value
+
+        return [by_category[x] for x in sorted(by_category)]
+
     def _ignore_signals(self, query):
         fixed = []
         for aggregation in query:
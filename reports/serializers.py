@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from transactions.serializers import TransactionSerializer
+from transactions.serializers import TransactionRowSerializer
 
 
 class LastMonthsSerializer(serializers.Serializer):
@@ -18,10 +18,30 @@ class LastMonthsSerializer(serializers.Serializer):
 
 
 class PendingSerializer(serializers.Serializer):
-    overdue = TransactionSerializer(many=True, read_only=True)
-    next = TransactionSerializer(many=True, read_only=True)
+    overdue = serializers.SerializerMethodField()
+    next = serializers.SerializerMethodField()
+
+    def get_overdue(self, obj):
+        return TransactionRowSerializer().serialize_instances(obj['overdue'])
+
+    def get_next(self, obj):
+        return TransactionRowSerializer().serialize_instances(obj['next'])
 
 
 class ValuesByCategorySerializer(serializers.Serializer):
     category_id = serializers.IntegerField()
     total = serializers.DecimalField(max_digits=20, decimal_places=2)
+
+
+class ForecastQuerySerializer(serializers.Serializer):
+    months = serializers.IntegerField(min_value=1, max_value=120, default=12)
+
+
+class ForecastSerializer(serializers.Serializer):
+    period = serializers.SerializerMethodField()
+    date = serializers.DateField(write_only=True)
+    effective = serializers.DecimalField(max_digits=20, decimal_places=2)
+    real = serializers.DecimalField(max_digits=20, decimal_places=2)
+
+    def get_period(self, obj):
+        return '{}-{:02d}'.format(obj['date'].year, obj['date'].month)
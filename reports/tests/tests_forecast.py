@@ -0,0 +1,182 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from common.tests_helpers import BenchmarkTestHelper, benchmark
+from balances.services import rollups
+from reports.factories.ForecastReport import ForecastReportFactory, extend_series
+from transactions.factories import create_periodic_transactions, create_recurrence
+from transactions.models import BoundReasons, Transaction
+from transactions.tests.base_test import UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class ExtendSeriesTestCase(TestCase):
+
+    def test_extends_months_clamped_to_month_end(self):
+        dates = [date(2017, 10, 31), date(2017, 11, 30), date(2017, 12, 31)]
+
+        self.assertEqual(extend_series(dates, date(2018, 4, 30)), [
+            date(2018, 1, 31), date(2018, 2, 28), date(2018, 3, 31), date(2018, 4, 30)
+        ])
+
+    def test_extends_every_few_months(self):
+        dates = [date(2017, 3, 10), date(2017, 6, 10)]
+
+        self.assertEqual(extend_series(dates, date(2018, 3, 9)), [date(2017, 9, 10), date(2017, 12, 10)])
+
+    def test_extends_days(self):
+        dates = [date(2017, 12, 18), date(2017, 12, 25)]
+
+        self.assertEqual(extend_series(dates, date(2018, 1, 15)),
+                         [date(2018, 1, 1), date(2018, 1, 8), date(2018, 1, 15)])
+
+    def test_doesnt_extend_irregular_or_single_dates(self):
+        irregular = [date(2017, 1, 10), date(2017, 2, 10), date(2017, 4, 10)]
+        self.assertEqual(extend_series(irregular, date(2018, 1, 1)), [])
+        self.assertEqual(extend_series([date(2017, 1, 10), date(2017, 2, 12), date(2017, 3, 10)], date(2018, 1, 1)), [])
+        self.assertEqual(extend_series([date(2017, 1, 10)], date(2018, 1, 1)), [])
+
+
+class ForecastReportTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_transaction(1000, due_date=date(2017, 12, 10), payment_date=date(2017, 12, 10),
+                               category=cls.income_category)
+        cls.create_transaction(-100, due_date=date(2017, 12, 20))  # Overdue
+        cls.create_transaction(-50, due_date=date(2018, 2, 10))
+        cls.create_transaction(-30, due_date=date(2018, 3, 5), payment_date=date(2018, 1, 10))
+        cls.create_periodic(-200, date(2017, 10, 31), 3)  # Unpayed until december, then extended
+        cls.create_periodic(-1000, date(2017, 1, 5), 3)  # Over on march
+        create_recurrence(account=cls.account, category=cls.expense_category, due_date=date(2018, 2, 5),
+                          description='virtual', value=-10, kind=Transaction.EXPENSE_KIND,
+                          periodic={'frequency': 'monthly', 'interval': 1, 'how_many': 2})
+
+    @classmethod
+    def create_periodic(cls, value, due_date, how_many):
+        create_periodic_transactions(account=cls.account, category=cls.expense_category, due_date=due_date,
+                                     description='periodic', value=value, kind=Transaction.EXPENSE_KIND,
+                                     periodic={'frequency': 'monthly', 'interval': 1, 'how_many': how_many})
+
+    def test_projects_balances_by_month(self):
+        report = ForecastReportFactory(self.user.id, 4, today=date(2018, 1, 15)).generate_report()
+
+        self.assertEqual(report, [
+            {'date': date(2018, 1, 1), 'effective': -2900, 'real': -2930},
+            {'date': date(2018, 2, 1), 'effective': -3160, 'real': -3190},
+            {'date': date(2018, 3, 1), 'effective': -3400, 'real': -3400},
+            {'date': date(2018, 4, 1), 'effective': -3600, 'real': -3600},
+        ])
+
+    def test_projects_overdue_occurrences_on_current_month(self):
+        create_recurrence(account=self.account, category=self.expense_category, due_date=date(2017, 12, 25),
+                          description='overdue', value=-40, kind=Transaction.EXPENSE_KIND,
+                          periodic={'frequency': 'monthly', 'interval': 1, 'how_many': 2})
+
+        report = ForecastReportFactory(self.user.id, 2, today=date(2018, 1, 15)).generate_report()
+
+        self.assertEqual(report, [
+            {'date': date(2018, 1, 1), 'effective': -2980, 'real': -3010},
+            {'date': date(2018, 2, 1), 'effective': -3240, 'real': -3270},
+        ])
+
+    def test_queries_dont_grow_with_months(self):
+        queries = []
+        for months in [2, 24]:
+            with CaptureQueriesContext(connection) as context:
+                ForecastReportFactory(self.user.id, months, today=date(2018, 1, 15)).generate_report()
+            queries.append(len(context.captured_queries))
+
+        self.assertEqual(queries[0], queries[1])
+
+
+class ForecastApiTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, TestCase):
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def test_gets_12_months_by_default(self):
+        response = self.client.get(reverse('forecast'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 12)
+        self.assertEqual(response.data[0], {
+            'period': '{:%Y-%m}'.format(date.today()), 'effective': '0.00', 'real': '0.00'
+        })
+
+    def test_gets_months(self):
+        response = self.client.get(reverse('forecast'), {'months': 24})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 24)
+
+    def test_validates_months(self):
+        for months in ['0', '121', 'x']:
+            response = self.client.get(reverse('forecast'), {'months': months})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@benchmark
+class ForecastBenchmarkTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, TestCase, BenchmarkTestHelper):
+    SIZES = [10000, 100000]
+    SERIES = 200
+    BATCH_SIZE = 5000
+    TODAY = date(2018, 1, 15)
+
+    def test_benchmark_forecast(self):
+        self.create_series()
+        rows = []
+        created = 0
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+            rollups.rebuild(self.user.id)
+
+            factory = ForecastReportFactory(self.user.id, 24, today=self.TODAY)
+            report, elapsed, queries = self.measure(factory.generate_report)
+            self.assertEqual(len(report), 24)
+            rows.append((size, self.SERIES, queries, '{:.1f}'.format(elapsed * 1000)))
+
+        self.report('forecast (24 months)', ['transactions', 'series', 'queries', 'ms'], rows)
+
+    def create_series(self):
+        batch = []
+        for i in range(self.SERIES):
+            due_date = date(2017, 1, 1 + i % 28)
+            description = 'series {}'.format(i)
+            batch.extend(self.create_unsaved(-10, due_date + relativedelta(months=month), description=description,
+                                             bound_reason=BoundReasons.PERIODIC_TRANSACTION)
+                         for month in range(12))
+        Transaction.objects.bulk_create(batch, batch_size=500)
+
+        for parent_id, description in Transaction.objects.filter(due_date__month=1).values_list('id', 'description'):
+            Transaction.objects.filter(description=description).update(bound_transaction_id=parent_id)
+
+    def create_transactions(self, start, end):
+        for batch_start in range(start, end, self.BATCH_SIZE):
+            batch = [self.create_unsaved(-10, due_date, payed=due_date < self.TODAY or bool(i % 3))
+                     for i, due_date in self.get_due_dates(batch_start, min(batch_start + self.BATCH_SIZE, end))]
+            Transaction.objects.bulk_create(batch, batch_size=500)
+
+    def get_due_dates(self, start, end):
+        """Three years of history and one ahead, past ones are all payed as most users do"""
+        return [(i, date(2015, 1, 1) + relativedelta(days=i % 1460)) for i in range(start, end)]
+
+    def create_unsaved(self, value, due_date, payed=False, **kwargs):
+        return Transaction(
+            account=self.account,
+            user=self.user,
+            category=self.expense_category,
+            kind=Transaction.EXPENSE_KIND,
+            value=value,
+            description=kwargs.pop('description', 'benchmark'),
+            due_date=due_date,
+            payment_date=due_date if payed else None,
+            **kwargs
+        )
@@ -161,10 +161,9 @@ class LastMonthsFactoryTestCase(TestCase, BaseTestHelper):
         self.create_user_with_transaction('other_user', 20)
 
         report_factory = LastMonthsReportFactory(user_id, 13)
-        query = report_factory._get_query()
-        data = list(query)        
+        data = report_factory.generate_report()
 
-        self.assertEqual(data[0]["effective_total"], 100)
+        self.assertEqual(data[-1]["effective_total"], 100)
 
     def create_user_with_transaction(self, name, value):
         user, token = self.create_user(name, email=name+'@test.com', password='pass')
@@ -5,6 +5,7 @@ from transactions.models import Transaction
 
 urlpatterns = [
     url(r'^last-months/$', views.LastMonthsAPIView.as_view(), name="last-months"),
+    url(r'^forecast/$', views.ForecastAPIView.as_view(), name="forecast"),
     url(r'^pending-expenses/$', views.PendingAPIView.as_view(),
         name="pending-expenses", kwargs={'kind': Transaction.EXPENSE_KIND}),
     url(r'^pending-incomes/$', views.PendingAPIView.as_view(),
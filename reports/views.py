@@ -3,10 +3,12 @@ from datetime import datetime
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from reports.factories.ForecastReport import ForecastReportFactory
 from reports.factories.LastMonthsReport import LastMonthsReportFactory
 from reports.factories.PendingReport import PendingExpensesReportFactory, PendingIncomesReportFactory
 from reports.factories.ValuesByCategoryReport import ValuesByCategoryReportFactory
-from reports.serializers import LastMonthsSerializer, PendingSerializer, ValuesByCategorySerializer
+from reports.serializers import (ForecastQuerySerializer, ForecastSerializer, LastMonthsSerializer, PendingSerializer,
+                                 ValuesByCategorySerializer)
 from transactions.models import Transaction
 
 
@@ -44,3 +46,14 @@ class ValuesByCategoryAPIView(APIView):
         report = report_factory.generate_report()
         serialized = ValuesByCategorySerializer(report, many=True).data
         return Response(serialized)
+
+
+class ForecastAPIView(APIView):
+
+    def get(self, request, format='json'):
+        query = ForecastQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        report = ForecastReportFactory(request.user.id, query.validated_data['months']).generate_report()
+        serialized = ForecastSerializer(report, many=True).data
+        return Response(serialized)
@@ -0,0 +1,84 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models.sql.constants import MULTI
+
+COLUMNS = ('id', 'due_date', 'description', 'category', 'value', 'kind', 'details', 'account', 'priority',
+           'deadline', 'payment_date', 'bound_transaction', 'bound_reason', 'recurrence', 'recurrence_date')
+"""Same names TransactionSerializer uses"""
+
+FIELDS = ('id', 'due_date', 'description', 'category_id', 'value', 'kind', 'details', 'account_id', 'priority',
+          'deadline', 'payment_date', 'bound_transaction_id', 'bound_reason', 'recurrence_id', 'recurrence_date')
+"""Model attributes read for each column"""
+
+
+class Echo:
+    """File-like object that hands written lines back instead of storing them"""
+
+    def write(self, value):
+        return value
+
+
+class CsvEncoder:
+    content_type = 'text/csv'
+    extension = 'csv'
+
+    def __init__(self):
+        self.writer = csv.writer(Echo())
+
+    def header(self):
+        return self.writer.writerow(COLUMNS)
+
+    def encode(self, row):
+        return self.writer.writerow(['' if x is None else x for x in row])
+
+
+class NdjsonEncoder:
+    content_type = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def __init__(self):
+        self.encoder = DjangoJSONEncoder()
+
+    def header(self):
+        return ''
+
+    def encode(self, row):
+        return self.encoder.encode(dict(zip(COLUMNS, row))) + '\n'
+
+
+ENCODERS = {
+    'csv': CsvEncoder,
+    'ndjson': NdjsonEncoder,
+}
+
+
+def export_rows(queryset, encoder, extra=()):
+    """
+    Encodes transactions one by one, without creating model instances.
+    Rows are read by iterator, which uses server side cursors on PostgreSQL, so memory doesn't grow with rows.
+
+    :param queryset: Transactions to export
+    :param encoder: One of ENCODERS instances
+    :param extra: Unsaved transactions to export after queryset, like virtual occurrences
+    """
+    header = encoder.header()
+    if header:
+        yield header
+
+    for row in iterate_rows(queryset):
+        yield encoder.encode(row)
+
+    for instance in extra:
+        yield encoder.encode([getattr(instance, x) for x in FIELDS])
+
+
+def iterate_rows(queryset):
+    """
+    Same as queryset.values_list(*FIELDS).iterator(), which on Django 1.11.4 ignores chunked fetch
+    and reads every row into memory before yielding the first one.
+    """
+    chunked_fetch = not connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS')
+    compiler = queryset.values_list(*FIELDS).query.get_compiler(queryset.db)
+    return compiler.results_iter(compiler.execute_sql(MULTI, chunked_fetch=chunked_fetch))
@@ -1,4 +1,23 @@
+from .bulk_factory import change_transactions_kind, delete_transactions, update_transactions
+from .import_factory import import_transactions
 from .periodic_factory import create_periodic_transactions
-from .transfer_factory import create_transfer_between_accounts, map_queryset_to_serializer_data, map_transaction_to_transfer_data
+from .recurrence_factory import (add_to_monthly_rows, create_recurrence, get_virtual_occurrences,
+                                 get_virtual_occurrences_of, materialize_occurrence)
+from .transfer_factory import (create_transfer_between_accounts, map_queryset_to_serializer_data,
+                               map_transaction_to_transfer_data)
 
-__all__ = ["create_periodic_transactions", "create_transfer_between_accounts", "map_queryset_to_serializer_data", "map_transaction_to_transfer_data"]
\ No newline at end of file
+__all__ = [
+    "change_transactions_kind",
+    "delete_transactions",
+    "update_transactions",
+    "import_transactions",
+    "create_periodic_transactions",
+    "add_to_monthly_rows",
+    "create_recurrence",
+    "get_virtual_occurrences",
+    "get_virtual_occurrences_of",
+    "materialize_occurrence",
+    "create_transfer_between_accounts",
+    "map_queryset_to_serializer_data",
+    "map_transaction_to_transfer_data"
+]
@@ -0,0 +1,99 @@
+from django.db import transaction as db_transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+
+from transactions.models import Transaction, post_bulk_delete, post_bulk_update
+
+STATE_FIELDS = ('account_id', 'kind', 'value', 'due_date', 'payment_date')
+"""Fields balances depend on, in the order of post_bulk_update states"""
+
+
+@db_transaction.atomic
+def update_transactions(queryset, **changes):
+    """
+    Same as queryset.update, but sends post_bulk_update when fields balances depend on are changed.
+    Transactions are grouped by those fields before updating, so receivers handle groups instead of rows.
+
+    :return: Amount of updated transactions
+    """
+    if not set(changes) & set(STATE_FIELDS):
+        return queryset.update(**changes)
+
+    groups = _get_groups(queryset)
+    updated = queryset.update(**changes)
+
+    states = [(_get_state(group), _get_state(group, changes)) for group in groups]
+    post_bulk_update.send(sender=Transaction, changes=states)
+    return updated
+
+
+@db_transaction.atomic
+def change_transactions_kind(queryset, kind):
+    """
+    Changes kind of transactions flipping signal of their values, e.g. when their category kind changed.
+    Same as update_transactions, but new values depend on each transaction.
+
+    :return: Amount of updated transactions
+    """
+    groups = _get_groups(queryset)
+    updated = queryset.update(kind=kind, value=F('value') * -1)
+
+    states = [(_get_state(group), _get_state(dict(group, kind=kind, total=-group['total']))) for group in groups]
+    post_bulk_update.send(sender=Transaction, changes=states)
+    return updated
+
+
+@db_transaction.atomic
+def delete_transactions(queryset):
+    """
+    Same as queryset.delete, but with a constant amount of queries instead of signals for each transaction.
+    Periodics whose parent is deleted get the next remaining one as parent,
+    and post_bulk_delete is sent with the grouped states of deleted transactions.
+
+    :return: Amount of deleted transactions
+    """
+    deleted_ids = queryset.values('id')
+    states = [_get_state(group) for group in _get_groups(queryset)]
+    _replace_deleted_parents(queryset, deleted_ids)
+
+    # Nothing cascades from transactions, so rows are deleted without loading them
+    deleted = Transaction.objects.filter(id__in=deleted_ids)._raw_delete(queryset.db)
+
+    post_bulk_delete.send(sender=Transaction, states=states)
+    return deleted
+
+
+def _replace_deleted_parents(queryset, deleted_ids):
+    remaining = Transaction.objects\
+        .filter(bound_transaction_id=OuterRef('id'))\
+        .exclude(id__in=deleted_ids)\
+        .order_by('due_date', 'id')\
+        .values('id')[:1]
+    replaced = queryset\
+        .filter(bound_transaction_id=F('id'))\
+        .annotate(next_parent=Subquery(remaining))\
+        .filter(next_parent__isnull=False)\
+        .values_list('id', 'next_parent')
+    replaced = dict(replaced)
+    if not replaced:
+        return
+
+    whens = [When(bound_transaction_id=old, then=Value(new)) for old, new in replaced.items()]
+    Transaction.objects\
+        .filter(bound_transaction_id__in=list(replaced))\
+        .exclude(id__in=deleted_ids)\
+        .update(bound_transaction_id=Case(*whens, default=F('bound_transaction_id')))
+
+
+def _get_groups(queryset):
+    group_by = [x for x in STATE_FIELDS if x != 'value']
+    return list(queryset.values(*group_by).annotate(total=Sum('value'), amount=Count('id')).order_by())
+
+
+def _get_state(group, changes=None):
+    values = dict(group, value=group['total'])
+    if changes:
+        values.update(changes)
+        if 'value' in changes:
+            values['value'] = changes['value'] * group['amount']
+
+    return tuple(values[x] for x in STATE_FIELDS)
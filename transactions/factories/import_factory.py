@@ -0,0 +1,32 @@
+from django.db import transaction as db_transaction
+
+from transactions.models import Transaction, post_import
+
+BULK_CREATE_BATCH_SIZE = 500
+
+
+@db_transaction.atomic
+def import_transactions(user_id, rows, progress=None):
+    """
+    Writes already validated rows in chunked bulk inserts.
+    Balances are updated once for the whole import, by post_import receivers.
+
+    :param user_id: Owner of every account used by rows
+    :param rows: Validated data of TransactionImportSerializer
+    :param progress: Optional callable receiving (imported, total) after each chunk
+    :return: Unsaved transactions, ids are only set on databases that return them from bulk inserts
+    """
+    transactions = [_create_unsaved(user_id, row) for row in rows]
+
+    for start in range(0, len(transactions), BULK_CREATE_BATCH_SIZE):
+        Transaction.objects.bulk_create(transactions[start:start + BULK_CREATE_BATCH_SIZE])
+        if progress:
+            progress(min(start + BULK_CREATE_BATCH_SIZE, len(transactions)), len(transactions))
+
+    post_import.send(sender=Transaction, instances=transactions)
+    return transactions
+
+
+def _create_unsaved(user_id, row):
+    row = row.copy()
+    return Transaction(user_id=user_id, account_id=row.pop('account'), category_id=row.pop('category'), **row)
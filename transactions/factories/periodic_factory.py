@@ -1,50 +1,83 @@
-from calendar import monthrange
-from datetime import date
-
 from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.db import transaction as db_transaction
+
+from balances.signals import deferred_updates
+from transactions.models import BoundReasons, Transaction, post_bulk_create
 
-from transactions.models import BoundReasons, Transaction
+BULK_CREATE_BATCH_SIZE = 500
+MAX_DAYS_BY_FREQUENCY = {'daily': 1, 'weekly': 7, 'monthly': 31, 'yearly': 366}
 
 
+@db_transaction.atomic
 def create_periodic_transactions(**kwargs):
     periodic = kwargs.pop('periodic')
     kwargs['bound_reason'] = BoundReasons.PERIODIC_TRANSACTION
-    transactions_list = []
+    due_dates = get_due_dates(periodic, kwargs.pop('due_date'))
+
+    # Parent and children balances are updated together, once for the whole series
+    with deferred_updates():
+        # Periodics should point to parent or itself
+        parent = Transaction.objects.create(due_date=due_dates[0], **kwargs)
+        Transaction.objects.filter(id=parent.id).update(bound_transaction_id=parent.id)
+        parent.bound_transaction_id = parent.id
+
+        kwargs.pop('payment_date', None)  # payment date cant repeat
+        kwargs['bound_transaction_id'] = parent.id
+        kwargs['user_id'] = parent.user_id
+        children = [Transaction(due_date=due_date, **kwargs) for due_date in due_dates[1:]]
+        Transaction.objects.bulk_create(children, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        if children and not connection.features.can_return_ids_from_bulk_insert:
+            children = list(Transaction.objects.select_related('account')
+                            .exclude(id=parent.id)
+                            .filter(bound_transaction_id=parent.id)
+                            .order_by('id'))
+
+        post_bulk_create.send(sender=Transaction, instances=children)
+    return [parent] + children
+
+
+def get_due_dates(periodic, start_date, from_date=None, until_date=None):
+    """
+    Computes due dates of periodic, optionally only those inside [from_date, until_date].
+    Every date is incremented from start date, so when it's day is missing in month (e.g. 31)
+    the last day of that month is used instead, without drifting next dates.
+    """
+    date_until = get_until_date(periodic, start_date)
+    if until_date is not None and until_date < date_until:
+        date_until = until_date
+
+    index = get_first_index(periodic, start_date, from_date) if from_date else 0
+    result = []
+    current_due_date = start_date + relativedelta(**get_increment_args(periodic, index * periodic['interval']))
+    while current_due_date <= date_until:
+        if from_date is None or current_due_date >= from_date:
+            result.append(current_due_date)
+        index += 1
+        current_due_date = start_date + relativedelta(**get_increment_args(periodic, index * periodic['interval']))
 
-    increment_args = get_increment_args(periodic, periodic['interval'])
+    return result
 
-    start_date = kwargs.pop('due_date')
-    current_due_date = start_date
 
+def get_until_date(periodic, start_date):
     if 'how_many' in periodic:
-        length = (periodic['how_many']-1) * periodic['interval']
-        increment = get_increment_args(periodic, length)
-        date_until = start_date + relativedelta(**increment)
-    else:
-        date_until = periodic['until']
-    
-    #Periodics should point to parent or itself
-    parent = Transaction.objects.create(due_date=current_due_date, **kwargs)
-    parent.bound_transaction_id = parent.id
-    parent.save()
-    if 'payment_date' in kwargs:
-        kwargs.pop('payment_date') #payment date cant repeat
-    kwargs['bound_transaction_id'] = parent.id
-    transactions_list.append(parent)
-    current_due_date = current_due_date + relativedelta(**increment_args)
-
-    while current_due_date <= date_until:
-        trans = Transaction.objects.create(due_date=current_due_date, **kwargs)
-        transactions_list.append(trans)
+        length = (periodic['how_many'] - 1) * periodic['interval']
+        return start_date + relativedelta(**get_increment_args(periodic, length))
+    return periodic['until']
 
-        if need_to_fix_date(periodic['frequency'], start_date):
-            current_due_date = fix_last_day_month(start_date, current_due_date)
 
-        current_due_date = current_due_date + relativedelta(**increment_args)
+def get_first_index(periodic, start_date, from_date):
+    """
+    Estimates index of an occurrence not after from_date, so a window far from start date
+    skips straight to it instead of walking every previous occurrence.
+    """
+    elapsed = (from_date - start_date).days
+    step = MAX_DAYS_BY_FREQUENCY[periodic['frequency']] * periodic['interval']
+    return max(elapsed // step, 0)
 
-    return transactions_list
 
-def get_increment_args(periodic, length):    
+def get_increment_args(periodic, length):
     choices = {
         'daily':   {'days': length},
         'weekly':  {'weeks': length},
@@ -52,16 +85,3 @@ def get_increment_args(periodic, length):
         'yearly':  {'years': length}
     }
     return choices.get(periodic['frequency'])
-
-def need_to_fix_date(interval, start_date):
-    if interval != 'daily' and interval != 'weekly':
-        if start_date.day >= 29:
-            return True
-
-    return False
-
-def fix_last_day_month(start_date, current_date):
-    if current_date.day != start_date.day:
-        week_count, last_day = monthrange(current_date.year, current_date.month)
-
-        return date(current_date.year, current_date.month, last_day)
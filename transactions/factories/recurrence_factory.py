@@ -0,0 +1,190 @@
+from datetime import date, datetime
+
+from django.db import transaction as db_transaction
+
+from transactions.models import BoundReasons, RecurrenceRule, Transaction
+
+from .periodic_factory import get_due_dates, get_until_date
+
+RULE_FIELDS = ('account', 'category_id', 'description', 'value', 'kind', 'details', 'priority', 'deadline')
+
+
+@db_transaction.atomic
+def create_recurrence(**kwargs):
+    """
+    Stores periodic transaction as a single recurrence rule.
+    Only the first occurrence is written, and only when it's already payed.
+
+    :return: Every occurrence of the rule, materialized or not
+    """
+    periodic = kwargs.pop('periodic')
+    payment_date = kwargs.pop('payment_date', None)
+    start_date = kwargs.pop('due_date')
+
+    rule = RecurrenceRule.objects.create(
+        start_date=start_date,
+        frequency=periodic['frequency'],
+        interval=periodic['interval'],
+        until=get_until_date(periodic, start_date),
+        how_many=periodic.get('how_many'),
+        **kwargs)
+
+    occurrences = get_occurrences_of(rule)
+    if payment_date:
+        occurrences[0] = materialize_occurrence(rule, start_date, payment_date=payment_date)
+
+    return occurrences
+
+
+def get_occurrences_of(rule, from_date=None, until_date=None):
+    """
+    Expands rule into unsaved transactions, they have no id and are identified by recurrence and recurrence_date.
+    """
+    dates = get_due_dates(rule.periodic, rule.start_date, from_date, until_date)
+    return [_create_occurrence(rule, due_date) for due_date in dates]
+
+
+def get_virtual_occurrences(user_id, from_date=None, until_date=None, **filters):
+    """
+    Gets occurrences not materialized yet of every user recurrence inside window.
+    It costs one query for rules and another one for materialized occurrences, whatever the window size.
+
+    :param user_id: Id that represents user
+    :param from_date: When window starts, None means since the first occurrence
+    :param until_date: When window ends, None means until the last occurrence
+    :param filters: Transaction lookups occurrences must match
+    """
+    rules = RecurrenceRule.objects.filter(account__user_id=user_id)
+    return get_virtual_occurrences_of(rules, from_date, until_date, **filters)
+
+
+def get_virtual_occurrences_of(rules, from_date=None, until_date=None, **filters):
+    """
+    Same as get_virtual_occurrences, but for any recurrences queryset
+    """
+    from_date = _to_date(from_date)
+    until_date = _to_date(until_date)
+
+    rules = rules.select_related('account')
+    if from_date:
+        rules = rules.filter(until__gte=from_date)
+    if until_date:
+        rules = rules.filter(start_date__lte=until_date)
+
+    rules = list(rules)
+    if not rules:
+        return []
+
+    materialized = Transaction.objects.filter(recurrence__in=rules)
+    if from_date:
+        materialized = materialized.filter(recurrence_date__gte=from_date)
+    if until_date:
+        materialized = materialized.filter(recurrence_date__lte=until_date)
+    materialized = set(materialized.values_list('recurrence_id', 'recurrence_date'))
+
+    result = []
+    for rule in rules:
+        for occurrence in get_occurrences_of(rule, from_date, until_date):
+            if (rule.id, occurrence.recurrence_date) not in materialized and matches(occurrence, **filters):
+                result.append(occurrence)
+
+    return result
+
+
+@db_transaction.atomic
+def materialize_occurrence(rule, due_date, **kwargs):
+    """
+    Writes occurrence as a transaction, so it can be payed or edited.
+    When it was already materialized the existing transaction is returned instead.
+    """
+    due_date = _to_date(due_date)
+    if due_date not in get_due_dates(rule.periodic, rule.start_date, due_date, due_date):
+        raise ValueError("{} is not an occurrence of recurrence {}".format(due_date, rule.id))
+
+    existing = Transaction.objects.filter(recurrence=rule, recurrence_date=due_date).first()
+    if existing:
+        return existing
+
+    occurrence = _create_occurrence(rule, due_date)
+    for key, value in kwargs.items():
+        setattr(occurrence, key, value)
+    occurrence.save()
+
+    return occurrence
+
+
+def add_to_monthly_rows(rows, occurrences):
+    """
+    Adds occurrences to effective values of rows that sum transactions by month
+    """
+    by_month = {row['date']: row for row in rows}
+    for occurrence in occurrences:
+        row = by_month[occurrence.due_date.replace(day=1)]
+        key = 'effective_incomes' if occurrence.kind == Transaction.INCOME_KIND else 'effective_expenses'
+        row[key] += occurrence.value
+        row['effective_total'] += occurrence.value
+
+    return rows
+
+
+def matches(instance, **filters):
+    """
+    Checks in memory whether instance matches the same Django lookups used on Transaction queries.
+    """
+    return all(_matches_lookup(instance, key, value) for key, value in filters.items())
+
+
+LOOKUPS = {
+    'exact': lambda attr, value: attr == value,
+    'in': lambda attr, value: attr in value,
+    'icontains': lambda attr, value: value.lower() in attr.lower(),
+    'isnull': lambda attr, value: (attr is None) == value,
+    'range': lambda attr, value: attr is not None and value[0] <= attr <= value[1],
+    'gte': lambda attr, value: attr is not None and attr >= value,
+    'lte': lambda attr, value: attr is not None and attr <= value,
+    'month': lambda attr, value: attr is not None and attr.month == value,
+    'year': lambda attr, value: attr is not None and attr.year == value,
+}
+
+
+def _matches_lookup(instance, key, value):
+    field, _, lookup = key.partition('__')
+    if lookup not in LOOKUPS:
+        field, lookup = key, 'exact'
+
+    attr = getattr(instance, field)
+    if lookup in ('in', 'range'):
+        value = [_coerce(attr, x) for x in value]
+    elif lookup in ('month', 'year'):
+        value = int(value)
+    elif lookup != 'isnull':
+        value = _coerce(attr, value)
+
+    return LOOKUPS[lookup](attr, value)
+
+
+def _coerce(attr, value):
+    """Converts query param like value to the same type of attribute, so they can be compared"""
+    if isinstance(attr, date):
+        return _to_date(value)
+    if isinstance(attr, bool) or attr is None or isinstance(value, type(attr)):
+        return value
+    return type(attr)(value)
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    return value
+
+
+def _create_occurrence(rule, due_date):
+    kwargs = {field: getattr(rule, field) for field in RULE_FIELDS}
+    return Transaction(
+        due_date=due_date,
+        bound_reason=BoundReasons.PERIODIC_TRANSACTION,
+        recurrence=rule,
+        recurrence_date=due_date,
+        **kwargs)
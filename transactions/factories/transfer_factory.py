@@ -30,13 +30,14 @@ def get_category(user_id):
 
 
 def map_queryset_to_serializer_data(queryset):
-    return [map_transaction_to_transfer_data(x) for x in queryset]
+    """Maps transfers expenses fetching their incomes on same query"""
+    return [map_transaction_to_transfer_data(x) for x in queryset.select_related('bound_transaction')]
 
 
 def map_transaction_to_transfer_data(expense):
     return {
         'id': expense.id,
-        'account_from': expense.account.id,
-        'account_to': expense.bound_transaction.account.id,
+        'account_from': expense.account_id,
+        'account_to': expense.bound_transaction.account_id,
         'value': -expense.value
     }
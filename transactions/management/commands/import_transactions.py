@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.parsers import CsvParser
+from transactions import factories
+from transactions.serializers import TransactionImportSerializer
+
+
+class Command(BaseCommand):
+    help = 'Imports transactions of a user from a CSV (with header line) or JSON array file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File ending in .csv or .json')
+        parser.add_argument('--user', type=int, dest='user_id', required=True, help='Owner of imported transactions')
+
+    def handle(self, *args, **options):
+        rows = self.read(options['path'])
+        serializer = TransactionImportSerializer(data=rows, many=True, context={'user_id': options['user_id']})
+        if not serializer.is_valid():
+            if not isinstance(serializer.errors, list):
+                raise CommandError(serializer.errors)
+            errors = ['row {}: {}'.format(i + 1, x) for i, x in enumerate(serializer.errors) if x]
+            raise CommandError('Invalid rows:\n' + '\n'.join(errors))
+
+        imported = factories.import_transactions(options['user_id'], serializer.validated_data, self.write_progress)
+        self.stdout.write('{} transactions imported'.format(len(imported)))
+
+    def read(self, path):
+        with open(path, 'rb') as stream:
+            if path.endswith('.csv'):
+                return CsvParser().parse(stream)
+            if path.endswith('.json'):
+                return json.loads(stream.read().decode('utf-8'))
+
+        raise CommandError('Only .csv and .json files are supported')
+
+    def write_progress(self, imported, total):
+        self.stdout.write('{}/{}'.format(imported, total))
@@ -8,7 +8,7 @@ SIGNALS_WARNING_CONSENT = "IMPLEMENT THIS"
 class TransactionsQuerySet(QuerySet):
     def owned_by(self, user):
         value = user if isinstance(user, int) else user.id
-        return self.filter(account__user_id=value)
+        return self.filter(user_id=value)
 
     def incomes(self):
         return self.filter(kind=INCOME_KIND)
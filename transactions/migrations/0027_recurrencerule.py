@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.4 on 2026-10-18 12:57
+from __future__ import unicode_literals
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import transactions.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0026_auto_20181108_2257'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurrenceRule',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(max_length=120)),
+                ('value', models.DecimalField(decimal_places=2, max_digits=19)),
+                ('kind', models.PositiveIntegerField(choices=[(0, 'Expense'), (1, 'Income')])),
+                ('details', models.CharField(blank=True, max_length=500)),
+                ('priority', models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(5)])),
+                ('deadline', models.PositiveIntegerField(default=0)),
+                ('start_date', models.DateField()),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly')], max_length=10)),
+                ('interval', models.PositiveIntegerField(default=1)),
+                ('until', models.DateField()),
+                ('how_many', models.PositiveIntegerField(blank=True, null=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='transactions.Account')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='transactions.Category')),
+            ],
+            bases=(models.Model, transactions.models.HasKind),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='recurrence_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='recurrence',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='transactions.RecurrenceRule'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.4 on 2026-10-18 13:13
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0027_recurrencerule'),
+    ]
+
+    operations = [
+        # Expected plan: Index Scan using transaction_account_due_idx
+        # for account transactions expires_between(), and as one BitmapOr arm of in_date_range()
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', 'due_date'], name='transaction_account_due_idx'),
+        ),
+        # Expected plan: Index Scan using transaction_account_pay_idx
+        # for account transactions payed_between(), and as the other BitmapOr arm of in_date_range()
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', 'payment_date'], name='transaction_account_pay_idx'),
+        ),
+        # Expected plan: Index Scan using transaction_bound_due_idx
+        # for periodic series from a date on, filter(bound_transaction_id=..., due_date__gte=...)
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['bound_transaction', 'due_date'], name='transaction_bound_due_idx'),
+        ),
+        # Expected plan: Index Scan using transaction_account_tag_idx for generic tag dedupe by account
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', 'generic_tag'], name='transaction_account_tag_idx'),
+        ),
+        # Expected plan: Index Scan using transaction_pending_idx
+        # for pending().filter(kind=...) of an account, its rows are only unpayed ones
+        # Django 1.11 indexes can't be partial
+        migrations.RunSQL(
+            ['CREATE INDEX transaction_pending_idx ON transactions_transaction (account_id, kind, due_date) '
+             'WHERE payment_date IS NULL'],
+            ['DROP INDEX transaction_pending_idx']
+        ),
+    ]
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_transactions_user(apps, schema_editor):
+    Account = apps.get_model('transactions', 'Account')
+    Transaction = apps.get_model('transactions', 'Transaction')
+
+    account_user = Account.objects.filter(id=OuterRef('account_id')).values('user_id')[:1]
+    Transaction.objects.update(user_id=Subquery(account_user))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('transactions', '0028_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            ['DROP INDEX IF EXISTS transaction_pending_idx'],
+            ['CREATE INDEX transaction_pending_idx ON transactions_transaction (account_id, kind, due_date) '
+             'WHERE payment_date IS NULL']
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(fill_transactions_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='transaction',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_account_tag_idx',
+        ),
+        # Expected plan: Index Scan using transaction_user_due_idx for owned_by(user).expires_between()
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'due_date'], name='transaction_user_due_idx'),
+        ),
+        # Expected plan: Index Scan using transaction_user_pay_idx for owned_by(user).payed_between()
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'payment_date'], name='transaction_user_pay_idx'),
+        ),
+        # Expected plan: Index Scan using transaction_user_tag_idx
+        # for generic tag dedupe, owned_by(user).filter(generic_tag=...)
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'generic_tag'], name='transaction_user_tag_idx'),
+        ),
+        # sqlite drops unknown indexes when it remakes the table, so it is created only after all table changes
+        migrations.RunSQL(
+            ['CREATE INDEX transaction_pending_idx ON transactions_transaction (user_id, kind, due_date) '
+             'WHERE payment_date IS NULL'],
+            ['DROP INDEX IF EXISTS transaction_pending_idx']
+        ),
+    ]
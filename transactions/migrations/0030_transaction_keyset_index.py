@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.4 on 2026-10-18 13:17
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0029_transaction_user'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_due_idx',
+        ),
+        # Expected plan: Index Scan using transaction_user_due_id_idx for owned_by(user).expires_between(),
+        # and for keyset pages ordered by due date and id without a Sort node
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'due_date', 'id'], name='transaction_user_due_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.4 on 2026-10-18 14:20
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0030_transaction_keyset_index'),
+    ]
+
+    operations = [
+        # Expected plan: Index Scan using transaction_user_bound_idx
+        # for periodic series of the forecast, owned_by(user).filter(bound_reason=..., due_date__gte=...)
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'bound_reason', 'due_date'], name='transaction_user_bound_idx'),
+        ),
+    ]
@@ -1,10 +1,28 @@
 from django.contrib.auth.models import User
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.dispatch import Signal
 
 from transactions.managers import TransactionsQuerySet
 
 
+post_bulk_create = Signal(providing_args=["instances"])
+"""Sent after transactions are written with bulk_create, which doesn't send post_save"""
+
+post_import = Signal(providing_args=["instances"])
+"""Sent after imported transactions are written, once for the whole import"""
+
+post_bulk_update = Signal(providing_args=["changes"])
+"""
+Sent after transactions are changed with queryset update, which doesn't send post_save.
+Changes are (before, after) pairs of (account_id, kind, value, due_date, payment_date) states,
+where value is the sum of every transaction sharing that state.
+"""
+
+post_bulk_delete = Signal(providing_args=["states"])
+"""Sent after transactions are deleted without per instance signals, with states as in post_bulk_update"""
+
+
 class BoundReasons:
     PERIODIC_TRANSACTION = "PERIODIC"
     TRANSFER_BETWEEN_ACCOUNTS = "ACCOUNT_TRANSFER"
@@ -51,6 +69,17 @@ class Category(models.Model, HasKind):
 
 
 class Transaction(models.Model, HasKind):
+    class Meta:
+        indexes = [
+            models.Index(fields=['account', 'due_date'], name='transaction_account_due_idx'),
+            models.Index(fields=['account', 'payment_date'], name='transaction_account_pay_idx'),
+            models.Index(fields=['bound_transaction', 'due_date'], name='transaction_bound_due_idx'),
+            models.Index(fields=['user', 'due_date', 'id'], name='transaction_user_due_id_idx'),
+            models.Index(fields=['user', 'payment_date'], name='transaction_user_pay_idx'),
+            models.Index(fields=['user', 'generic_tag'], name='transaction_user_tag_idx'),
+            models.Index(fields=['user', 'bound_reason', 'due_date'], name='transaction_user_bound_idx'),
+        ]
+
     objects = TransactionsQuerySet.as_manager()
 
     TRANSACTION_KINDS = (
@@ -72,9 +101,12 @@ class Transaction(models.Model, HasKind):
         self.initial_value = self.value
         self.initial_due_date = self.due_date
         self.initial_payment_date = self.payment_date
-        self.initial_account = self.account
+        self.initial_account_id = self.account_id
+        self.initial_kind = self.kind
 
     account = models.ForeignKey(Account)
+    user = models.ForeignKey(User)
+    """Same as account user, denormalized so user queries don't join accounts"""
     due_date = models.DateField()
     description = models.CharField(max_length=120)
     category = models.ForeignKey(Category)
@@ -88,8 +120,59 @@ class Transaction(models.Model, HasKind):
     bound_reason = models.CharField(max_length=20, choices=BOUND_REASON_CHOICES, blank=True)
     generic_tag = models.TextField(null=True, blank=True)
     """Generic text field to be used for third party and other stuff"""
+    recurrence = models.ForeignKey("RecurrenceRule", null=True, blank=True, on_delete=models.SET_NULL)
+    recurrence_date = models.DateField(null=True, blank=True)
+    """Date of the recurrence occurrence this transaction materializes, kept even if due date changes"""
+
+    def save(self, *args, **kwargs):
+        if self.user_id is None or self.account_id != self.initial_account_id:
+            self.user_id = self.account.user_id
+        super(Transaction, self).save(*args, **kwargs)
+
+    @property
+    def initial_account(self):
+        """Gets the account loaded from database, it's only queried when account was changed"""
+        if self.initial_account_id == self.account_id:
+            return self.account
+
+        if not hasattr(self, '_initial_account'):
+            self._initial_account = Account.objects.get(pk=self.initial_account_id)
+        return self._initial_account
 
     @property
     def real_value(self):
         """Gets the real value of transaction"""
         return self.value if self.payment_date else 0
+
+
+class RecurrenceRule(models.Model, HasKind):
+    """
+    Periodic transaction stored only once.
+    Its occurrences are expanded on read and only written as transactions when payed or edited.
+    """
+    FREQUENCY_CHOICES = (
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('yearly', 'Yearly')
+    )
+
+    account = models.ForeignKey(Account)
+    category = models.ForeignKey(Category)
+    description = models.CharField(max_length=120)
+    value = models.DecimalField(max_digits=19, decimal_places=2)
+    kind = models.PositiveIntegerField(choices=Transaction.TRANSACTION_KINDS)
+    details = models.CharField(max_length=500, blank=True)
+    priority = models.PositiveIntegerField(default=1, validators=[MinValueValidator(0), MaxValueValidator(5)])
+    deadline = models.PositiveIntegerField(default=0)
+    start_date = models.DateField()
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveIntegerField(default=1)
+    until = models.DateField()
+    """Last occurrence date, also filled when created from how_many"""
+    how_many = models.PositiveIntegerField(null=True, blank=True)
+
+    @property
+    def periodic(self):
+        """Gets rule as the periodic dict accepted by periodic factory"""
+        return {'frequency': self.frequency, 'interval': self.interval, 'until': self.until}
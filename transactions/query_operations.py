@@ -1,9 +1,9 @@
-from django.db.models import Case, F, Sum, When
+from django.db.models import Case, F, Q, Sum, When
 from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
 
 
-def sum_when(**kwargs):
-    return Coalesce(Sum(Case(When(then=F('value'), **kwargs), default=0)), 0)
+def sum_when(*conditions, field='value', **kwargs):
+    return Coalesce(Sum(Case(When(Q(*conditions, **kwargs), then=F(field)), default=0)), 0)
 
 
 def sum_effective(**kwargs):
@@ -14,7 +14,11 @@ class AccountSerializer(serializers.ModelSerializer):
     current_balance = serializers.SerializerMethodField()
 
     def get_current_balance(self, obj):
-        return calculator.calculate_account_current_balance(obj.id)['real']
+        current_balances = self.context.get('current_balances')
+        if current_balances is None:
+            return calculator.calculate_account_current_balance(obj.id)['real']
+
+        return current_balances[obj.id]['real']
 
     def validate_name(self, value):
         ignores_itself = Account.objects.exclude(id=self.context.get("id", 0))
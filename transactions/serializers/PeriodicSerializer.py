@@ -6,6 +6,7 @@ class PeriodicSerializer(serializers.Serializer):
     interval = serializers.IntegerField()
     until = serializers.DateField(required=False)
     how_many = serializers.IntegerField(required=False)
+    virtual = serializers.BooleanField(required=False, default=False)
 
     def validate_how_many(self, value):
         if value < 1:
@@ -0,0 +1,86 @@
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from transactions.models import Account, Category, HasKind, Transaction
+
+
+class TransactionImportListSerializer(serializers.ListSerializer):
+    """
+    Validates every imported row, then checks ownership of all referenced accounts and categories
+    with one query each, instead of a query per row.
+    Errors come aligned with rows, valid rows have an empty dict.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: ['Expected a list of transactions but got "{}".'.format(
+                    type(data).__name__)]
+            })
+
+        rows, errors = [], []
+        for item in data:
+            try:
+                rows.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                rows.append(None)
+                errors.append(exc.detail)
+
+        valid_rows = [x for x in rows if x is not None]
+        accounts = self.get_owned_accounts(set(x['account'] for x in valid_rows))
+        categories = self.get_owned_categories(set(x['category'] for x in valid_rows))
+        for row, row_errors in zip(rows, errors):
+            if row is not None:
+                row_errors.update(self.child.validate_owned(row, accounts, categories))
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return rows
+
+    def get_owned_accounts(self, ids):
+        return set(Account.objects.filter(user_id=self.context['user_id'], id__in=ids).values_list('id', flat=True))
+
+    def get_owned_categories(self, ids):
+        """:return: Dict of category kinds keyed by id"""
+        return dict(Category.objects.filter(user_id=self.context['user_id'], id__in=ids).values_list('id', 'kind'))
+
+
+class TransactionImportSerializer(serializers.Serializer):
+    """
+    Single imported row, accounts and categories are plain ids, only checked by list serializer.
+    """
+    class Meta:
+        list_serializer_class = TransactionImportListSerializer
+
+    due_date = serializers.DateField()
+    description = serializers.CharField(max_length=120)
+    category = serializers.IntegerField()
+    value = serializers.DecimalField(max_digits=19, decimal_places=2)
+    kind = serializers.ChoiceField([HasKind.EXPENSE_KIND, HasKind.INCOME_KIND])
+    details = serializers.CharField(max_length=500, required=False, allow_blank=True, default='')
+    account = serializers.IntegerField()
+    priority = serializers.IntegerField(min_value=0, max_value=5, required=False, default=1)
+    deadline = serializers.IntegerField(min_value=0, required=False, default=0)
+    payment_date = serializers.DateField(required=False, allow_null=True, default=None)
+
+    def validate(self, data):
+        if data['kind'] == Transaction.EXPENSE_KIND:
+            if data['value'] > 0:
+                raise serializers.ValidationError('Expense value cannot be positive')
+        elif data['value'] < 0:
+            raise serializers.ValidationError('Income value cannot be negative')
+
+        return data
+
+    def validate_owned(self, data, accounts, categories):
+        errors = {}
+        if data['account'] not in accounts:
+            errors['account'] = ["You can't use an account that doesn't belongs to you!"]
+
+        if data['category'] not in categories:
+            errors['category'] = ["You can't use a category that doesn't belongs to you!"]
+        elif categories[data['category']] != data['kind']:
+            errors[api_settings.NON_FIELD_ERRORS_KEY] = ['Transaction and Category must have the same kind']
+
+        return errors
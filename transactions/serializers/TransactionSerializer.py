@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from common.serializers import SerializerMayReturnListMixin
+from common.serializers import SerializerMayReturnListMixin, ValuesRowSerializer
 from transactions import factories
 from transactions.models import Transaction
 
@@ -12,8 +12,9 @@ class TransactionSerializer(SerializerMayReturnListMixin, serializers.ModelSeria
     class Meta:
         model = Transaction
         fields = ('id', 'due_date', 'description', 'category', 'value', 'kind', 'details', 'account',
-                  'priority', 'deadline', 'payment_date', 'periodic', 'bound_transaction', 'bound_reason')
-        read_only_fields = ('bound_transaction', 'bound_reason')
+                  'priority', 'deadline', 'payment_date', 'periodic', 'bound_transaction', 'bound_reason',
+                  'recurrence', 'recurrence_date')
+        read_only_fields = ('bound_transaction', 'bound_reason', 'recurrence', 'recurrence_date')
         write_only_fields = ('periodic',)
 
     periodic = PeriodicSerializer(required=False, write_only=True)
@@ -59,6 +60,14 @@ class TransactionSerializer(SerializerMayReturnListMixin, serializers.ModelSeria
 
     def create(self, validated_data):
         if 'periodic' in validated_data:
+            periodic = validated_data['periodic']
+            if periodic and periodic.pop('virtual', False):
+                return factories.create_recurrence(**validated_data)
             return factories.create_periodic_transactions(**validated_data)
 
         return super(TransactionSerializer, self).create(validated_data)
+
+
+class TransactionRowSerializer(ValuesRowSerializer):
+    """Lists transactions as TransactionSerializer does, straight from values_list rows"""
+    serializer_class = TransactionSerializer
@@ -1,6 +1,14 @@
 from .AccountSerializer import AccountSerializer
 from .CategorySerializer import CategorySerializer
-from .TransactionSerializer import TransactionSerializer
+from .TransactionImportSerializer import TransactionImportSerializer
+from .TransactionSerializer import TransactionRowSerializer, TransactionSerializer
 from .TransferSerializer import TransferSerializer
 
-__all__ = ["AccountSerializer", "CategorySerializer", "TransactionSerializer", "TransferSerializer"]
\ No newline at end of file
+__all__ = [
+    "AccountSerializer",
+    "CategorySerializer",
+    "TransactionImportSerializer",
+    "TransactionRowSerializer",
+    "TransactionSerializer",
+    "TransferSerializer"
+]
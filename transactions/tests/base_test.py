@@ -6,8 +6,9 @@ from django.db.models import signals
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
+from balances import signals as balances_signals
 from transactions import signals as transactions_signals
-from transactions.models import Account, Category, HasKind, Transaction
+from transactions.models import Account, Category, HasKind, Transaction, post_bulk_create
 from users import signals as user_signals
 
 
@@ -132,6 +133,32 @@ class WithoutSignalsMixin:
             )
 
 
+class WithoutBalancesSignalsMixin:
+    '''
+    Disconnects receivers moving rollups, periods and current balances,
+    so strategies can be tested running them alone.
+    '''
+    disabled_balances = [
+        (signals.post_save, balances_signals.created_or_updated_transaction_updates_balances),
+        (signals.post_delete, balances_signals.deleted_transaction_updates_balances),
+        (post_bulk_create, balances_signals.bulk_created_transactions_updates_balances),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        for signal, func in cls.disabled_balances:
+            signal.disconnect(func, sender=Transaction)
+
+        super().setUpTestData()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        for signal, func in cls.disabled_balances:
+            signal.connect(func, sender=Transaction)
+
+
 class BaseTestHelper:
     '''
     Class used to create some resources to backup tests
@@ -1,11 +1,14 @@
 from datetime import date
 from unittest.mock import MagicMock
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from balances.models import MonthlyRollup, PeriodBalance
 from common.tests_helpers import UrlsTestHelper
 from transactions.filters import AccountFilter
 from transactions.models import Account, Transaction
@@ -123,6 +126,24 @@ class AccountApiTestCase(APITestCase, BaseTestHelperFactory):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
 
+    def test_api_lists_balances_with_constant_queries(self):
+        self.create_transaction(100, account=self.account, category=self.create_category('any'),
+                                payment_date=date.today())
+        queries = self.count_list_queries()
+
+        for i in range(20):
+            self.create_account(name='acc{}'.format(i))
+
+        self.assertEqual(queries, self.count_list_queries())
+        response = self.client.get(reverse('accounts'), format='json')
+        balances = {x['id']: x['current_balance'] for x in response.data}
+        self.assertEqual(balances[self.account.id], 100)
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('accounts'), format='json')
+        return len(context.captured_queries)
+
     def test_api_retrieves(self):
         response = self.client.get(reverse('account', kwargs={'pk': self.account.id}))
 
@@ -158,6 +179,14 @@ class AccountApiTestCase(APITestCase, BaseTestHelperFactory):
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
+    def test_api_deletes_with_its_balances(self):
+        account = self.create_account(name='with_balance', start_balance=100)
+
+        self.client.delete(reverse('account', kwargs={'pk': account.id}))
+
+        self.assertFalse(MonthlyRollup.objects.filter(account_id=account.id).exists())
+        self.assertFalse(PeriodBalance.objects.filter(account_id=account.id).exists())
+
     def test_api_cant_delete(self):
         category = self.create_category(name='category')
         self.create_transaction(account=self.account, value=10, category=category)
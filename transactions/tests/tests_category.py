@@ -1,9 +1,13 @@
+from datetime import date
+
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from balances.models import MonthlyRollup
 from common.tests_helpers import SerializerTestHelper
+from transactions.factories import create_recurrence
 from transactions.models import Category
 from transactions.serializers import CategorySerializer
 from transactions.tests.base_test import (BaseTestHelper, OtherUserDataTestSetupMixin, UserDataTestSetupMixin,
@@ -124,6 +128,33 @@ class CategoryApiTestCase(WithoutSignalsMixin, APITestCase, BaseTestHelper):
         self.assertEqual(transaction.kind, change_to)
         self.assertEqual(transaction.value, 100)
 
+    def test_api_changes_kinds_updates_balances(self):
+        category = self.create_category('kind_changer', kind=Category.EXPENSE_KIND)
+        self.create_transaction(-100, category=category, due_date=date(2017, 1, 10), payment_date=date(2017, 1, 10))
+        url = reverse('category', kwargs={'pk': category.id})
+
+        self.client.put(url, {'name': 'kind_changer', 'kind': Category.INCOME_KIND}, format='json')
+
+        rollups = MonthlyRollup.objects.filter(account=self.account).values_list('kind', 'effective_value')
+        self.assertEqual(set(rollups), {(Category.EXPENSE_KIND, 0), (Category.INCOME_KIND, 100)})
+        response = self.client.get(reverse('plain-balance') + '?until=2017-12-31')
+        self.assertEqual(response.data['balance'], 100)
+
+    def test_api_changes_kinds_of_recurrences(self):
+        category = self.create_category('kind_changer', kind=Category.EXPENSE_KIND)
+        rule = create_recurrence(account=self.account, category=category, due_date=date(2017, 1, 20),
+                                 description='rent', value=-100, kind=Category.EXPENSE_KIND,
+                                 periodic={'frequency': 'monthly', 'interval': 1, 'how_many': 2})[0].recurrence
+        balance_url = reverse('plain-balance') + '?until=2017-01-31'
+        self.assertEqual(self.client.get(balance_url).data['balance'], -100)
+
+        url = reverse('category', kwargs={'pk': category.id})
+        self.client.put(url, {'name': 'kind_changer', 'kind': Category.INCOME_KIND}, format='json')
+
+        rule.refresh_from_db()
+        self.assertEqual((rule.kind, rule.value), (Category.INCOME_KIND, 100))
+        self.assertEqual(self.client.get(balance_url).data['balance'], 100)
+
 
 class CategorySerializerTestCase(UserDataTestSetupMixin, OtherUserDataTestSetupMixin, TestCase, SerializerTestHelper):
 
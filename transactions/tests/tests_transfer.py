@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -271,3 +273,21 @@ class TransferApiTestCase(WithoutSignalsMixin, APITestCase, BaseTestHelper):
         self.assertEqual(len(response.data), 2)
         self.assertIn(last_origin_expense.id, [x['id'] for x in response.data])
         self.assertIn(last_dest_expense.id, [x['id'] for x in response.data])
+
+    def test_api_lists_with_constant_queries(self):
+        urls = [reverse('transfers'), reverse('account-transfers', kwargs={'pk': self.account_from.id})]
+        queries = []
+        created = 1
+        for size in [1, 100, 1000]:
+            for i in range(created, size):
+                create_transfer_between_accounts(
+                    self.user.id, account_from=self.account_from.id, account_to=self.account_to.id, value=i)
+            created = size
+
+            for url in urls:
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                self.assertEqual(len(response.data), size)
+                queries.append(len(context.captured_queries))
+
+        self.assertEqual(queries, queries[:2] * 3)
@@ -1,10 +1,13 @@
 from datetime import date
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from balances.models import PeriodBalance
 from transactions import factories
 from transactions.models import HasKind, Transaction
 from transactions.serializers import TransactionSerializer
@@ -201,6 +204,16 @@ class PeriodicTransactionApiTestCase(WithoutSignalsMixin, ApiTestMixin, TestCase
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assert_changed_periodics(0, 'change it all')
 
+    def test_api_patches_all_periodics_balances_at_once(self):
+        url = self.list_url + "?periodic_transaction=" + str(self.periodics[0].id)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(url, {'value': -10}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        period = PeriodBalance.objects.get(account=self.account, start_date=date(2018, 3, 1))
+        self.assertEqual(period.closed_effective_value, -50)
+        self.assertEqual(len([x for x in context.captured_queries if 'UPDATE "balances_periodbalance"' in x['sql']]), 1)
+
     def test_api_deletes_all_periodics(self):
         url = self.list_url + "?periodic_transaction=" + str(self.periodics[0].id)
         response = self.client.delete(url)
@@ -0,0 +1,121 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from balances.models import MonthlyRollup, PeriodBalance
+from transactions.factories import create_periodic_transactions, delete_transactions
+from transactions.models import Account, Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class BulkDeleteTestMixin(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory):
+
+    def assert_balances_reverted(self):
+        self.assertFalse(MonthlyRollup.objects.exclude(effective_value=0, real_value=0).exists())
+        self.assertFalse(PeriodBalance.objects.exclude(closed_effective_value=0, closed_real_value=0).exists())
+        account = Account.objects.get(pk=self.account.pk)
+        self.assertEqual((account.current_effective_balance, account.current_real_balance), (0, 0))
+
+    def create_series(self, how_many, due_date=date(2017, 1, 10), account=None, frequency='monthly'):
+        return create_periodic_transactions(
+            account=account or self.account,
+            category=self.expense_category,
+            due_date=due_date,
+            payment_date=due_date,
+            description='periodic',
+            value=-10,
+            kind=Transaction.EXPENSE_KIND,
+            periodic={'frequency': frequency, 'interval': 1, 'how_many': how_many}
+        )
+
+
+class DeleteTransactionsTestCase(BulkDeleteTestMixin, TestCase):
+
+    def test_deleted_parent_is_replaced_by_next(self):
+        series = self.create_series(4)
+
+        delete_transactions(Transaction.objects.filter(id__in=[series[0].id, series[2].id]))
+
+        remaining = Transaction.objects.filter(id__in=[x.id for x in series])
+        self.assertEqual(set(x.bound_transaction_id for x in remaining), {series[1].id})
+
+    def test_other_series_are_kept(self):
+        series = self.create_series(3)
+        other = self.create_series(3)
+
+        delete_transactions(Transaction.objects.filter(id=series[0].id))
+
+        self.assertEqual(set(Transaction.objects.filter(id__in=[x.id for x in other])
+                             .values_list('bound_transaction_id', flat=True)), {other[0].id})
+
+    def test_reverts_balances(self):
+        series = self.create_series(3, date(2017, 1, 10))
+
+        delete_transactions(Transaction.objects.filter(bound_transaction_id=series[0].id))
+
+        self.assert_balances_reverted()
+
+    def test_query_count_does_not_depend_on_transactions(self):
+        few = self.count_delete_queries(self.create_series(5, date(2010, 1, 10)))
+        # Weekly keeps months few enough for sqlite to insert missing periods in a single batch
+        many = self.count_delete_queries(self.create_series(500, date(2010, 1, 10), self.create_account(name='b'),
+                                                            frequency='weekly'))
+
+        self.assertEqual(few, many)
+
+    def count_delete_queries(self, series):
+        with CaptureQueriesContext(connection) as context:
+            deleted = delete_transactions(Transaction.objects.filter(bound_transaction_id=series[0].id))
+
+        self.assertEqual(deleted, len(series))
+        return len(context.captured_queries)
+
+
+class BulkDeleteApiTestCase(BulkDeleteTestMixin, TestCase):
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def test_deletes_all_periodics(self):
+        series = self.create_series(500)
+
+        response = self.client.delete(reverse('transactions') + '?periodic_transaction=' + str(series[0].id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Transaction.objects.filter(bound_transaction_id=series[0].id).exists())
+        self.assert_balances_reverted()
+
+    def test_deletes_next_periodics(self):
+        series = self.create_series(5)
+
+        response = self.client.delete(reverse('transaction', kwargs={'pk': series[2].id}) + '?next=1')
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(Transaction.objects.filter(bound_transaction_id=series[0].id).order_by('id')),
+                         series[:2])
+        account = Account.objects.get(pk=self.account.pk)
+        self.assertEqual((account.current_effective_balance, account.current_real_balance), (-20, -10))
+
+    def test_deletes_only_itself_when_not_periodic(self):
+        transaction = self.create_transaction(-10, due_date=date(2017, 1, 10))
+        other_user, _ = self.create_user('other', email='other@test.com', password='pass')
+        other_account = self.create_account(user=other_user)
+        self.create_transaction(-10, account=other_account, due_date=date(2017, 2, 10))
+
+        response = self.client.delete(reverse('transaction', kwargs={'pk': transaction.id}) + '?next=1')
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Transaction.objects.filter(id=transaction.id).exists())
+        self.assertEqual(Transaction.objects.filter(account=other_account).count(), 1)
+
+    def test_doesnt_delete_others_periodics(self):
+        other_user, _ = self.create_user('other', email='other@test.com', password='pass')
+        series = self.create_series(3, account=self.create_account(user=other_user))
+
+        self.client.delete(reverse('transactions') + '?periodic_transaction=' + str(series[0].id))
+
+        self.assertEqual(Transaction.objects.filter(bound_transaction_id=series[0].id).count(), 3)
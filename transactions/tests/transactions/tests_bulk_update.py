@@ -0,0 +1,120 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from balances.models import MonthlyRollup, PeriodBalance
+from transactions.factories import update_transactions
+from transactions.models import Account, Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class BulkUpdateTestMixin(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory):
+
+    def create_bills(self, amount, due_date=date(2017, 1, 10), account=None):
+        return [self.create_transaction(-10, due_date=due_date, account=account) for _ in range(amount)]
+
+
+class UpdateTransactionsTestCase(BulkUpdateTestMixin, TestCase):
+
+    def test_moves_balances_of_changed_groups(self):
+        other_account = self.create_account(name='other', current_effective_balance=0, current_real_balance=0)
+        bills = self.create_bills(2) + self.create_bills(1, account=other_account)
+
+        update_transactions(Transaction.objects.filter(id__in=[x.id for x in bills]), payment_date=date(2017, 2, 1))
+
+        rollup = MonthlyRollup.objects.get(account=self.account, month=date(2017, 2, 1))
+        self.assertEqual(rollup.real_value, -20)
+        periods = PeriodBalance.objects.filter(account=self.account).order_by('start_date')
+        self.assertEqual([(x.start_date, x.closed_real_value) for x in periods],
+                         [(date(2017, 1, 1), 0), (date(2017, 2, 1), -20)])
+        account = Account.objects.get(pk=self.account.pk)
+        self.assertEqual(account.current_real_balance, -20)
+        self.assertEqual(Account.objects.get(pk=other_account.pk).current_real_balance, -10)
+
+    def test_undoes_previous_payment(self):
+        bill = self.create_transaction(-10, due_date=date(2017, 1, 10), payment_date=date(2017, 1, 15))
+
+        update_transactions(Transaction.objects.filter(id=bill.id), payment_date=date(2017, 3, 1))
+
+        rollups = {x.month: x.real_value for x in MonthlyRollup.objects.filter(account=self.account)}
+        self.assertEqual(rollups, {date(2017, 1, 1): -10 + 10, date(2017, 3, 1): -10})
+
+    def test_changes_not_tracked_skip_balances(self):
+        bills = self.create_bills(3)
+
+        with CaptureQueriesContext(connection) as context:
+            update_transactions(Transaction.objects.filter(id__in=[x.id for x in bills]), priority=5)
+
+        self.assertEqual(Transaction.objects.filter(priority=5).count(), 3)
+        self.assertEqual(len([x for x in context.captured_queries if 'SAVEPOINT' not in x['sql']]), 1)
+
+
+class BulkPatchApiTestCase(BulkUpdateTestMixin, TestCase):
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def test_patches_payment_date_of_every_id(self):
+        bills = self.create_bills(3)
+
+        response = self.patch(bills, {'payment_date': '2017-01-20'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([x['id'] for x in response.data], [x.id for x in bills])
+        self.assertEqual(set(x['payment_date'] for x in response.data), {'2017-01-20'})
+        self.assertEqual(MonthlyRollup.objects.get(account=self.account, month=date(2017, 1, 1)).real_value, -30)
+
+    def test_single_and_bulk_patches_move_same_balances(self):
+        bills = self.create_bills(2)
+
+        self.client.patch(reverse('transaction', kwargs={'pk': bills[0].id}), {'payment_date': '2017-02-01'},
+                          format='json')
+        self.patch(bills[1:], {'payment_date': '2017-02-01'})
+        self.assert_real_balances([(date(2017, 1, 1), 0), (date(2017, 2, 1), -20)], -20)
+
+        self.patch(bills[:1], {'payment_date': None})
+        self.client.patch(reverse('transaction', kwargs={'pk': bills[1].id}), {'payment_date': None}, format='json')
+        self.assert_real_balances([(date(2017, 1, 1), 0), (date(2017, 2, 1), 0)], 0)
+
+    def test_validates_payload(self):
+        bills = self.create_bills(2)
+
+        response = self.patch(bills, {'priority': 'high'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ignores_others_transactions(self):
+        other_user, _ = self.create_user('other', email='other@test.com', password='pass')
+        other_bill = self.create_transaction(-10, account=self.create_account(user=other_user))
+
+        response = self.patch(self.create_bills(1) + [other_bill], {'deadline': 3})
+
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(Transaction.objects.get(pk=other_bill.pk).deadline, 10)
+
+    def test_query_count_does_not_depend_on_ids(self):
+        few = self.count_patch_queries(self.create_bills(2, date(2017, 1, 10)), '2017-03-01')
+        many = self.count_patch_queries(self.create_bills(50, date(2017, 2, 10)), '2017-04-01')
+
+        self.assertEqual(few, many)
+
+    def count_patch_queries(self, bills, payment_date):
+        with CaptureQueriesContext(connection) as context:
+            response = self.patch(bills, {'payment_date': payment_date, 'priority': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def assert_real_balances(self, periods, current):
+        found = PeriodBalance.objects.filter(account=self.account).order_by('start_date')
+        self.assertEqual([(x.start_date, x.closed_real_value) for x in found], periods)
+        self.assertEqual(Account.objects.get(pk=self.account.pk).current_real_balance, current)
+        self.assertFalse(MonthlyRollup.objects.filter(month=date(2017, 1, 1)).exclude(real_value=0).exists())
+
+    def patch(self, transactions, dto):
+        url = reverse('transactions') + '?ids=' + ','.join(str(x.id) for x in transactions)
+        return self.client.patch(url, dto, format='json')
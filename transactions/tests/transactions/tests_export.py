@@ -0,0 +1,126 @@
+import csv
+import json
+import time
+import tracemalloc
+from datetime import date
+from io import StringIO
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from common.tests_helpers import BenchmarkTestHelper, benchmark
+from transactions.factories import create_recurrence
+from transactions.models import Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class ExportTestMixin(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory):
+    RANGE = '?due_date_from=2018-01-01&due_date_until=2018-12-31'
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def export(self, export_type=None):
+        url = reverse('transactions-export') + self.RANGE
+        if export_type:
+            url += '&type=' + export_type
+        return self.client.get(url)
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+
+class TransactionExportApiTestCase(ExportTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_transaction(-10, description='first, with comma', due_date=date(2018, 1, 10),
+                               payment_date=date(2018, 1, 11))
+        cls.create_transaction(-20, due_date=date(2018, 2, 10))
+        cls.create_transaction(-30, due_date=date(2017, 2, 10))
+
+        other_user, _ = cls.create_user('other', email='other@test.com', password='pass')
+        cls.create_transaction(-40, account=cls.create_account(user=other_user), due_date=date(2018, 1, 10))
+
+    def test_exports_csv_by_default(self):
+        response = self.export()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(StringIO(self.read(response))))
+        self.assertEqual([x['value'] for x in rows], ['-10.00', '-20.00'])
+        self.assertEqual(rows[0]['description'], 'first, with comma')
+        self.assertEqual(rows[0]['payment_date'], '2018-01-11')
+        self.assertEqual(rows[1]['payment_date'], '')
+
+    def test_exports_ndjson(self):
+        response = self.export('ndjson')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(x) for x in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['account'], self.account.id)
+        self.assertEqual(rows[0]['due_date'], '2018-01-10')
+        self.assertIsNone(rows[1]['payment_date'])
+
+    def test_includes_virtual_occurrences(self):
+        create_recurrence(account=self.account, category=self.expense_category, due_date=date(2018, 3, 1),
+                          description='rent', value=-100, kind=Transaction.EXPENSE_KIND,
+                          periodic={'frequency': 'monthly', 'interval': 1, 'how_many': 2})
+
+        rows = [json.loads(x) for x in self.read(self.export('ndjson')).splitlines()]
+
+        self.assertEqual([x['id'] for x in rows[2:]], [None, None])
+        self.assertEqual([x['recurrence_date'] for x in rows[2:]], ['2018-03-01', '2018-04-01'])
+
+    def test_rejects_unknown_type(self):
+        response = self.export('xml')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@benchmark
+class TransactionExportBenchmarkTestCase(ExportTestMixin, TestCase, BenchmarkTestHelper):
+    SIZES = [10000, 100000, 1000000]
+    BATCH_SIZE = 5000
+
+    def test_benchmark_export(self):
+        rows = []
+        created = 0
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+
+            for export_type in ['csv', 'ndjson']:
+                tracemalloc.start()
+                start = time.perf_counter()
+                lines = sum(1 for _ in self.export(export_type).streaming_content)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                self.assertGreaterEqual(lines, size)
+                rows.append((size, export_type, '{:.0f}'.format(size / elapsed), '{:.1f}'.format(peak / 2 ** 20)))
+
+        self.report('transactions export', ['transactions', 'type', 'rows/s', 'peak MiB'], rows)
+
+    def create_transactions(self, start, end):
+        for batch_start in range(start, end, self.BATCH_SIZE):
+            batch = [self.create_unsaved(i) for i in range(batch_start, min(batch_start + self.BATCH_SIZE, end))]
+            Transaction.objects.bulk_create(batch, batch_size=500)
+
+    def create_unsaved(self, i):
+        due_date = date(2018, 1, 1) + relativedelta(days=i % 365)
+        return Transaction(
+            account=self.account,
+            user=self.user,
+            category=self.expense_category,
+            kind=Transaction.EXPENSE_KIND,
+            value=-10,
+            description='benchmark',
+            due_date=due_date,
+            payment_date=due_date if i % 3 else None
+        )
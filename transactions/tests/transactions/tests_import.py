@@ -0,0 +1,146 @@
+from datetime import date
+from io import StringIO
+from tempfile import NamedTemporaryFile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from balances.models import MonthlyRollup, PeriodBalance
+from transactions.models import Account, Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class TransactionImportTestMixin(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory):
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def get_row(self, value=-10, due_date='2017-01-10', **kwargs):
+        row = {
+            'due_date': due_date,
+            'description': 'imported',
+            'category': self.expense_category.id,
+            'value': value,
+            'kind': Transaction.EXPENSE_KIND,
+            'account': self.account.id,
+        }
+        row.update(kwargs)
+        return row
+
+    def import_json(self, rows):
+        return self.client.post(reverse('transactions-import'), rows, format='json')
+
+
+class TransactionImportApiTestCase(TransactionImportTestMixin, TestCase):
+
+    def test_imports_json(self):
+        response = self.import_json([self.get_row(), self.get_row(-20, payment_date='2017-02-01', priority=3)])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'imported': 2})
+        imported = Transaction.objects.owned_by(self.user).order_by('value')
+        self.assertEqual([x.value for x in imported], [-20, -10])
+        self.assertEqual(imported[0].payment_date, date(2017, 2, 1))
+        self.assertEqual(imported[0].priority, 3)
+
+    def test_imports_csv(self):
+        content = 'due_date,description,category,value,kind,account,payment_date\n' + \
+                  '2017-01-10,first,{0},-10,0,{1},\n2017-01-20,second,{0},-20,0,{1},2017-01-21\n'.format(
+                      self.expense_category.id, self.account.id)
+
+        response = self.client.post(reverse('transactions-import'), content, content_type='text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        imported = Transaction.objects.owned_by(self.user).order_by('due_date')
+        self.assertEqual([x.description for x in imported], ['first', 'second'])
+        self.assertEqual([x.payment_date for x in imported], [None, date(2017, 1, 21)])
+
+    def test_reports_errors_by_row(self):
+        other_user, _ = self.create_user('other', email='other@test.com', password='pass')
+        other_account = self.create_account(user=other_user)
+
+        response = self.import_json([
+            self.get_row(),
+            self.get_row(account=other_account.id),
+            self.get_row(category=self.income_category.id),
+            self.get_row(10),
+            self.get_row(due_date='not a date'),
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('account', response.data[1])
+        self.assertIn('non_field_errors', response.data[2])
+        self.assertIn('non_field_errors', response.data[3])
+        self.assertIn('due_date', response.data[4])
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_rejects_not_a_list(self):
+        response = self.import_json(self.get_row())
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_depend_on_rows(self):
+        few = self.count_import_queries([self.get_row(due_date='2015-01-{:02d}'.format(x)) for x in range(1, 3)])
+        many = self.count_import_queries([self.get_row(due_date='2016-01-{:02d}'.format(x)) for x in range(1, 29)])
+
+        self.assertEqual(few, many)
+
+    def count_import_queries(self, rows):
+        with CaptureQueriesContext(connection) as context:
+            response = self.import_json(rows)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return len(context.captured_queries)
+
+
+class TransactionImportBalancesTestCase(TransactionImportTestMixin, TestCase):
+
+    def test_updates_balances_once_per_account(self):
+        other_account = self.create_account(name='other', current_effective_balance=0, current_real_balance=0)
+
+        self.import_json([
+            self.get_row(-10, '2017-01-10', payment_date='2017-02-01'),
+            self.get_row(-20, '2017-02-10'),
+            self.get_row(-5, '2017-01-05', account=other_account.id),
+        ])
+
+        periods = PeriodBalance.objects.filter(account=self.account).order_by('start_date')
+        self.assertEqual([(x.closed_effective_value, x.closed_real_value) for x in periods], [(-10, 0), (-30, -10)])
+        self.assertEqual(PeriodBalance.objects.filter(account=other_account).count(), 1)
+        account = Account.objects.get(pk=self.account.pk)
+        self.assertEqual((account.current_effective_balance, account.current_real_balance), (-30, -10))
+        self.assertEqual(MonthlyRollup.objects.get(account=other_account).effective_value, -5)
+
+    def test_imported_deltas_are_taken_back_one_at_a_time(self):
+        self.import_json([
+            self.get_row(-10, '2017-01-10', payment_date='2017-02-01'),
+            self.get_row(-20, '2017-02-10'),
+        ])
+        paid, pending = Transaction.objects.order_by('due_date')
+
+        paid.delete()
+        pending.value = -50
+        pending.save()
+        self.client.delete(reverse('transaction', kwargs={'pk': pending.id}))
+
+        periods = PeriodBalance.objects.filter(account=self.account)
+        self.assertEqual(set((x.closed_effective_value, x.closed_real_value) for x in periods), {(0, 0)})
+        account = Account.objects.get(pk=self.account.pk)
+        self.assertEqual((account.current_effective_balance, account.current_real_balance), (0, 0))
+
+    def test_command_reports_progress(self):
+        rows = ['{},imported,{},-1,0,{}'.format('2017-01-10', self.expense_category.id, self.account.id)] * 501
+        with NamedTemporaryFile('w', suffix='.csv') as csv_file:
+            csv_file.write('due_date,description,category,value,kind,account\n' + '\n'.join(rows))
+            csv_file.flush()
+
+            out = StringIO()
+            call_command('import_transactions', csv_file.name, '--user', str(self.user.id), stdout=out)
+
+        self.assertEqual(out.getvalue().splitlines(), ['500/501', '501/501', '501 transactions imported'])
+        self.assertEqual(Transaction.objects.count(), 501)
@@ -0,0 +1,96 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Sum
+from django.test import TestCase
+
+from common.tests_helpers import BenchmarkTestHelper, benchmark
+from transactions.factories import create_periodic_transactions
+from transactions.models import Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class TransactionOwnerTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase):
+
+    def test_created_with_account_user(self):
+        transaction = self.create_transaction(-10, due_date=date(2018, 1, 10))
+
+        self.assertEqual(Transaction.objects.get(pk=transaction.pk).user_id, self.user.id)
+
+    def test_changed_account_user(self):
+        other_user, _ = self.create_user('other', email='other@test.com', password='pass')
+        other_account = self.create_account(user=other_user, name='other')
+        transaction = self.create_transaction(-10, due_date=date(2018, 1, 10))
+
+        transaction = Transaction.objects.get(pk=transaction.pk)
+        transaction.account = other_account
+        transaction.save()
+
+        self.assertEqual(Transaction.objects.get(pk=transaction.pk).user_id, other_user.id)
+
+    def test_bulk_created_periodics(self):
+        create_periodic_transactions(
+            account=self.account,
+            category=self.expense_category,
+            due_date=date(2018, 1, 31),
+            description='periodic',
+            value=-10,
+            kind=Transaction.EXPENSE_KIND,
+            periodic={'frequency': 'monthly', 'interval': 1, 'how_many': 3}
+        )
+
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+
+    def test_owned_by_does_not_join_accounts(self):
+        sql = str(Transaction.objects.owned_by(self.user).query)
+
+        self.assertNotIn('transactions_account', sql)
+
+
+@benchmark
+class OwnedByBenchmarkTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase,
+                               BenchmarkTestHelper):
+    SIZES = [10000, 100000]
+    BATCH_SIZE = 5000
+
+    def test_benchmark_owned_by(self):
+        rows = []
+        created = 0
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+
+            for name, filters in [('account join', {'account__user_id': self.user.id}),
+                                  ('user column', {'user_id': self.user.id})]:
+                _, balance_elapsed, _ = self.measure(self.sum_expiring, filters)
+                _, pending_elapsed, _ = self.measure(self.list_pending, filters)
+                rows.append((size, name, '{:.1f}'.format(balance_elapsed * 1000),
+                             '{:.1f}'.format(pending_elapsed * 1000)))
+
+        self.report('transactions of user', ['transactions', 'filter', 'balance ms', 'pending ms'], rows)
+
+    def sum_expiring(self, filters):
+        query = Transaction.objects.filter(**filters).expires_between(date(2015, 1, 1), date(2016, 12, 31))
+        return query.aggregate(sum=Sum('value'))['sum']
+
+    def list_pending(self, filters):
+        query = Transaction.objects.filter(**filters).pending().filter(due_date__lte=date(2016, 1, 1))
+        return list(query.order_by('due_date')[:100])
+
+    def create_transactions(self, start, end):
+        for batch_start in range(start, end, self.BATCH_SIZE):
+            batch = [self.create_unsaved(i) for i in range(batch_start, min(batch_start + self.BATCH_SIZE, end))]
+            Transaction.objects.bulk_create(batch, batch_size=500)
+
+    def create_unsaved(self, i):
+        due_date = date(2015, 1, 1) + relativedelta(months=i % 36, days=i % 28)
+        return Transaction(
+            account=self.account,
+            user=self.user,
+            category=self.expense_category,
+            kind=Transaction.EXPENSE_KIND,
+            value=-10,
+            description='benchmark',
+            due_date=due_date,
+            payment_date=due_date if i % 3 else None
+        )
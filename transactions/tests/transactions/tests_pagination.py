@@ -0,0 +1,124 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from transactions.factories import create_recurrence
+from transactions.models import Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class TransactionPaginationApiTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase):
+    RANGE = '?due_date_from=2018-01-01&due_date_until=2018-12-31'
+    MAX_PAGES = 20
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def test_not_paginated_by_default(self):
+        self.create_transactions(3)
+
+        response = self.client.get(reverse('transactions') + self.RANGE)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+
+    def test_walks_every_page_in_order(self):
+        expected = [x.id for x in self.create_transactions(7, same_days=True)]
+
+        found = [x['id'] for x in self.get_every_result(page_size=3)]
+
+        self.assertEqual(found, expected)
+
+    def test_cursor_is_stable_when_rows_are_added_before_it(self):
+        self.create_transactions(4)
+        response = self.get_page(page_size=2)
+        self.create_transaction(-1, due_date=date(2018, 1, 1))
+
+        response = self.client.get(response.data['next'])
+
+        self.assertEqual([x['due_date'] for x in response.data['results']], ['2018-01-04', '2018-01-05'])
+
+    def test_last_page_has_no_next(self):
+        self.create_transactions(2)
+
+        response = self.get_page(page_size=2)
+
+        self.assertIsNone(response.data['next'])
+
+    def test_caps_page_size(self):
+        self.create_transactions(3)
+
+        response = self.get_page(page_size=100000)
+
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['next'])
+
+    def test_rejects_invalid_cursor(self):
+        response = self.client.get(reverse('transactions') + self.RANGE + '&cursor=invalid')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_merges_each_virtual_occurrence_once(self):
+        self.create_transactions(4)
+        create_recurrence(account=self.account, category=self.expense_category, due_date=date(2018, 1, 3),
+                          description='rent', value=-100, kind=Transaction.EXPENSE_KIND,
+                          periodic={'frequency': 'daily', 'interval': 1, 'how_many': 3})
+
+        results = self.get_every_result(page_size=2)
+
+        self.assertEqual(len(results), 7)
+        self.assertEqual([x['due_date'] for x in results],
+                         ['2018-01-02', '2018-01-03', '2018-01-03', '2018-01-04', '2018-01-04', '2018-01-05',
+                          '2018-01-05'])
+
+    def test_caps_pages_of_virtual_occurrences(self):
+        self.create_transactions(1)
+        create_recurrence(account=self.account, category=self.expense_category, due_date=date(2018, 1, 2),
+                          description='rent', value=-100, kind=Transaction.EXPENSE_KIND,
+                          periodic={'frequency': 'daily', 'interval': 1, 'how_many': 7})
+
+        response = self.get_page(page_size=3)
+        results = self.get_every_result(page_size=3)
+
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual([x['due_date'] for x in results],
+                         ['2018-01-02', '2018-01-02', '2018-01-03', '2018-01-04', '2018-01-05', '2018-01-06',
+                          '2018-01-07', '2018-01-08'])
+        self.assertIsNotNone(results[0]['id'])
+
+    def test_deep_pages_cost_same_queries(self):
+        self.create_transactions(9)
+        first = self.get_page(page_size=3)
+        second = self.client.get(first.data['next'])
+
+        with CaptureQueriesContext(connection) as first_context:
+            self.get_page(page_size=3)
+        with CaptureQueriesContext(connection) as last_context:
+            self.client.get(second.data['next'])
+
+        self.assertEqual(len(first_context.captured_queries), len(last_context.captured_queries))
+
+    def create_transactions(self, amount, same_days=False):
+        return [self.create_transaction(-10, due_date=date(2018, 1, 2 + (i // 2 if same_days else i)))
+                for i in range(amount)]
+
+    def get_page(self, **params):
+        query = ''.join('&{}={}'.format(key, value) for key, value in params.items())
+        return self.client.get(reverse('transactions') + self.RANGE + query)
+
+    def get_every_result(self, page_size):
+        results = []
+        response = self.get_page(page_size=page_size)
+        for _ in range(self.MAX_PAGES):
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            results += response.data['results']
+            if response.data['next'] is None:
+                return results
+            response = self.client.get(response.data['next'])
+
+        self.fail('Pagination did not end')
@@ -0,0 +1,113 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from balances.models import PeriodBalance
+from common.tests_helpers import BenchmarkTestHelper, benchmark
+from transactions.factories import create_periodic_transactions
+from transactions.factories.periodic_factory import get_due_dates
+from transactions.models import BoundReasons, Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class PeriodicDueDatesTestCase(TestCase):
+
+    def test_daily_how_many(self):
+        dates = get_due_dates({'frequency': 'daily', 'interval': 2, 'how_many': 3}, date(2018, 1, 30))
+        self.assertEqual(dates, [date(2018, 1, 30), date(2018, 2, 1), date(2018, 2, 3)])
+
+    def test_weekly_until(self):
+        dates = get_due_dates({'frequency': 'weekly', 'interval': 1, 'until': date(2018, 1, 22)}, date(2018, 1, 1))
+        self.assertEqual(dates, [date(2018, 1, 1), date(2018, 1, 8), date(2018, 1, 15), date(2018, 1, 22)])
+
+    def test_monthly_uses_last_day_of_shorter_months(self):
+        dates = get_due_dates({'frequency': 'monthly', 'interval': 1, 'how_many': 4}, date(2018, 1, 31))
+        self.assertEqual(dates, [date(2018, 1, 31), date(2018, 2, 28), date(2018, 3, 31), date(2018, 4, 30)])
+
+    def test_yearly_leap_day(self):
+        dates = get_due_dates({'frequency': 'yearly', 'interval': 1, 'until': date(2020, 3, 1)}, date(2016, 2, 29))
+        self.assertEqual(dates, [date(2016, 2, 29), date(2017, 2, 28), date(2018, 2, 28), date(2019, 2, 28),
+                                 date(2020, 2, 29)])
+
+
+class PeriodicFactoryTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, TestCase, BaseTestHelperFactory):
+
+    def test_creates_bound_to_parent(self):
+        periodics = self.create_periodic('monthly', 5)
+        parent = periodics[0]
+
+        self.assertEqual(len(periodics), 5)
+        self.assertEqual(Transaction.objects.filter(bound_transaction_id=parent.id).count(), 5)
+        for periodic in periodics:
+            self.assertIsNotNone(periodic.id)
+            self.assertEqual(periodic.bound_transaction_id, parent.id)
+            self.assertEqual(periodic.bound_reason, BoundReasons.PERIODIC_TRANSACTION)
+
+    def test_only_parent_is_payed(self):
+        periodics = self.create_periodic('daily', 3)
+
+        self.assertEqual(periodics[0].payment_date, date(2018, 1, 31))
+        self.assertEqual(Transaction.objects.filter(payment_date__isnull=True).count(), 2)
+
+    def test_updates_periods_of_whole_series_at_once(self):
+        with CaptureQueriesContext(connection) as context:
+            self.create_periodic('monthly', 3)
+
+        periods = PeriodBalance.objects.filter(account=self.account).order_by('start_date')
+        self.assertEqual([(x.closed_effective_value, x.closed_real_value) for x in periods],
+                         [(-10, -10), (-20, -10), (-30, -10)])
+        self.assertEqual(len([x for x in context.captured_queries if 'UPDATE "balances_periodbalance"' in x['sql']]), 1)
+
+    def test_query_count_does_not_depend_on_occurrences(self):
+        self.assertEqual(self.count_queries(10), self.count_queries(50))
+        self.assertLess(self.count_queries(400), 30)
+
+    def count_queries(self, how_many):
+        # Fresh account, so every measure starts with the same rollups
+        account = self.create_account(name='account {}'.format(how_many))
+        with CaptureQueriesContext(connection) as context:
+            self.create_periodic('daily', how_many, account)
+        return len(context.captured_queries)
+
+    def create_periodic(self, frequency, how_many, account=None):
+        return create_periodic_transactions(
+            account=account or self.account,
+            category=self.expense_category,
+            due_date=date(2018, 1, 31),
+            payment_date=date(2018, 1, 31),
+            description='periodic',
+            value=-10,
+            kind=Transaction.EXPENSE_KIND,
+            periodic={'frequency': frequency, 'interval': 1, 'how_many': how_many}
+        )
+
+
+@benchmark
+class PeriodicFactoryBenchmarkTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, TestCase,
+                                       BaseTestHelperFactory, BenchmarkTestHelper):
+    FREQUENCIES = ['daily', 'weekly', 'monthly', 'yearly']
+    OCCURRENCES = [10, 100, 1000]
+
+    def test_benchmark_create_periodic_transactions(self):
+        rows = []
+        for frequency in self.FREQUENCIES:
+            for how_many in self.OCCURRENCES:
+                kwargs = self.get_kwargs(frequency, how_many)
+                created, elapsed, queries = self.measure(create_periodic_transactions, **kwargs)
+                self.assertEqual(len(created), how_many)
+                rows.append((frequency, how_many, queries, '{:.1f}'.format(elapsed * 1000)))
+
+        self.report('create_periodic_transactions', ['frequency', 'occurrences', 'queries', 'ms'], rows)
+
+    def get_kwargs(self, frequency, how_many):
+        return {
+            'account': self.account,
+            'category': self.expense_category,
+            'due_date': date(2018, 1, 31),
+            'description': 'periodic',
+            'value': -10,
+            'kind': Transaction.EXPENSE_KIND,
+            'periodic': {'frequency': frequency, 'interval': 1, 'how_many': how_many}
+        }
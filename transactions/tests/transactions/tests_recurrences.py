@@ -0,0 +1,217 @@
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from balances.factories import CalculatorBuilder
+from balances.strategies.query import based
+from reports.factories.LastMonthsReport import LastMonthsReportFactory
+from reports.factories.PendingReport import PendingExpensesReportFactory
+from transactions.factories import create_recurrence, get_virtual_occurrences, materialize_occurrence
+from transactions.factories.periodic_factory import get_due_dates
+from transactions.models import BoundReasons, RecurrenceRule, Transaction
+from transactions.tests.base_test import BaseTestHelperFactory, UserDataTestSetupMixin, WithoutSignalsMixin
+
+
+class RecurrenceDueDatesWindowTestCase(TestCase):
+
+    def test_window_matches_full_expansion(self):
+        periodic = {'frequency': 'monthly', 'interval': 2, 'how_many': 60}
+        start = date(2018, 1, 31)
+        every = get_due_dates(periodic, start)
+        from_date, until_date = date(2021, 3, 1), date(2022, 8, 31)
+
+        dates = get_due_dates(periodic, start, from_date, until_date)
+
+        self.assertEqual(dates, [x for x in every if from_date <= x <= until_date])
+
+    def test_window_before_start(self):
+        periodic = {'frequency': 'daily', 'interval': 1, 'how_many': 3}
+        dates = get_due_dates(periodic, date(2018, 1, 10), date(2018, 1, 1), date(2018, 1, 10))
+        self.assertEqual(dates, [date(2018, 1, 10)])
+
+
+class RecurrenceTestMixin(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory):
+
+    def create_rule(self, how_many=12, payment_date=None, frequency='monthly'):
+        return create_recurrence(
+            account=self.account,
+            category=self.expense_category,
+            due_date=date(2018, 1, 31),
+            payment_date=payment_date,
+            description='rent',
+            value=-100,
+            kind=Transaction.EXPENSE_KIND,
+            periodic={'frequency': frequency, 'interval': 1, 'how_many': how_many}
+        )
+
+
+class RecurrenceFactoryTestCase(RecurrenceTestMixin, TestCase):
+
+    def test_stores_only_rule(self):
+        occurrences = self.create_rule()
+
+        self.assertEqual(len(occurrences), 12)
+        self.assertEqual(Transaction.objects.count(), 0)
+        rule = RecurrenceRule.objects.get()
+        self.assertEqual(rule.until, date(2018, 12, 31))
+        self.assertEqual(occurrences[1].due_date, date(2018, 2, 28))
+        self.assertEqual(occurrences[1].bound_reason, BoundReasons.PERIODIC_TRANSACTION)
+
+    def test_writes_first_occurrence_when_payed(self):
+        occurrences = self.create_rule(payment_date=date(2018, 1, 31))
+
+        self.assertIsNotNone(occurrences[0].id)
+        self.assertIsNone(occurrences[1].id)
+        self.assertEqual(Transaction.objects.get().recurrence_date, date(2018, 1, 31))
+
+    def test_virtual_occurrences_skip_materialized(self):
+        self.create_rule()
+        rule = RecurrenceRule.objects.get()
+        materialize_occurrence(rule, date(2018, 3, 31), payment_date=date(2018, 4, 2))
+
+        occurrences = get_virtual_occurrences(self.user.id, date(2018, 2, 1), date(2018, 4, 30))
+
+        self.assertEqual([x.due_date for x in occurrences], [date(2018, 2, 28), date(2018, 4, 30)])
+
+    def test_virtual_occurrences_filters(self):
+        self.create_rule()
+
+        self.assertEqual(len(get_virtual_occurrences(self.user.id, kind=Transaction.INCOME_KIND)), 0)
+        self.assertEqual(len(get_virtual_occurrences(self.user.id, payment_date__isnull=False)), 0)
+        self.assertEqual(len(get_virtual_occurrences(self.user.id, description__icontains='RENT',
+                                                     category_id__in=[str(self.expense_category.id)])), 12)
+        self.assertEqual(len(get_virtual_occurrences(self.user.id, due_date__month='2', due_date__year='2018')), 1)
+
+    def test_materialize_rejects_date_out_of_rule(self):
+        self.create_rule()
+        rule = RecurrenceRule.objects.get()
+
+        with self.assertRaises(ValueError):
+            materialize_occurrence(rule, date(2018, 2, 27))
+
+    def test_query_count_does_not_depend_on_occurrences(self):
+        self.create_rule(how_many=10, frequency='daily')
+        self.assertEqual(self.count_queries(), 2)
+
+        self.create_rule(how_many=1000, frequency='daily')
+        self.assertEqual(self.count_queries(), 2)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            get_virtual_occurrences(self.user.id)
+        return len(context.captured_queries)
+
+
+class RecurrenceApiTestCase(RecurrenceTestMixin, TestCase):
+
+    def setUp(self):
+        self.client = self.create_authenticated_client(self.token)
+
+    def test_api_creates_virtual_periodic(self):
+        dto = {
+            'due_date': date(2018, 1, 31),
+            'description': 'rent',
+            'kind': Transaction.EXPENSE_KIND,
+            'category': self.expense_category.id,
+            'value': -100,
+            'account': self.account.id,
+            'periodic': {'frequency': 'monthly', 'interval': 1, 'how_many': 3, 'virtual': True}
+        }
+        response = self.client.post(reverse('transactions'), dto, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertIsNone(response.data[0]['id'])
+        self.assertEqual(Transaction.objects.count(), 0)
+
+    def test_api_lists_virtual_occurrences_of_window(self):
+        self.create_rule()
+        self.create_transaction(-5, due_date=date(2018, 2, 10))
+
+        response = self.client.get(reverse('transactions') + '?due_date_from=2018-02-01&due_date_until=2018-03-31')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(sorted(x['due_date'] for x in response.data if x['id'] is None),
+                         ['2018-02-28', '2018-03-31'])
+
+    def test_api_updates_occurrence(self):
+        self.create_rule()
+        rule = RecurrenceRule.objects.get()
+        url = reverse('recurrence-occurrence', kwargs={'pk': rule.id, 'date': '2018-02-28'})
+
+        response = self.client.patch(url, {'payment_date': '2018-03-01'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        transaction = Transaction.objects.get()
+        self.assertEqual(transaction.payment_date, date(2018, 3, 1))
+        self.assertEqual(len(get_virtual_occurrences(self.user.id)), 11)
+
+    def test_api_updates_not_an_occurrence(self):
+        self.create_rule()
+        rule = RecurrenceRule.objects.get()
+        url = reverse('recurrence-occurrence', kwargs={'pk': rule.id, 'date': '2018-02-27'})
+
+        response = self.client.patch(url, {'payment_date': '2018-03-01'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_api_deletes_recurrence(self):
+        self.create_rule(payment_date=date(2018, 1, 31))
+        rule = RecurrenceRule.objects.get()
+
+        response = self.client.delete(reverse('recurrence', kwargs={'pk': rule.id}))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(len(get_virtual_occurrences(self.user.id)), 0)
+        self.assertIsNone(Transaction.objects.get().recurrence_id)
+
+
+class RecurrenceBalancesAndReportsTestCase(RecurrenceTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_transaction(-5, due_date=date(2018, 2, 10))
+
+    def setUp(self):
+        self.create_rule(how_many=3)
+
+    def test_calculator_adds_effective_occurrences(self):
+        calculator = CalculatorBuilder().owned_by(self.user.id).consider(based.EFFECTIVE)\
+            .between_dates(date(2018, 2, 1), date(2018, 3, 31)).as_detailed().build()
+
+        result = calculator.calculate()
+
+        self.assertEqual(result['expenses'], -205)
+        self.assertEqual(result['total'], -205)
+
+    def test_calculator_adds_occurrences_to_effective_only_on_complete(self):
+        calculator = CalculatorBuilder().owned_by(self.user.id).consider(based.BOTH)\
+            .between_dates(date(2018, 2, 1), date(2018, 3, 31)).as_complete().build()
+
+        result = calculator.calculate()
+
+        self.assertEqual(result['effective_expenses'], -205)
+        self.assertEqual(result['effective_total'], -205)
+        self.assertEqual(result['real_total'], 0)
+
+    def test_calculator_ignores_occurrences_on_real(self):
+        calculator = CalculatorBuilder().owned_by(self.user.id).consider(based.REAL)\
+            .until(date(2018, 12, 31)).as_plain().build()
+
+        self.assertIsNone(calculator.calculate())
+
+    def test_last_months_report(self):
+        report = LastMonthsReportFactory(self.user.id, 2, date(2018, 1, 1)).generate_report()
+
+        self.assertEqual([x['effective_expenses'] for x in report], [-100, -105, -100])
+
+    def test_pending_report(self):
+        report = PendingExpensesReportFactory(self.user.id).generate_report()
+
+        self.assertEqual(len(report['overdue']) + len(report['next']), 4)
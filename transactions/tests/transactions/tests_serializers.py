@@ -1,13 +1,19 @@
+import time
 from datetime import date
+from decimal import Decimal
 from unittest import mock, skip
 
+from dateutil.relativedelta import relativedelta
 from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
 
-from common.tests_helpers import SerializerTestHelper
-from transactions.models import HasKind
-from transactions.serializers import TransactionSerializer
+from common.tests_helpers import BenchmarkTestHelper, SerializerTestHelper, benchmark
+from transactions.factories import create_recurrence, get_virtual_occurrences
+from transactions.models import BoundReasons, HasKind, Transaction
+from transactions.serializers import TransactionRowSerializer, TransactionSerializer
 from transactions.serializers.PeriodicSerializer import PeriodicSerializer
-from transactions.tests.base_test import BaseTestHelperFactory, OtherUserDataTestSetupMixin, UserDataTestSetupMixin
+from transactions.tests.base_test import (BaseTestHelperFactory, OtherUserDataTestSetupMixin, UserDataTestSetupMixin,
+                                          WithoutSignalsMixin)
 
 
 class TransactionSerializerTestCase(UserDataTestSetupMixin, OtherUserDataTestSetupMixin, TestCase, SerializerTestHelper):
@@ -141,3 +147,91 @@ class PeriodicSerializerTestCase(TestCase, SerializerTestHelper):
     def test_serializer_should_not_allow_missing_both_until_with_how_many(self):
         serializer = PeriodicSerializer(data=self.serializer_data)
         self.assert_has_field_error(serializer)
+
+
+class TransactionRowSerializerTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.create_transaction(-10, description='açaí', due_date=date(2018, 1, 31), payment_date=date(2018, 2, 1),
+                               category=cls.expense_category)
+        cls.create_transaction(Decimal('1234567.89'), due_date=date(2018, 2, 28), category=cls.income_category)
+        cls.create_transaction(Decimal('-0.5'), due_date=date(2018, 3, 1), priority=5, deadline=0,
+                               category=cls.expense_category)
+        bound = cls.create_transaction(0, due_date=date(2018, 3, 1), category=cls.expense_category)
+        Transaction.objects.filter(pk=bound.pk).update(
+            bound_transaction=bound, bound_reason=BoundReasons.PERIODIC_TRANSACTION, details='details')
+
+        create_recurrence(account=cls.account, category=cls.expense_category, due_date=date(2018, 1, 10),
+                          description='rent', value=-100, kind=Transaction.EXPENSE_KIND,
+                          payment_date=date(2018, 1, 10),
+                          periodic={'frequency': 'monthly', 'interval': 1, 'how_many': 3})
+
+    def test_queryset_renders_same_json(self):
+        queryset = Transaction.objects.order_by('id')
+
+        self.assert_same_json(TransactionRowSerializer().serialize_queryset(queryset), queryset)
+
+    def test_instances_render_same_json(self):
+        instances = list(Transaction.objects.order_by('id')) + get_virtual_occurrences(self.user.id)
+
+        self.assertEqual(len(instances), 7)
+        self.assert_same_json(TransactionRowSerializer().serialize_instances(instances), instances)
+
+    def test_reads_queryset_once(self):
+        with self.assertNumQueries(1):
+            TransactionRowSerializer().serialize_queryset(Transaction.objects.all())
+
+    def assert_same_json(self, data, instances):
+        expected = TransactionSerializer(instances, many=True).data
+
+        self.assertEqual(data, expected)
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+
+
+@benchmark
+class TransactionRowSerializerBenchmarkTestCase(WithoutSignalsMixin, UserDataTestSetupMixin, BaseTestHelperFactory,
+                                               TestCase, BenchmarkTestHelper):
+    SIZES = [1000, 10000, 100000]
+    BATCH_SIZE = 5000
+
+    def test_benchmark_rows_per_second(self):
+        rows = []
+        created = 0
+        for size in self.SIZES:
+            self.create_transactions(created, size)
+            created = size
+            queryset = Transaction.objects.order_by('id')
+
+            serializers = [
+                ('TransactionSerializer', lambda: TransactionSerializer(queryset, many=True).data),
+                ('TransactionRowSerializer', lambda: TransactionRowSerializer().serialize_queryset(queryset)),
+            ]
+            for name, serialize in serializers:
+                start = time.perf_counter()
+                data = serialize()
+                elapsed = time.perf_counter() - start
+
+                self.assertEqual(len(data), size)
+                rows.append((size, name, '{:.0f}'.format(size / elapsed)))
+
+        self.report('transactions list serialization', ['transactions', 'serializer', 'rows/s'], rows)
+
+    def create_transactions(self, start, end):
+        for batch_start in range(start, end, self.BATCH_SIZE):
+            batch = [self.create_unsaved(i) for i in range(batch_start, min(batch_start + self.BATCH_SIZE, end))]
+            Transaction.objects.bulk_create(batch, batch_size=500)
+
+    def create_unsaved(self, i):
+        due_date = date(2018, 1, 1) + relativedelta(days=i % 365)
+        return Transaction(
+            account=self.account,
+            user=self.user,
+            category=self.expense_category,
+            kind=Transaction.EXPENSE_KIND,
+            value=-10,
+            description='benchmark',
+            due_date=due_date,
+            payment_date=due_date if i % 3 else None
+        )
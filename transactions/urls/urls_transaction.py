@@ -16,11 +16,36 @@ single_action = {
     'patch': 'partial_update',
 }
 
+import_actions = {
+    'post': 'import_list'
+}
+
+export_actions = {
+    'get': 'export'
+}
+
+recurrence_single_actions = {
+    'delete': 'destroy'
+}
+
+occurrence_actions = {
+    'put': 'update_occurrence',
+    'patch': 'partial_update_occurrence'
+}
+
 transaction_list = views.TransactionViewSet.as_view(list_actions)
 transaction_single = views.TransactionViewSet.as_view(single_action)
+transaction_export = views.TransactionViewSet.as_view(export_actions)
+transaction_import = views.TransactionViewSet.as_view(import_actions)
+recurrence_single = views.RecurrenceViewSet.as_view(recurrence_single_actions)
+recurrence_occurrence = views.RecurrenceViewSet.as_view(occurrence_actions)
 
 urlpatterns = [
     url(r'^$', transaction_list, name='transactions'),
     url(r'^(?P<pk>\d+)$', transaction_single, name='transaction'),
+    url(r'^export$', transaction_export, name='transactions-export'),
+    url(r'^import$', transaction_import, name='transactions-import'),
+    url(r'^recurrences/(?P<pk>\d+)$', recurrence_single, name='recurrence'),
+    url(r'^recurrences/(?P<pk>\d+)/(?P<date>\d{4}-\d{2}-\d{2})$', recurrence_occurrence, name='recurrence-occurrence'),
     url(r'^oldest-pending-expense/$', views.OldestPendingExpenseAPIView.as_view(), name='oldest-pending-expense')
 ]
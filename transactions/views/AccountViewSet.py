@@ -1,6 +1,9 @@
+from django.db import transaction as db_transaction
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 
+from balances.services import calculator
+from transactions import factories
 from transactions.filters import AccountFilter
 from transactions.models import Account, Category, Transaction
 from transactions.serializers import AccountSerializer
@@ -22,9 +25,16 @@ class AccountViewSet(viewsets.ModelViewSet, AccountFilter):
         return {
             "id": self.kwargs.get('pk', None),
             "user_id": self.request.user.id,
-            "request_method": self.request.method
+            "request_method": self.request.method,
+            "current_balances": getattr(self, 'current_balances', None)
         }
 
+    def list(self, request, *args, **kwargs):
+        account_ids = self.filter_queryset(self.get_queryset()).values('id')
+        self.current_balances = calculator.calculate_accounts_current_balance(account_ids)
+
+        return super(AccountViewSet, self).list(request, *args, **kwargs)
+
     def destroy(self, request, *args, **kwargs):
         if Transaction.objects.filter(account_id=kwargs['pk']).exclude(category__kind=Category.SYSTEM_KIND).exists():
             error_msg = 'Some transactions are bound to this account. Try archiving it instead.'
@@ -32,5 +42,11 @@ class AccountViewSet(viewsets.ModelViewSet, AccountFilter):
 
         return super(AccountViewSet, self).destroy(self, request, *args, **kwargs)
 
+    @db_transaction.atomic
+    def perform_destroy(self, instance):
+        # System transactions are taken back first, so the rollups and periods they leave cascade with the account
+        factories.delete_transactions(Transaction.objects.filter(account=instance))
+        instance.delete()
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user, current_effective_balance=0, current_real_balance=0)
@@ -3,7 +3,9 @@ from django.db.models import F
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 
-from transactions.models import Category, Transaction
+from balances.services import cache
+from transactions import factories
+from transactions.models import Category, RecurrenceRule, Transaction
 from transactions.serializers import CategorySerializer
 
 
@@ -34,12 +36,11 @@ class CategoryViewSet(viewsets.ModelViewSet):
     @db_transaction.atomic
     def perform_update(self, serializer):
         category = Category.objects.get(pk=self.kwargs['pk'])
-        if serializer.validated_data['kind'] != category.kind:
-            Transaction.objects\
-                .filter(category_id=self.kwargs['pk'])\
-                .update(
-                    kind=serializer.validated_data['kind'],
-                    value=F('value') * -1
-                )
+        kind = serializer.validated_data['kind']
+        if kind != category.kind:
+            factories.change_transactions_kind(Transaction.objects.filter(category_id=category.id), kind)
+            # Not materialized occurrences are expanded from their rules, so those are flipped too
+            RecurrenceRule.objects.filter(category_id=category.id).update(kind=kind, value=F('value') * -1)
+            cache.invalidate([self.request.user.id])
 
         serializer.save()
@@ -0,0 +1,51 @@
+from django.db import transaction as db_transaction
+from django.http import Http404
+from rest_framework import generics, status, viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from transactions import factories
+from transactions.models import RecurrenceRule
+from transactions.serializers import TransactionSerializer
+
+
+class RecurrenceViewSet(viewsets.ViewSet, generics.GenericAPIView):
+    """
+    Handles recurrences and their occurrences, which only become transactions when edited.
+    """
+    serializer_class = TransactionSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return RecurrenceRule.objects.filter(account__user_id=self.request.user.id)
+
+    def get_serializer_context(self):
+        return {
+            "user_id": self.request.user.id,
+            "request_method": self.request.method
+        }
+
+    def update_occurrence(self, request, pk=None, date=None):
+        return self._update_occurrence(request, date, partial=False)
+
+    def partial_update_occurrence(self, request, pk=None, date=None):
+        return self._update_occurrence(request, date, partial=True)
+
+    def destroy(self, request, pk=None):
+        """Stops recurrence, materialized occurrences are kept as plain transactions"""
+        self.get_object().delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @db_transaction.atomic
+    def _update_occurrence(self, request, date, partial):
+        rule = self.get_object()
+        try:
+            occurrence = factories.materialize_occurrence(rule, date)
+        except ValueError as e:
+            raise Http404(str(e))
+
+        serializer = self.get_serializer(occurrence, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data)
@@ -1,13 +1,27 @@
+import calendar
+from datetime import date
+
 from django.db import transaction as db_transaction
+from django.http import StreamingHttpResponse
 from rest_framework import status, viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
+from balances.signals import deferred_updates
+from common.pagination import KeysetPagination
+from common.parsers import CsvParser
 from common.views import PatchModelListMixin
+from transactions import exports, factories
 from transactions.filters import TransactionFilter
 from transactions.models import Transaction
 from transactions.permissions import IsNotSystemTransactionOrIsReadOnly
-from transactions.serializers import TransactionSerializer
+from transactions.serializers import TransactionImportSerializer, TransactionRowSerializer, TransactionSerializer
+
+
+class TransactionPagination(KeysetPagination):
+    # A recurrence has one occurrence at most by date, so it tells apart not materialized ones
+    unsaved_id_field = 'recurrence_id'
 
 
 class PeriodicTransactionViewSetMixin:
@@ -41,24 +55,25 @@ class PeriodicTransactionViewSetMixin:
         to_return = []
 
         is_first = True
-        for instance in periodics:
-            serializer = self.get_serializer(instance, data=data, partial=True)
-            serializer.is_valid(raise_exception=True)
-            self.perform_update(serializer)
-            to_return.append(serializer.data)
-
-            if is_first:  # TODO: Move it from here + Test it
-                data.pop('due_date', None)
-                data.pop('payment_date', None)
-                is_first = False
+        # Balances are moved once for the whole series, instead of once per periodic
+        with deferred_updates():
+            for instance in periodics:
+                serializer = self.get_serializer(instance, data=data, partial=True)
+                serializer.is_valid(raise_exception=True)
+                self.perform_update(serializer)
+                to_return.append(serializer.data)
+
+                if is_first:  # TODO: Move it from here + Test it
+                    data.pop('due_date', None)
+                    data.pop('payment_date', None)
+                    is_first = False
 
         return to_return
 
     def destroy_all_periodics(self, request, *args, **kwargs):
         periodic = self.request.query_params.get('periodic_transaction', False)
         if periodic:
-            # TODO: WARNING, IT WILL NOT TRIGGER SIGNALS
-            Transaction.objects.filter(bound_transaction=periodic).delete()
+            factories.delete_transactions(self.get_queryset().filter(bound_transaction=periodic))
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         return Response(status=status.HTTP_404_NOT_FOUND)
@@ -66,20 +81,96 @@ class PeriodicTransactionViewSetMixin:
     def perform_destroy(self, instance):
         params = self.request.query_params
 
-        if params.get('next', False) == '1':
-            Transaction.objects.filter(bound_transaction=instance.bound_transaction,
-                                       due_date__gte=instance.due_date).delete()
+        # Not periodic transactions have no next ones, so only themselves are deleted
+        if params.get('next', False) == '1' and instance.bound_transaction_id is not None:
+            factories.delete_transactions(self.get_queryset().filter(bound_transaction_id=instance.bound_transaction_id,
+                                                                     due_date__gte=instance.due_date))
         else:
             return super(PeriodicTransactionViewSetMixin, self).perform_destroy(instance)
 
 
-class TransactionViewSet(PeriodicTransactionViewSetMixin, PatchModelListMixin,
+class RecurrenceTransactionViewSetMixin:
+    '''
+    Mixin that merges not materialized occurrences of recurrences into listed transactions.
+    Listed rows are read only, so those are represented by row_serializer_class fast path.
+    '''
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        virtual_occurrences = self.get_virtual_occurrences(self.get_query_params_filter())
+
+        row_serializer = self.row_serializer_class()
+
+        page = self.paginator.paginate_queryset(queryset, request, view=self, unsaved=virtual_occurrences)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.serialize_instances(page))
+
+        data = row_serializer.serialize_queryset(queryset) + row_serializer.serialize_instances(virtual_occurrences)
+        return Response(data)
+
+    def get_virtual_occurrences(self, filters):
+        # Occurrences are never payed until materialized
+        if filters.get('payment_date__isnull', True) is False or 'payment_date__range' in filters:
+            return []
+
+        filters = filters.copy()
+        if 'due_date__range' in filters:
+            from_date, until_date = filters.pop('due_date__range')
+        elif 'due_date__month' in filters and 'due_date__year' in filters:
+            year, month = int(filters.pop('due_date__year')), int(filters.pop('due_date__month'))
+            from_date = date(year, month, 1)
+            until_date = date(year, month, calendar.monthrange(year, month)[1])
+        else:
+            from_date, until_date = None, None
+
+        return factories.get_virtual_occurrences(self.request.user.id, from_date, until_date, **filters)
+
+
+class ExportTransactionViewSetMixin:
+    '''
+    Mixin that streams filtered transactions as "?type=csv" (default) or "?type=ndjson"
+    '''
+
+    def export(self, request, *args, **kwargs):
+        encoder_class = exports.ENCODERS.get(request.query_params.get('type', 'csv'))
+        if encoder_class is None:
+            return Response({'type': 'Must be one of: ' + ', '.join(sorted(exports.ENCODERS))},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by('due_date', 'id')
+        virtual_occurrences = self.get_virtual_occurrences(self.get_query_params_filter())
+
+        rows = exports.export_rows(queryset, encoder_class(), virtual_occurrences)
+        response = StreamingHttpResponse(rows, content_type=encoder_class.content_type)
+        response['Content-Disposition'] = 'attachment; filename="transactions.{}"'.format(encoder_class.extension)
+        return response
+
+
+class ImportTransactionViewSetMixin:
+    '''
+    Mixin that creates many transactions at once from a JSON array or a CSV with header line
+    '''
+
+    def import_list(self, request, *args, **kwargs):
+        serializer = TransactionImportSerializer(data=request.data, many=True, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        imported = factories.import_transactions(request.user.id, serializer.validated_data)
+
+        return Response({'imported': len(imported)}, status=status.HTTP_201_CREATED)
+
+
+class TransactionViewSet(ImportTransactionViewSetMixin, ExportTransactionViewSetMixin,
+        RecurrenceTransactionViewSetMixin, PeriodicTransactionViewSetMixin, PatchModelListMixin,
         viewsets.ModelViewSet, TransactionFilter):
     '''
     Handles CRUD on /transactions endpoints
     '''
     serializer_class = TransactionSerializer
+    row_serializer_class = TransactionRowSerializer
     permission_classes = (IsAuthenticated, IsNotSystemTransactionOrIsReadOnly)
+    pagination_class = TransactionPagination
+    parser_classes = tuple(api_settings.DEFAULT_PARSER_CLASSES) + (CsvParser,)
+    bulk_update_fields = ('payment_date', 'priority', 'deadline')
 
     def get_serializer_context(self):
         return {
@@ -87,9 +178,12 @@ class TransactionViewSet(PeriodicTransactionViewSetMixin, PatchModelListMixin,
             "request_method": self.request.method
         }
 
+    def perform_bulk_update(self, queryset, validated_data):
+        factories.update_transactions(queryset, **validated_data)
+
     def get_queryset(self):
         query_filter = {
-            'account__user_id': self.request.user.id,
+            'user_id': self.request.user.id,
         }
 
         url_query_params = self.get_query_params_filter()
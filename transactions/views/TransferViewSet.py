@@ -18,7 +18,7 @@ class TransferViewSet(viewsets.ViewSet, mixins.CreateModelMixin, generics.Generi
 
     def get_queryset(self):
         return Transaction.objects.filter(\
-            account__user_id=self.request.user.id,
+            user_id=self.request.user.id,
             bound_reason=BoundReasons.TRANSFER_BETWEEN_ACCOUNTS,
             kind=HasKind.EXPENSE_KIND) # Get just one of pair (from)
 
@@ -26,7 +26,7 @@ class TransferViewSet(viewsets.ViewSet, mixins.CreateModelMixin, generics.Generi
         try:
             obj = Transaction.objects.get(\
                 Q(id=pk) | Q(bound_transaction_id=pk),#TODO: rename old todos to be "TODO" format
-                Q(account__user_id=self.request.user.id), # TODO: User permission instead
+                Q(user_id=self.request.user.id), # TODO: User permission instead
                 Q(bound_reason=BoundReasons.TRANSFER_BETWEEN_ACCOUNTS),
                 Q(kind=HasKind.EXPENSE_KIND)
             )
@@ -44,24 +44,20 @@ class TransferViewSet(viewsets.ViewSet, mixins.CreateModelMixin, generics.Generi
         }    
 
     def list(self, request):
-        queryset = self.get_queryset()        
-        data = map_queryset_to_serializer_data(queryset)
-        serializer = self.get_serializer(data=data, many=True)
-        serializer.is_valid(raise_exception=True)
-        return Response(serializer.data)
+        queryset = self.get_queryset()
+        return self.get_response(map_queryset_to_serializer_data(queryset), many=True)
 
     def list_from_account(self, request, pk):
         queryset = self.get_queryset().filter(Q(account_id=pk) | Q(bound_transaction__account_id=pk))
-        data = map_queryset_to_serializer_data(queryset)
-        serializer = self.get_serializer(data=data, many=True)
-        serializer.is_valid(raise_exception=True)
-        return Response(serializer.data)
-        
-    def retrieve(self, request, pk=None):        
+        return self.get_response(map_queryset_to_serializer_data(queryset), many=True)
+
+    def retrieve(self, request, pk=None):
         instance = self.get_object(pk)
-        data = map_transaction_to_transfer_data(instance)
-        serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
+        return self.get_response(map_transaction_to_transfer_data(instance))
+
+    def get_response(self, data, many=False):
+        """Stored transfers are already valid, so those are just represented instead of validated again"""
+        serializer = self.get_serializer(data, many=many)
         return Response(serializer.data)
 
     def update(self, request, pk=None):
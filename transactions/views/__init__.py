@@ -1,7 +1,16 @@
 from .AccountViewSet import AccountViewSet
 from .CategoryViewSet import CategoryViewSet
+from .RecurrenceViewSet import RecurrenceViewSet
 from .TransferViewSet import TransferViewSet
 from .TransactionViewSet import TransactionViewSet
 from .transactions_views import OldestPendingExpenseAPIView
 
-__all__ = ["AccountViewSet", "CategoryViewSet", "TransferViewSet", "TransactionViewSet", "GenericTransactionAPIView", "OldestPendingExpenseAPIView"]
\ No newline at end of file
+__all__ = [
+    "AccountViewSet",
+    "CategoryViewSet",
+    "RecurrenceViewSet",
+    "TransferViewSet",
+    "TransactionViewSet",
+    "GenericTransactionAPIView",
+    "OldestPendingExpenseAPIView"
+]